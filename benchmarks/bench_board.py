@@ -0,0 +1,13 @@
+import timeit
+
+from dominoes.domino import DominoBoard
+
+
+def bench_board_construction(number=200):
+    seconds = timeit.timeit(DominoBoard, number=number)
+    return seconds / number
+
+
+if __name__ == "__main__":
+    per_board = bench_board_construction()
+    print("DominoBoard(): {:.1f} us per board".format(per_board * 1e6))
@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+
+from dominoes.evaluation import LinearEvaluator, MLPEvaluator, play_evaluated_games
+from dominoes.features import DTYPE, N_FEATURES
+
+BATCH_SIZES = (1, 8, 64, 512)
+CONCURRENCY = (1, 4, 16, 64)
+
+
+def bench_model(model, batch_size, rows=20000):
+    # Rows scored per second when rows arrive batch_size at a time
+    features = np.random.default_rng(0).random((batch_size, N_FEATURES), dtype=DTYPE)
+    calls = max(1, rows // batch_size)
+    start = time.perf_counter()
+    for _ in range(calls):
+        model(features)
+    return calls * batch_size / (time.perf_counter() - start)
+
+
+def bench_games(model, concurrency, n_games=256):
+    result, evaluator = play_evaluated_games(model, n_games, concurrency)
+    return result.games_per_second, evaluator.mean_batch, evaluator.batches
+
+
+if __name__ == "__main__":
+    models = {
+        "linear": LinearEvaluator.heuristic(),
+        "mlp": MLPEvaluator.random((64, 64), seed=0),
+    }
+    print("{:<8} {:>6} {:>14}".format("model", "batch", "rows/s"))
+    for name, model in models.items():
+        for batch_size in BATCH_SIZES:
+            print(
+                "{:<8} {:>6} {:>14.0f}".format(
+                    name, batch_size, bench_model(model, batch_size)
+                )
+            )
+    print()
+    print(
+        "{:<8} {:>6} {:>10} {:>12} {:>10}".format(
+            "model", "games", "games/s", "mean batch", "batches"
+        )
+    )
+    for concurrency in CONCURRENCY:
+        games_per_second, mean_batch, batches = bench_games(models["mlp"], concurrency)
+        print(
+            "{:<8} {:>6} {:>10.1f} {:>12.1f} {:>10}".format(
+                "mlp", concurrency, games_per_second, mean_batch, batches
+            )
+        )
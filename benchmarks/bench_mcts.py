@@ -0,0 +1,65 @@
+import argparse
+import os
+import random
+
+from dominoes.game import Game
+from dominoes.mcts import MCTSPlayer
+from dominoes.player import Hand, RandomPlayer
+
+WORKERS = (1, 2, 4)
+
+
+def bench_workers(workers, n_games, time_budget, seed=0):
+    # Plays n_games against RandomPlayer with one MCTSPlayer, so its worker
+    # processes are started once, and returns (playouts/s, win rate). Every
+    # worker count plays the same deals.
+    playouts = 0
+    seconds = 0.0
+    wins = 0
+    with MCTSPlayer(
+        Hand([]), "mcts", time_budget=time_budget, workers=workers, seed=seed
+    ) as player:
+        for game_index in range(n_games):
+            opponent = RandomPlayer(Hand([]), "random")
+            game = Game(
+                [player, opponent],
+                verbose=False,
+                rng=random.Random(seed * n_games + game_index),
+            )
+            while True:
+                turn_player = game.begin_turn()
+                player.last_search = {}
+                move = turn_player.choose_next_move(game.board)
+                if turn_player is player and player.last_search:
+                    playouts += player.last_search["playouts"]
+                    seconds += player.last_search["seconds"]
+                if game.apply_move(move):
+                    break
+            scores = game.get_result().scores
+            wins += scores[0] > scores[1]
+            player.score = 0
+    return playouts / seconds if seconds else 0.0, wins / n_games
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MCTSPlayer scaling with workers")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--time-budget", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=list(WORKERS))
+    args = parser.parse_args()
+
+    print("{} CPUs".format(os.cpu_count()))
+    print(
+        "{:>8} {:>12} {:>8} {:>10}".format(
+            "workers", "playouts/s", "speedup", "win rate"
+        )
+    )
+    base = None
+    for workers in args.workers:
+        rate, win_rate = bench_workers(workers, args.games, args.time_budget)
+        base = base or rate
+        print(
+            "{:>8} {:>12.0f} {:>8.2f} {:>10.2f}".format(
+                workers, rate, rate / base, win_rate
+            )
+        )
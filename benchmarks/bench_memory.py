@@ -0,0 +1,54 @@
+import sys
+import tracemalloc
+
+from dominoes.domino import DominoBoard
+from dominoes.game import DominoSet
+from dominoes.player import Hand, Move, RandomPlayer
+from dominoes.simulation import game_rng, play_headless_game
+
+
+def object_size(obj):
+    # Instance size including its __dict__, if it has one
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def bench_object_sizes():
+    domino_set = DominoSet()
+    domino = domino_set.dominoes[1]
+    double = domino_set.dominoes[0]
+    return {
+        "Domino": object_size(domino),
+        "DoubleDomino": object_size(double),
+        "DominoSide": object_size(domino.side1),
+        "DominoMidSide": object_size(double.mid_side1),
+        "DominoGraphic": object_size(domino.graphic),
+        "Move": object_size(Move(domino, domino.side1, double.mid_side1)),
+        "Hand": object_size(Hand([domino])),
+        "DominoBoard": object_size(DominoBoard()),
+    }
+
+
+def bench_game_memory(n_games=200, seed=0):
+    # Bytes allocated per game and the peak heap while playing one
+    tracemalloc.start()
+    allocated = 0
+    peak = 0
+    for i in range(n_games):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        play_headless_game(RandomPlayer, RandomPlayer, game_rng(seed, i))
+        current, game_peak = tracemalloc.get_traced_memory()
+        allocated += current - before
+        peak = max(peak, game_peak - before)
+    tracemalloc.stop()
+    return {"retained_per_game": allocated / n_games, "peak_per_game": peak}
+
+
+if __name__ == "__main__":
+    for name, size in bench_object_sizes().items():
+        print("{:<14} {:>5} bytes".format(name, size))
+    for name, size in bench_game_memory().items():
+        print("{:<18} {:>9.0f} bytes".format(name, size))
@@ -0,0 +1,253 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from dominoes.compact import (
+    N_TILES,
+    NO_END,
+    SIDES_PER_TILE,
+    get_side,
+    mask_to_hand,
+)
+from dominoes.domino import DominoBoard
+from dominoes.game import DominoSet
+from dominoes.player import Player, RandomPlayer
+from dominoes.simulation import simulate_games
+from dominoes.tablebase import random_endgame
+
+# Each benchmark takes a number of operations, does its setup outside the
+# timed region and returns the seconds taken by the operations alone. Every
+# run uses the same seeds, so results are comparable between commits.
+SEED = 0
+BOARD_SIZES = (1, 8, 16)
+HAND_SIZE = 7
+# Smallest slowdown reported as a regression by --compare. Repeated runs on
+# a busy or frequency-scaling machine often differ by 10-30%, so a benchmark
+# must also be slower by more than the spread of its own repeats.
+REGRESSION_THRESHOLD = 0.25
+
+
+def build_compact_board(n_dominoes: int, seed: int = SEED):
+    return random_endgame(random.Random(seed), N_TILES - n_dominoes)
+
+
+def build_position(n_dominoes: int) -> Tuple[DominoBoard, Player]:
+    # A board of n_dominoes from random legal moves and a player holding up
+    # to HAND_SIZE of the remaining tiles
+    board, mover, other = build_compact_board(n_dominoes)
+    dominoes = DominoSet().dominoes
+    hand = mask_to_hand(mover | other, dominoes)
+    for domino in hand.dominoes[HAND_SIZE:]:
+        hand.remove_domino(domino)
+    return board.to_board(dominoes), Player(hand)
+
+
+def bench_domino_set(number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        DominoSet()
+    return time.perf_counter() - start
+
+
+def bench_draw_hand(number: int) -> float:
+    domino_sets = [DominoSet(seed=SEED + i) for i in range(number)]
+    start = time.perf_counter()
+    for domino_set in domino_sets:
+        domino_set.draw_hand(HAND_SIZE)
+    return time.perf_counter() - start
+
+
+def bench_get_possible_moves(n_dominoes: int) -> Callable[[int], float]:
+    def bench(number: int) -> float:
+        board, player = build_position(n_dominoes)
+        start = time.perf_counter()
+        for _ in range(number):
+            player.get_possible_moves(board)
+        return time.perf_counter() - start
+
+    return bench
+
+
+def bench_add_domino(number: int) -> float:
+    # Replays the moves of a 16 domino board onto fresh boards
+    placements = build_compact_board(16)[0].placements
+    games = []
+    for _ in range(number // len(placements) + 1):
+        dominoes = DominoSet().dominoes
+        moves = []
+        for tile, endpoint, attach in placements:
+            if endpoint == NO_END:
+                moves.append((dominoes[tile], None, None))
+            else:
+                endpoint_domino = dominoes[endpoint // SIDES_PER_TILE]
+                moves.append(
+                    (
+                        dominoes[tile],
+                        get_side(endpoint_domino, endpoint % SIDES_PER_TILE),
+                        get_side(dominoes[tile], attach),
+                    )
+                )
+        games.append((DominoBoard(), moves))
+
+    start = time.perf_counter()
+    for board, moves in games:
+        for domino, endpoint, attachpoint in moves:
+            board.add_domino(domino, endpoint, attachpoint)
+    elapsed = time.perf_counter() - start
+    return elapsed * number / (len(games) * len(placements))
+
+
+def bench_get_score(number: int) -> float:
+    board, _ = build_position(16)
+    start = time.perf_counter()
+    for _ in range(number):
+        board.get_score()
+    return time.perf_counter() - start
+
+
+def bench_draw_board(number: int) -> float:
+    board, _ = build_position(16)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(number):
+            board.board_graphic.draw_board()
+        return time.perf_counter() - start
+
+
+def bench_random_games(number: int) -> float:
+    start = time.perf_counter()
+    simulate_games(RandomPlayer, RandomPlayer, number, seed=SEED)
+    return time.perf_counter() - start
+
+
+# name -> (benchmark, operations per run)
+BENCHMARKS: Dict[str, Tuple[Callable[[int], float], int]] = {
+    "domino_set": (bench_domino_set, 2000),
+    "draw_hand": (bench_draw_hand, 2000),
+    **{
+        "get_possible_moves_{}".format(size): (bench_get_possible_moves(size), 20000)
+        for size in BOARD_SIZES
+    },
+    "add_domino": (bench_add_domino, 2000),
+    "get_score": (bench_get_score, 20000),
+    "draw_board": (bench_draw_board, 50),
+    "random_games": (bench_random_games, 200),
+}
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(names: List[str], repeat: int = 5, scale: float = 1.0) -> dict:
+    # Best of repeat runs for each benchmark, which is the least noisy
+    # estimate of the cost of the code itself. spread is how much slower the
+    # worst run was, as a measure of the noise.
+    results = {}
+    for name in names:
+        bench, number = BENCHMARKS[name]
+        number = max(1, int(number * scale))
+        times = [bench(number) / number for _ in range(repeat)]
+        seconds = min(times)
+        results[name] = {
+            "seconds_per_op": seconds,
+            "ops_per_second": 1 / seconds if seconds else float("inf"),
+            "spread": max(times) / seconds - 1 if seconds else 0.0,
+            "number": number,
+            "repeat": repeat,
+        }
+    return {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float = REGRESSION_THRESHOLD
+) -> List[str]:
+    # Names of benchmarks that got slower than both threshold and the spread
+    # of either run's repeats
+    regressions = []
+    print(
+        "{:<24} {:>12} {:>12} {:>8} {:>8}".format(
+            "benchmark", "before us", "after us", "ratio", "limit"
+        )
+    )
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = result["seconds_per_op"] / before["seconds_per_op"]
+        limit = 1 + max(threshold, before.get("spread", 0.0), result.get("spread", 0.0))
+        flag = ""
+        if ratio > limit:
+            regressions.append(name)
+            flag = "  slower"
+        print(
+            "{:<24} {:>12.2f} {:>12.2f} {:>8.2f} {:>8.2f}{}".format(
+                name,
+                before["seconds_per_op"] * 1e6,
+                result["seconds_per_op"] * 1e6,
+                ratio,
+                limit,
+                flag,
+            )
+        )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the domino engine")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a saved JSON file")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="Smallest slowdown reported by --compare",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiply operations per run"
+    )
+    parser.add_argument("names", nargs="*", help="Benchmarks to run, default all")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.names or list(BENCHMARKS), args.repeat, args.scale)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(current, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        return 1 if compare(baseline, current, args.threshold) else 0
+
+    for name, result in current["results"].items():
+        print(
+            "{:<24} {:>12.2f} us {:>12.1f} ops/s".format(
+                name, result["seconds_per_op"] * 1e6, result["ops_per_second"]
+            )
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+from .tables import get_move_tables
+
+# Batched two-player games with the rules of GameTwoPlayer.play, where both
+# players make RandomPlayer's move: the first one Hand.sides_by_value and
+# DominoBoard.endpoints_by_value give. That is the pip whose key entered the
+# hand's index first among those matching an open end, the earliest drawn
+# domino with that pip, and the earliest opened end with it.
+HAND_SIZE = 7
+TABLES = get_move_tables(0, 6)
+N_TILES = TABLES.n_tiles
+N_PIPS = TABLES.max_number + 1
+MAX_ENDS = TABLES.max_ends
+TILE_A = np.array([low for low, _ in TABLES.tiles], dtype=np.int8)
+TILE_B = np.array([high for _, high in TABLES.tiles], dtype=np.int8)
+TILE_IS_DOUBLE = TILE_A == TILE_B
+TILE_PIPS = TILE_A.astype(np.int32) + TILE_B
+# TILE_HAS_PIP[pip, tile] is True if either half of tile shows pip
+TILE_HAS_PIP = (TILE_A[None, :] == np.arange(N_PIPS)[:, None]) | (
+    TILE_B[None, :] == np.arange(N_PIPS)[:, None]
+)
+
+# Kinds of open end, which decide how much each end adds to the board score
+EMPTY = 0
+REGULAR_END = 1
+# Mid side of a double whose other mid side is covered, worth 2x the pip
+SINGLE_MID_END = 2
+# The two mid sides of a double played as the root, worth 1x the pip each
+ROOT_MID_END = 3
+# End side of a double with both mid sides covered, worth nothing
+DOUBLE_END = 4
+
+# Arrival order of tiles not in a hand, and the order of anything else that
+# is not there, so argmin never picks it
+NOT_IN_HAND = np.iinfo(np.int32).max
+
+
+class BatchResult:
+    def __init__(
+        self,
+        scores: np.ndarray,
+        move_count: np.ndarray,
+        turn_count: np.ndarray,
+        blocked: np.ndarray,
+    ):
+        self.scores = scores
+        self.move_count = move_count
+        self.turn_count = turn_count
+        self.blocked = blocked
+
+    def __len__(self):
+        return len(self.move_count)
+
+    def summary(self) -> Dict[str, float]:
+        wins = self.scores[:, 0] > self.scores[:, 1]
+        losses = self.scores[:, 0] < self.scores[:, 1]
+        return {
+            "games": float(len(self)),
+            "mean_score": float(self.scores.mean()),
+            "player1_win_rate": float(wins.mean()),
+            "player2_win_rate": float(losses.mean()),
+            "tie_rate": float(1 - wins.mean() - losses.mean()),
+            "mean_moves": float(self.move_count.mean()),
+            "mean_turns": float(self.turn_count.mean()),
+            "blocked_rate": float(self.blocked.mean()),
+        }
+
+
+class BatchGames:
+    def __init__(self, n_games: int, rng: Optional[np.random.Generator] = None):
+        rng = rng if rng is not None else np.random.default_rng()
+        # Shuffled deck per game: the first two hands are dealt from the top
+        # and the rest is the boneyard, drawn in order
+        decks = rng.permuted(np.tile(np.arange(N_TILES), (n_games, 1)), axis=1)
+        self.deal(decks, rng.integers(0, 2, size=n_games))
+
+    @classmethod
+    def from_deals(cls, decks: np.ndarray, turns: np.ndarray) -> "BatchGames":
+        # Games with the given decks and first players, e.g. to replay games
+        # of the object engine
+        games = cls.__new__(cls)
+        games.deal(np.asarray(decks), np.array(turns))
+        return games
+
+    def deal(self, decks: np.ndarray, turns: np.ndarray):
+        n_games = len(decks)
+        self.n_games = n_games
+        games = np.arange(n_games)
+        self.games = games
+        self.deck = decks
+        self.next_draw = np.full(n_games, 2 * HAND_SIZE)
+
+        # Order each tile entered its holder's hand, NOT_IN_HAND otherwise
+        self.arrival = np.full((n_games, 2, N_TILES), NOT_IN_HAND, dtype=np.int32)
+        self.hand_size = np.zeros((n_games, 2), dtype=np.int8)
+        self.hand_pips = np.zeros((n_games, 2), dtype=np.int32)
+        # Mirror of Hand.sides_by_value: how many sides in hand show each pip,
+        # and when its key was last added to the index
+        self.pip_count = np.zeros((n_games, 2, N_PIPS), dtype=np.int8)
+        self.pip_order = np.zeros((n_games, 2, N_PIPS), dtype=np.int32)
+        self.counter = 0
+
+        self.end_pip = np.full((n_games, MAX_ENDS), -1, dtype=np.int8)
+        self.end_kind = np.zeros((n_games, MAX_ENDS), dtype=np.int8)
+        self.end_value = np.zeros((n_games, MAX_ENDS), dtype=np.int16)
+        # When each end was opened, and how many open ends show each pip
+        self.end_order = np.zeros((n_games, MAX_ENDS), dtype=np.int32)
+        self.end_count = np.zeros((n_games, N_PIPS), dtype=np.int8)
+        self.board_empty = np.ones(n_games, dtype=bool)
+
+        for player in range(2):
+            players = np.full(n_games, player)
+            for position in range(player * HAND_SIZE, (player + 1) * HAND_SIZE):
+                self.add_tiles(games, players, decks[:, position])
+
+        self.scores = np.zeros((n_games, 2), dtype=np.int32)
+        self.turn = turns
+        self.passes = np.zeros(n_games, dtype=np.int8)
+        self.done = np.zeros(n_games, dtype=bool)
+        self.blocked = np.zeros(n_games, dtype=bool)
+        self.move_count = np.zeros(n_games, dtype=np.int32)
+        self.turn_count = np.zeros(n_games, dtype=np.int32)
+
+    def next_order(self) -> int:
+        self.counter += 1
+        return self.counter
+
+    def add_tiles(self, games: np.ndarray, players: np.ndarray, tiles: np.ndarray):
+        # Like Hand.add_domino, a pip no side in hand shows gets a new key,
+        # the lower half's before the higher's
+        self.arrival[games, players, tiles] = self.next_order()
+        self.hand_size[games, players] += 1
+        self.hand_pips[games, players] += TILE_PIPS[tiles]
+        for pips in (TILE_A[tiles], TILE_B[tiles]):
+            new = self.pip_count[games, players, pips] == 0
+            self.pip_order[games[new], players[new], pips[new]] = self.next_order()
+            self.pip_count[games, players, pips] += 1
+
+    def remove_tiles(self, games: np.ndarray, players: np.ndarray, tiles: np.ndarray):
+        self.arrival[games, players, tiles] = NOT_IN_HAND
+        self.hand_size[games, players] -= 1
+        self.hand_pips[games, players] -= TILE_PIPS[tiles]
+        self.pip_count[games, players, TILE_A[tiles]] -= 1
+        self.pip_count[games, players, TILE_B[tiles]] -= 1
+
+    def get_playable_pips(self, games: np.ndarray) -> np.ndarray:
+        # playable[i, pip] for the player to move in each of games
+        in_hand = self.pip_count[games, self.turn[games]] > 0
+        return in_hand & (self.end_count[games] > 0)
+
+    def draw(self, games: np.ndarray):
+        tiles = self.deck[games, self.next_draw[games]]
+        self.next_draw[games] += 1
+        self.add_tiles(games, self.turn[games], tiles)
+
+    def bone_pile(self, games: np.ndarray):
+        # Draw one tile at a time for every game whose player cannot move
+        # until all of them can or their boneyards are empty
+        while True:
+            stuck = games[~self.board_empty[games]]
+            stuck = stuck[~self.get_playable_pips(stuck).any(axis=1)]
+            stuck = stuck[self.next_draw[stuck] < N_TILES]
+            if len(stuck) == 0:
+                return
+            self.draw(stuck)
+
+    def open_ends(self, games: np.ndarray, slots: np.ndarray, pip, kind, value):
+        self.end_pip[games, slots] = pip
+        self.end_kind[games, slots] = kind
+        self.end_value[games, slots] = value
+        self.end_order[games, slots] = self.next_order()
+        self.end_count[games, pip] += 1
+
+    def add_ends(self, games: np.ndarray, count: int, pip, kind: int, value):
+        # Put count new ends in the first empty slots of each game
+        for _ in range(count):
+            slots = np.argmax(self.end_kind[games] == EMPTY, axis=1)
+            self.open_ends(games, slots, pip, kind, value)
+
+    def play_roots(self, games: np.ndarray, tiles: np.ndarray):
+        low = TILE_A[tiles]
+        high = TILE_B[tiles]
+        kind = np.where(TILE_IS_DOUBLE[tiles], ROOT_MID_END, REGULAR_END)
+        self.open_ends(games, np.zeros_like(games), low, kind, low)
+        self.open_ends(games, np.ones_like(games), high, kind, high)
+        self.board_empty[games] = False
+
+    def play_leaves(self, games: np.ndarray, tiles: np.ndarray, ends: np.ndarray):
+        pip = self.end_pip[games, ends]
+        old_kind = self.end_kind[games, ends]
+        low = TILE_A[tiles]
+        high = TILE_B[tiles]
+        double = TILE_IS_DOUBLE[tiles]
+        other = np.where(low == pip, high, low)
+        self.end_count[games, pip] -= 1
+
+        # Covering the last mid side of a double opens its two end sides,
+        # which DominoBoard opens before the new tile's side
+        opened = old_kind == SINGLE_MID_END
+        if opened.any():
+            self.add_ends(games[opened], 2, pip[opened], DOUBLE_END, 0)
+
+        # The covered end is replaced by the new tile's open side
+        self.open_ends(
+            games,
+            ends,
+            other,
+            np.where(double, SINGLE_MID_END, REGULAR_END),
+            np.where(double, 2 * low, other),
+        )
+
+        # Covering one mid side of a root double doubles the other's value
+        root = old_kind == ROOT_MID_END
+        if root.any():
+            root_games = games[root]
+            sibling = np.argmax(self.end_kind[root_games] == ROOT_MID_END, axis=1)
+            self.end_kind[root_games, sibling] = SINGLE_MID_END
+            self.end_value[root_games, sibling] *= 2
+
+    def step(self):
+        games = self.games[~self.done]
+        self.turn_count[games] += 1
+        self.bone_pile(games)
+
+        players = self.turn[games]
+        roots = self.board_empty[games]
+        playable = self.get_playable_pips(games)
+        can_play = roots | playable.any(axis=1)
+
+        # Pass, ending the game once both players have passed in a row
+        passing = games[~can_play]
+        self.passes[passing] += 1
+        blocked = passing[self.passes[passing] == 2]
+        self.blocked[blocked] = True
+        self.done[blocked] = True
+        self.turn[passing] = 1 - self.turn[passing]
+
+        games = games[can_play]
+        players = players[can_play]
+        roots = roots[can_play]
+        pips = np.argmin(
+            np.where(playable[can_play], self.pip_order[games, players], NOT_IN_HAND),
+            axis=1,
+        )
+        # A root can be any tile in hand
+        fits = TILE_HAS_PIP[pips] | roots[:, None]
+        tiles = np.argmin(
+            np.where(fits, self.arrival[games, players], NOT_IN_HAND), axis=1
+        )
+        matching_ends = (self.end_kind[games] != EMPTY) & (
+            self.end_pip[games] == pips[:, None]
+        )
+        ends = np.argmin(
+            np.where(matching_ends, self.end_order[games], NOT_IN_HAND), axis=1
+        )
+
+        self.play_roots(games[roots], tiles[roots])
+        self.play_leaves(games[~roots], tiles[~roots], ends[~roots])
+        self.remove_tiles(games, players, tiles)
+        self.passes[games] = 0
+        self.move_count[games] += 1
+
+        score = self.end_value[games].sum(axis=1)
+        scored = score % 5 == 0
+        self.scores[games, players] += np.where(scored, score // 5, 0)
+
+        went_out = self.hand_size[games, players] == 0
+        finished = games[went_out]
+        leftover = self.hand_pips[finished, 1 - players[went_out]]
+        self.scores[finished, players[went_out]] += np.maximum(leftover // 5, 1)
+        self.done[finished] = True
+
+        next_turn = ~went_out & ~TILE_IS_DOUBLE[tiles] & ~scored
+        self.turn[games[next_turn]] = 1 - players[next_turn]
+
+    def run(self) -> BatchResult:
+        while not self.done.all():
+            self.step()
+        return BatchResult(self.scores, self.move_count, self.turn_count, self.blocked)
+
+
+def simulate_batch(
+    n_games: int, seed: Optional[int] = None, batch_size: int = 10000
+) -> BatchResult:
+    # Games are advanced batch_size at a time to bound memory
+    rng = np.random.default_rng(seed)
+    results = []
+    for start in range(0, n_games, batch_size):
+        results.append(BatchGames(min(batch_size, n_games - start), rng).run())
+    return BatchResult(
+        np.concatenate([result.scores for result in results]),
+        np.concatenate([result.move_count for result in results]),
+        np.concatenate([result.turn_count for result in results]),
+        np.concatenate([result.blocked for result in results]),
+    )
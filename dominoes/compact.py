@@ -0,0 +1,274 @@
+from array import array
+from typing import List, Optional, Tuple
+
+from .domino import Domino, DominoBoard, DominoSide, DoubleDomino
+from .player import Hand
+from .tables import (
+    MID_SIDE1,
+    MID_SIDE2,
+    SIDE1,
+    SIDE2,
+    SIDES_PER_TILE,
+    get_move_tables,
+)
+
+# Compact state for the double-six set. Tiles are ints indexing the 28 tiles in
+# DominoSet order, a side of a placed tile is an "endpoint id" of
+# tile * 4 + side index, and hands are bitmasks with bit n set for tile n.
+MAX_NUMBER = 6
+DOUBLE_SIX = get_move_tables(0, MAX_NUMBER)
+TILES = DOUBLE_SIX.tiles
+TILE_IDS = DOUBLE_SIX.tile_ids
+N_TILES = DOUBLE_SIX.n_tiles
+ALL_TILES_MASK = (1 << N_TILES) - 1
+MAX_ENDS = DOUBLE_SIX.max_ends
+NO_END = -1
+
+# Pip value of every endpoint id, None for the mid sides of non-doubles
+END_PIPS = DOUBLE_SIX.end_pips
+
+tile_id = DOUBLE_SIX.tile_id
+is_double = DOUBLE_SIX.is_double
+
+
+def domino_tile_id(domino: Domino) -> int:
+    return tile_id(domino.side1.value, domino.side2.value)
+
+
+def side_index(side: DominoSide) -> int:
+    domino = side.parent_domino
+    if side is domino.side1:
+        return SIDE1
+    if side is domino.side2:
+        return SIDE2
+    if isinstance(domino, DoubleDomino):
+        if side is domino.mid_side1:
+            return MID_SIDE1
+        if side is domino.mid_side2:
+            return MID_SIDE2
+    raise ValueError("{} does not belong to its parent domino".format(side))
+
+
+def get_side(domino: Domino, index: int) -> DominoSide:
+    if index == SIDE1:
+        return domino.side1
+    if index == SIDE2:
+        return domino.side2
+    if isinstance(domino, DoubleDomino):
+        if index == MID_SIDE1:
+            return domino.mid_side1
+        if index == MID_SIDE2:
+            return domino.mid_side2
+    raise ValueError("{} has no side {}".format(domino, index))
+
+
+def endpoint_id(side: DominoSide) -> int:
+    return domino_tile_id(side.parent_domino) * SIDES_PER_TILE + side_index(side)
+
+
+def hand_to_mask(hand: Hand) -> int:
+    mask = 0
+    for domino in hand:
+        mask |= 1 << domino_tile_id(domino)
+    return mask
+
+
+def mask_to_tiles(mask: int) -> List[int]:
+    return [tile for tile in range(N_TILES) if mask >> tile & 1]
+
+
+def mask_to_hand(mask: int, dominoes: List[Domino]) -> Hand:
+    # dominoes is indexed by tile id, e.g. DominoSet().dominoes
+    return Hand([dominoes[tile] for tile in mask_to_tiles(mask)])
+
+
+class CompactBoard:
+    def __init__(self):
+        # Bit n of connected[tile] is set once side n of the tile is covered
+        self.connected = bytearray(N_TILES)
+        self.on_board = 0
+        self.ends = array("b", [NO_END] * MAX_ENDS)
+        self.n_ends = 0
+        # get_score(), kept up to date by add() through the move tables
+        self.score = 0
+        # (tile, endpoint id played on, attach side index) in play order. The
+        # root is stored with NO_END for both.
+        self.placements: List[Tuple[int, int, int]] = []
+
+    def __repr__(self):
+        return "CompactBoard(ends={})".format(self.get_end_pips())
+
+    def copy(self) -> "CompactBoard":
+        board = CompactBoard.__new__(CompactBoard)
+        board.connected = bytearray(self.connected)
+        board.on_board = self.on_board
+        board.ends = array("b", self.ends)
+        board.n_ends = self.n_ends
+        board.score = self.score
+        board.placements = list(self.placements)
+        return board
+
+    def get_ends(self) -> List[int]:
+        return list(self.ends[: self.n_ends])
+
+    def get_end_pips(self) -> List[int]:
+        return [END_PIPS[end] for end in self.ends[: self.n_ends]]
+
+    def playable_sides(self, tile: int) -> List[int]:
+        # Mirrors Domino.get_playable_sides / DoubleDomino.get_playable_sides
+        connected = self.connected[tile]
+        if is_double(tile) and (connected & 0b1100) != 0b1100:
+            candidates = (MID_SIDE1, MID_SIDE2)
+        else:
+            candidates = (SIDE1, SIDE2)
+        return [side for side in candidates if not connected >> side & 1]
+
+    def value_in_play(self, tile: int) -> int:
+        low, high = TILES[tile]
+        if low == high:
+            return 0 if self.connected[tile] & 0b1100 == 0b1100 else 2 * low
+        return sum(TILES[tile][side] for side in self.playable_sides(tile))
+
+    def get_score(self) -> int:
+        return self.score
+
+    def compute_score(self) -> int:
+        # get_score() from scratch, as DominoBoard.compute_score
+        in_play = set(end // SIDES_PER_TILE for end in self.ends[: self.n_ends])
+        return sum(self.value_in_play(tile) for tile in in_play)
+
+    def refresh_ends(self, tiles: Tuple[int, ...]):
+        kept = [
+            end
+            for end in self.ends[: self.n_ends]
+            if end // SIDES_PER_TILE not in tiles
+        ]
+        for tile in tiles:
+            kept.extend(
+                tile * SIDES_PER_TILE + side for side in self.playable_sides(tile)
+            )
+        assert len(kept) <= MAX_ENDS, "Too many open ends"
+        self.n_ends = len(kept)
+        self.ends[: self.n_ends] = array("b", kept)
+        for idx in range(self.n_ends, MAX_ENDS):
+            self.ends[idx] = NO_END
+
+    def add(self, tile: int, endpoint: int = NO_END, attach: int = NO_END):
+        assert not self.on_board >> tile & 1, "Tile already on the board"
+        self.on_board |= 1 << tile
+        self.placements.append((tile, endpoint, attach))
+        if endpoint == NO_END:
+            assert self.n_ends == 0, "Need endpoint and attachpoint if not root"
+            self.refresh_ends((tile,))
+            self.score = sum(TILES[tile])
+            return
+
+        assert endpoint in self.ends[: self.n_ends], "Not a valid endpoint"
+        assert (
+            END_PIPS[endpoint] == END_PIPS[tile * SIDES_PER_TILE + attach]
+        ), "Not a valid move"
+        endpoint_tile = endpoint // SIDES_PER_TILE
+        attachment = next(
+            attachment
+            for attachment in DOUBLE_SIX.get_tile_attachments(tile, END_PIPS[endpoint])
+            if attachment.side == attach
+        )
+        self.score += DOUBLE_SIX.get_score_delta(
+            attachment, endpoint, self.connected[endpoint_tile]
+        )
+        self.connected[endpoint_tile] |= 1 << (endpoint % SIDES_PER_TILE)
+        self.connected[tile] |= 1 << attach
+        self.refresh_ends((endpoint_tile, tile))
+
+    def possible_moves(self, hand_mask: int) -> List[Tuple[int, int, int]]:
+        tiles = mask_to_tiles(hand_mask & ~self.on_board)
+        if self.n_ends == 0:
+            return [(tile, NO_END, NO_END) for tile in tiles]
+
+        moves = []
+        ends = self.ends[: self.n_ends]
+        for tile in tiles:
+            attachments = DOUBLE_SIX.attachments[tile]
+            for end in ends:
+                for attachment in attachments[END_PIPS[end]]:
+                    moves.append((tile, end, attachment.side))
+        return moves
+
+    @classmethod
+    def from_board(cls, board: DominoBoard) -> "CompactBoard":
+        compact = cls()
+        placed = set()
+        for domino in board.dominoes:
+            tile = domino_tile_id(domino)
+            if not placed:
+                compact.add(tile)
+            else:
+                sides = [domino.side1, domino.side2]
+                if isinstance(domino, DoubleDomino):
+                    sides += [domino.mid_side1, domino.mid_side2]
+                attachpoint = next(
+                    side
+                    for side in sides
+                    if side.connection is not None
+                    and id(side.connection.parent_domino) in placed
+                )
+                compact.add(
+                    tile, endpoint_id(attachpoint.connection), side_index(attachpoint)
+                )
+            placed.add(id(domino))
+        return compact
+
+    def to_board(self, dominoes: Optional[List[Domino]] = None) -> DominoBoard:
+        # dominoes is indexed by tile id and must not be on any board yet
+        if dominoes is None:
+            from .game import DominoSet
+
+            dominoes = DominoSet().dominoes
+        board = DominoBoard()
+        for tile, endpoint, attach in self.placements:
+            domino = dominoes[tile]
+            if endpoint == NO_END:
+                board.add_domino(domino)
+            else:
+                board.add_domino(
+                    domino,
+                    get_side(
+                        dominoes[endpoint // SIDES_PER_TILE], endpoint % SIDES_PER_TILE
+                    ),
+                    get_side(domino, attach),
+                )
+        return board
+
+
+class CompactState:
+    def __init__(
+        self,
+        board: CompactBoard,
+        hands: List[int],
+        boneyard: int,
+        scores: List[int],
+        turn: int,
+    ):
+        self.board = board
+        self.hands = hands
+        self.boneyard = boneyard
+        self.scores = scores
+        self.turn = turn
+
+    def __repr__(self):
+        return "CompactState(board={}, hands={}, scores={}, turn={})".format(
+            self.board, [bin(hand) for hand in self.hands], self.scores, self.turn
+        )
+
+    @classmethod
+    def from_game(cls, game) -> "CompactState":
+        boneyard = 0
+        for domino in game.domino_set.dominoes:
+            boneyard |= 1 << domino_tile_id(domino)
+        return cls(
+            CompactBoard.from_board(game.board),
+            [hand_to_mask(player.hand) for player in game.players],
+            boneyard,
+            [player.score for player in game.players],
+            game.turn,
+        )
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
 
 from .graphics import (
     ConnectionDirection,
@@ -6,15 +6,38 @@ from .graphics import (
     DominoGraphic,
     DominoOrientation,
 )
+from .zobrist import (
+    DOUBLE_END_SIDE,
+    MASK,
+    MID_SIDE,
+    REGULAR_SIDE,
+    endpoint_key,
+    score_key,
+)
 
 
 class DominoSide:
+    __slots__ = (
+        "value",
+        "is_endpoint",
+        "connection",
+        "connection_direction",
+        "parent_domino",
+        "_hash",
+    )
+
     def __init__(self, val, domino, connection_direction):
         self.value = val
         self.is_endpoint = False
         self.connection = None
         self.connection_direction = connection_direction
         self.parent_domino: Domino = domino
+        # Hash on fixed properties of the side rather than id() so that set
+        # iteration order over board endpoints is reproducible between runs
+        self._hash = hash((-1 if val is None else val, connection_direction.value))
+
+    def __hash__(self):
+        return self._hash
 
     def __repr__(self):
         return "{}-Side({})".format(self.parent_domino, self.connection_direction.name)
@@ -40,6 +63,8 @@ class DominoSide:
 
 
 class DominoMidSide(DominoSide):
+    __slots__ = ()
+
     def __init__(self, domino, connection_direction):
         super().__init__(None, domino, connection_direction)
 
@@ -48,6 +73,8 @@ class DominoMidSide(DominoSide):
 
 
 class Domino:
+    __slots__ = ("side1", "side2", "orientation", "graphic")
+
     def __init__(self, side1_val, side2_val):
         self.side1 = DominoSide(side1_val, self, ConnectionDirection.Left)
         self.side2 = DominoSide(side2_val, self, ConnectionDirection.Right)
@@ -125,6 +152,8 @@ class Domino:
 
 
 class DoubleDomino(Domino):
+    __slots__ = ("mid_side1", "mid_side2")
+
     def __init__(self, side):
         super().__init__(side, side)
         self.mid_side1 = DominoMidSide(self, ConnectionDirection.Up)
@@ -164,51 +193,168 @@ class DoubleDomino(Domino):
         self.mid_side2.rotate(intervals)
 
 
+# Board coordinates are unbounded in every direction from the root
+ROOT_POSITION = (0, 0)
+
+
+class BoardUndo:
+    # Everything needed to take the last domino back off a DominoBoard
+    __slots__ = (
+        "domino",
+        "score",
+        "position",
+        "endpoint",
+        "endpoint_index",
+        "attachpoint",
+        "rotation",
+        "added_endpoints",
+        "graphic_undo",
+    )
+
+    def __init__(self, domino: Domino, score: int):
+        self.domino = domino
+        self.score = score
+        self.position = (domino.graphic.x_position, domino.graphic.y_position)
+        self.endpoint: Optional[DominoSide] = None
+        # Position of endpoint among the open endpoints of its value
+        self.endpoint_index = 0
+        self.attachpoint: Optional[DominoSide] = None
+        self.rotation = 0
+        self.added_endpoints: List[DominoSide] = []
+        self.graphic_undo = None
+
+
 class DominoBoard:
-    def __init__(self, board_size=100):
+    def __init__(self, *, check_score=False):
         self.root_domino = None
         self.dominoes = []
         self.endpoints = set()
+        # Open endpoints grouped by their playable value, each group in the
+        # order its endpoints were opened. Moves are generated in this order.
+        self.endpoints_by_value: Dict[int, Dict[DominoSide, None]] = {}
+        # Running sum of get_value_in_play() over the dominoes with open
+        # endpoints. check_score makes get_score() verify it from scratch.
+        self.score = 0
+        self.check_score = check_score
+        # Sum of the Zobrist keys of the open endpoints. Endpoints can repeat
+        # (value, kind), so keys are added mod 2**64 rather than XORed.
+        self.endpoint_hash = 0
+
+        self.board_graphic = DominoBoardGraphic()
 
-        self.board_graphic = DominoBoardGraphic(board_size)
-        self.root_x = int(board_size / 2)
-        self.root_y = int(board_size / 2)
+    @staticmethod
+    def get_endpoint_key(endpoint: DominoSide) -> int:
+        if isinstance(endpoint, DominoMidSide):
+            kind = MID_SIDE
+        elif isinstance(endpoint.parent_domino, DoubleDomino):
+            kind = DOUBLE_END_SIDE
+        else:
+            kind = REGULAR_SIDE
+        return endpoint_key(endpoint.get_playable_value(), kind)
+
+    def get_hash(self) -> int:
+        # Hash of the open endpoint values, spinner state and score. Boards
+        # reached through different move orders share a hash.
+        return self.endpoint_hash ^ score_key(self.score)
+
+    def add_endpoint(self, endpoint: DominoSide, index: Optional[int] = None):
+        # index puts the endpoint back where remove_endpoint found it
+        self.endpoints.add(endpoint)
+        self.endpoint_hash = (
+            self.endpoint_hash + self.get_endpoint_key(endpoint)
+        ) & MASK
+        value = endpoint.get_playable_value()
+        same_value = self.endpoints_by_value.get(value)
+        if same_value is None:
+            self.endpoints_by_value[value] = {endpoint: None}
+        elif index is None or index == len(same_value):
+            same_value[endpoint] = None
+        else:
+            ordered = list(same_value)
+            ordered.insert(index, endpoint)
+            self.endpoints_by_value[value] = dict.fromkeys(ordered)
 
-    def add_root_domino(self, domino: Domino):
+    def remove_endpoint(self, endpoint: DominoSide) -> int:
+        # Returns the endpoint's position among those of the same value
+        self.endpoints.remove(endpoint)
+        self.endpoint_hash = (
+            self.endpoint_hash - self.get_endpoint_key(endpoint)
+        ) & MASK
+        value = endpoint.get_playable_value()
+        same_value = self.endpoints_by_value[value]
+        index = 0
+        for other in same_value:
+            if other is endpoint:
+                break
+            index += 1
+        del same_value[endpoint]
+        if not same_value:
+            del self.endpoints_by_value[value]
+        return index
+
+    def get_endpoints_by_value(self, value) -> Collection[DominoSide]:
+        return self.endpoints_by_value.get(value, ())
+
+    def iter_matches(
+        self, sides_by_value: Dict[int, List[DominoSide]]
+    ) -> Iterator[Tuple[DominoSide, DominoSide]]:
+        # Lazily yields (side, endpoint) pairs that can be connected, for sides
+        # grouped by value like Hand.sides_by_value
+        for value, sides in sides_by_value.items():
+            endpoints = self.endpoints_by_value.get(value)
+            if not endpoints:
+                continue
+            for side in sides:
+                for endpoint in endpoints:
+                    yield side, endpoint
+
+    def has_match(self, sides_by_value: Dict[int, List[DominoSide]]) -> bool:
+        # Neither index keeps empty groups, so any shared value is a match
+        return not self.endpoints_by_value.keys().isdisjoint(sides_by_value)
+
+    def add_root_domino(self, domino: Domino) -> BoardUndo:
+        undo = BoardUndo(domino, self.score)
         self.root_domino = domino
         self.dominoes.append(domino)
-        new_endpoints = domino.get_playable_sides()
-        self.endpoints = self.endpoints.union(set(new_endpoints))
+        for endpoint in domino.get_playable_sides():
+            self.add_endpoint(endpoint)
+            undo.added_endpoints.append(endpoint)
+        self.score = domino.get_value_in_play()
 
         # Update graphics
-        self.root_domino.graphic.x_position = self.root_x
-        self.root_domino.graphic.y_position = self.root_y
+        self.root_domino.graphic.x_position = ROOT_POSITION[0]
+        self.root_domino.graphic.y_position = ROOT_POSITION[1]
+
+        return undo
 
     def add_leaf_domino(
         self, domino: Domino, endpoint: DominoSide, attachpoint: DominoSide
-    ):
+    ) -> BoardUndo:
+        undo = BoardUndo(domino, self.score)
+        undo.endpoint = endpoint
+        undo.attachpoint = attachpoint
         self.dominoes.append(domino)
-        self.endpoints.remove(endpoint)
+        undo.endpoint_index = self.remove_endpoint(endpoint)
         endpoint_domino = endpoint.parent_domino
+        # A domino with no playable sides left is worth 0, so the score only
+        # changes by the difference on the two dominoes involved
+        self.score -= endpoint_domino.get_value_in_play()
 
         endpoint.connection = attachpoint
         attachpoint.connection = endpoint
+        self.score += endpoint_domino.get_value_in_play()
+        self.score += domino.get_value_in_play()
 
-        new_endpoints = endpoint_domino.get_playable_sides()
-        self.endpoints = self.endpoints.union(set(new_endpoints))
-        new_endpoints = domino.get_playable_sides()
-        self.endpoints = self.endpoints.union(set(new_endpoints))
+        for new_endpoint in endpoint_domino.get_playable_sides():
+            if new_endpoint not in self.endpoints:
+                self.add_endpoint(new_endpoint)
+                undo.added_endpoints.append(new_endpoint)
+        for new_endpoint in domino.get_playable_sides():
+            self.add_endpoint(new_endpoint)
+            undo.added_endpoints.append(new_endpoint)
 
         # Update graphics
-        endpoint_position = (
-            endpoint_domino.graphic.x_position,
-            endpoint_domino.graphic.y_position,
-        )
-        endpoint_direction = endpoint.connection_direction.value
-        new_position = (
-            endpoint_position[0] + endpoint_direction[0],
-            endpoint_position[1] + endpoint_direction[1],
-        )
+        new_position = self.get_next_position(endpoint)
         domino.graphic.x_position = new_position[0]
         domino.graphic.y_position = new_position[1]
         # rotate incoming domino
@@ -216,15 +362,31 @@ class DominoBoard:
             endpoint.connection_direction, attachpoint.connection_direction
         )
         domino.rotate(rotation_intervals)
+        undo.rotation = rotation_intervals
+
+        return undo
+
+    @staticmethod
+    def get_next_position(endpoint: DominoSide) -> Tuple[int, int]:
+        # The cell a domino played on endpoint is drawn in
+        graphic = endpoint.parent_domino.graphic
+        direction = endpoint.connection_direction.value
+        return (graphic.x_position + direction[0], graphic.y_position + direction[1])
+
+    def would_overlap(self, endpoint: DominoSide) -> bool:
+        # The rules allow it, but a domino played on endpoint would be drawn
+        # over one already on the board
+        return self.board_graphic.is_occupied(*self.get_next_position(endpoint))
 
     def add_domino(
         self,
         domino: Domino,
         endpoint: Optional[DominoSide] = None,
         attachpoint: Optional[DominoSide] = None,
-    ):
+    ) -> BoardUndo:
+        # Returns a token that undo() uses to take this domino back off
         if not self.root_domino:
-            self.add_root_domino(domino)
+            undo = self.add_root_domino(domino)
         else:
             if endpoint is None or attachpoint is None:
                 assert False, "Need endpoint and attachpoint if not root domino"
@@ -232,11 +394,37 @@ class DominoBoard:
             assert (
                 endpoint.get_playable_value() == attachpoint.get_playable_value()
             ), "Not a valid move"
-            self.add_leaf_domino(domino, endpoint, attachpoint)
+            undo = self.add_leaf_domino(domino, endpoint, attachpoint)
 
-        self.board_graphic.add_domino(domino.graphic)
+        undo.graphic_undo = self.board_graphic.add_domino(domino.graphic)
+        return undo
+
+    def undo(self, undo: BoardUndo):
+        domino = undo.domino
+        assert self.dominoes and self.dominoes[-1] is domino, "Can only undo last move"
+
+        self.board_graphic.undo(undo.graphic_undo)
+        self.dominoes.pop()
+        for endpoint in undo.added_endpoints:
+            self.remove_endpoint(endpoint)
+
+        if undo.endpoint is None:
+            self.root_domino = None
+        else:
+            domino.rotate((4 - undo.rotation) % 4)
+            undo.endpoint.connection = None
+            undo.attachpoint.connection = None
+            self.add_endpoint(undo.endpoint, undo.endpoint_index)
+
+        domino.graphic.x_position, domino.graphic.y_position = undo.position
+        self.score = undo.score
 
     def get_score(self):
+        if self.check_score:
+            assert self.score == self.compute_score(), "Running score out of sync"
+        return self.score
+
+    def compute_score(self):
         in_play_dominoes = set([endpoint.parent_domino for endpoint in self.endpoints])
         score = sum([domino.get_value_in_play() for domino in in_play_dominoes])
 
@@ -0,0 +1,253 @@
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from .domino import DominoBoard
+from .features import DTYPE, FEATURE_INDEX, N_FEATURES, move_features
+from .player import Hand, Move, Player, RandomPlayer
+from .simulation import SimulationResult, game_rng, play_headless_game
+
+# Scores a (rows, N_FEATURES) array of features, one value per row
+Model = Callable[[np.ndarray], np.ndarray]
+# Weight given to the pips left in hand by the heuristic evaluator, as in
+# search.HAND_WEIGHT
+HAND_WEIGHT = 0.05
+
+
+class LinearEvaluator:
+    def __init__(self, weights: np.ndarray, bias: float = 0.0):
+        self.weights = np.asarray(weights, dtype=DTYPE)
+        assert self.weights.shape == (N_FEATURES,), "Need one weight per feature"
+        self.bias = DTYPE(bias)
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        return features @ self.weights + self.bias
+
+    @classmethod
+    def heuristic(cls) -> "LinearEvaluator":
+        # Score difference after the move, less a little for pips kept in hand
+        weights = np.zeros(N_FEATURES, dtype=DTYPE)
+        weights[FEATURE_INDEX["score"]] = 1
+        weights[FEATURE_INDEX["opponent_score"]] = -1
+        weights[FEATURE_INDEX["hand_total"]] = -HAND_WEIGHT
+        return cls(weights)
+
+
+class MLPEvaluator:
+    # ReLU hidden layers followed by a linear layer with a single output
+    def __init__(self, layers: Sequence[Tuple[np.ndarray, np.ndarray]]):
+        self.layers = [
+            (np.asarray(weights, dtype=DTYPE), np.asarray(bias, dtype=DTYPE))
+            for weights, bias in layers
+        ]
+        assert self.layers[0][0].shape[0] == N_FEATURES, "Need one input per feature"
+        assert self.layers[-1][0].shape[1] == 1, "Need a single output"
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        values = features
+        for weights, bias in self.layers[:-1]:
+            values = np.maximum(values @ weights + bias, 0)
+        weights, bias = self.layers[-1]
+        return (values @ weights + bias)[:, 0]
+
+    @classmethod
+    def random(
+        cls, hidden: Sequence[int] = (64, 64), seed: Optional[int] = None
+    ) -> "MLPEvaluator":
+        # He-initialized weights, for testing and benchmarking
+        rng = np.random.default_rng(seed)
+        sizes = [N_FEATURES, *hidden, 1]
+        return cls(
+            [
+                (
+                    rng.normal(0, np.sqrt(2 / n_in), (n_in, n_out)),
+                    np.zeros(n_out),
+                )
+                for n_in, n_out in zip(sizes, sizes[1:])
+            ]
+        )
+
+
+class EvaluationRequest:
+    __slots__ = ("features", "result", "done")
+
+    def __init__(self, features: np.ndarray):
+        self.features = features
+        self.result = None
+        self.done = threading.Event()
+
+
+class BatchEvaluator:
+    """Scores features from many threads with one model call per batch.
+
+    Callers block in evaluate() while a worker thread gathers their requests.
+    A batch is scored once it holds max_batch requests, or max_wait seconds
+    after its first request arrived, so max_batch should be about the number
+    of games in flight. Each request may hold any number of rows.
+    """
+
+    def __init__(self, model: Model, max_batch: int = 64, max_wait: float = 0.002):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests: queue.Queue = queue.Queue()
+        # Held while checking closed and queueing, so no request can be
+        # queued behind the sentinel close() sends to the worker
+        self.lock = threading.Lock()
+        self.closed = False
+        self.batches = 0
+        self.requests_scored = 0
+        self.rows_scored = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        return self.evaluate(features)
+
+    @property
+    def mean_batch(self) -> float:
+        return self.requests_scored / self.batches if self.batches else 0.0
+
+    def evaluate(self, features: np.ndarray) -> np.ndarray:
+        request = EvaluationRequest(features)
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("BatchEvaluator is closed")
+            self.requests.put(request)
+        request.done.wait()
+        if isinstance(request.result, BaseException):
+            raise request.result
+        return request.result
+
+    def gather(self, first: EvaluationRequest) -> Tuple[List[EvaluationRequest], bool]:
+        # The batch starting with first, and whether close() was called
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                request = self.requests.get(
+                    timeout=max(deadline - time.perf_counter(), 0)
+                )
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def score(self, batch: List[EvaluationRequest]):
+        # Every caller in the batch is woken, or it would wait forever. Model
+        # errors are raised in the callers. Anything else, such as SystemExit,
+        # propagates in the worker and callers get a RuntimeError.
+        n_rows = sum(len(r.features) for r in batch)
+        results: list = [RuntimeError("Batch was not scored")] * len(batch)
+        try:
+            values = self.model(np.concatenate([r.features for r in batch]))
+            if len(values) != n_rows:
+                raise ValueError(
+                    "Model returned {} values for {} rows".format(len(values), n_rows)
+                )
+            splits = np.cumsum([len(r.features) for r in batch[:-1]])
+            results = np.split(values, splits)
+        except Exception as error:
+            results = [error] * len(batch)
+        finally:
+            self.batches += 1
+            self.requests_scored += len(batch)
+            self.rows_scored += n_rows
+            for request, result in zip(batch, results):
+                request.result = result
+                request.done.set()
+
+    def run(self):
+        try:
+            closed = False
+            while not closed:
+                first = self.requests.get()
+                if first is None:
+                    return
+                batch, closed = self.gather(first)
+                self.score(batch)
+        finally:
+            # Once the worker stops, queued requests fail and new ones are
+            # refused rather than waiting forever
+            with self.lock:
+                self.closed = True
+            while True:
+                try:
+                    request = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is not None:
+                    request.result = RuntimeError("BatchEvaluator worker stopped")
+                    request.done.set()
+
+    def close(self):
+        # Requests queued before close() are still scored
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.requests.put(None)
+        self.thread.join()
+
+
+class EvaluatorPlayer(Player):
+    """Plays the move whose resulting position the evaluator scores highest.
+
+    evaluator is a Model, or a BatchEvaluator shared with other games.
+    """
+
+    def __init__(
+        self,
+        hand: Hand,
+        name: str = "player",
+        evaluator: Optional[Model] = None,
+    ):
+        super().__init__(hand, name)
+        self.evaluator = evaluator or LinearEvaluator.heuristic()
+
+    def choose_next_move(self, board: DominoBoard):
+        moves = self.get_possible_moves(board)
+        if len(moves) == 0:
+            return Move()
+        if len(moves) == 1:
+            return moves[0]
+        values = self.evaluator(move_features(self, board, moves))
+        return moves[int(np.argmax(values))]
+
+
+def play_evaluated_games(
+    model: Model,
+    n_games: int,
+    concurrency: int = 1,
+    seed: int = 0,
+    opponent_cls: Type[Player] = RandomPlayer,
+    max_wait: float = 0.002,
+) -> Tuple[SimulationResult, BatchEvaluator]:
+    # Plays n_games of EvaluatorPlayer against opponent_cls with concurrency
+    # games in flight, all sharing one BatchEvaluator
+    start = time.perf_counter()
+    with BatchEvaluator(model, concurrency, max_wait) as evaluator:
+        player_cls = functools.partial(EvaluatorPlayer, evaluator=evaluator)
+        with ThreadPoolExecutor(concurrency) as executor:
+            games = list(
+                executor.map(
+                    lambda i: play_headless_game(
+                        player_cls, opponent_cls, game_rng(seed, i)
+                    ),
+                    range(n_games),
+                )
+            )
+    return SimulationResult(games, time.perf_counter() - start), evaluator
@@ -0,0 +1,121 @@
+from typing import List, Optional
+
+import numpy as np
+
+from .compact import N_TILES, domino_tile_id
+from .domino import DominoBoard
+from .player import Hand, Move, Player
+
+# Fixed-width features of a position from the point of view of the player to
+# move, as raw counts. Layout:
+#   open_pips_0..6   open ends showing each pip
+#   tile_0..27       1 for each tile id in the hand
+#   hand_pips_0..6   sides in the hand showing each pip, doubles counted twice
+#   board_mod5_0..4  one-hot board score mod 5
+#   then the scalars below
+N_PIPS = 7
+MOD = 5
+OPEN_PIPS = 0
+HAND_TILES = OPEN_PIPS + N_PIPS
+HAND_PIPS = HAND_TILES + N_TILES
+BOARD_MOD5 = HAND_PIPS + N_PIPS
+SCALAR_NAMES = [
+    "open_ends",
+    "board_score",
+    # Points the board is worth to the player who just made it
+    "board_points",
+    "hand_size",
+    "hand_total",
+    "boneyard_size",
+    "opponent_hand_size",
+    "score",
+    "opponent_score",
+]
+FEATURE_NAMES = (
+    ["open_pips_{}".format(pip) for pip in range(N_PIPS)]
+    + ["tile_{}".format(tile) for tile in range(N_TILES)]
+    + ["hand_pips_{}".format(pip) for pip in range(N_PIPS)]
+    + ["board_mod5_{}".format(value) for value in range(MOD)]
+    + SCALAR_NAMES
+)
+N_FEATURES = len(FEATURE_NAMES)
+FEATURE_INDEX = {name: index for index, name in enumerate(FEATURE_NAMES)}
+DTYPE = np.float32
+
+
+def get_board_points(score: int) -> int:
+    return score // MOD if score % MOD == 0 else 0
+
+
+def set_board_features(out: np.ndarray, board: DominoBoard):
+    out[OPEN_PIPS : OPEN_PIPS + N_PIPS] = 0
+    for endpoint in board.endpoints:
+        out[OPEN_PIPS + endpoint.get_playable_value()] += 1
+    score = board.get_score()
+    out[BOARD_MOD5 : BOARD_MOD5 + MOD] = 0
+    out[BOARD_MOD5 + score % MOD] = 1
+    out[FEATURE_INDEX["open_ends"]] = len(board.endpoints)
+    out[FEATURE_INDEX["board_score"]] = score
+    out[FEATURE_INDEX["board_points"]] = get_board_points(score)
+
+
+def set_hand_features(out: np.ndarray, hand: Hand):
+    out[HAND_TILES : HAND_PIPS + N_PIPS] = 0
+    for domino in hand:
+        out[HAND_TILES + domino_tile_id(domino)] = 1
+        out[HAND_PIPS + domino.side1.value] += 1
+        out[HAND_PIPS + domino.side2.value] += 1
+    out[FEATURE_INDEX["hand_size"]] = len(hand)
+    out[FEATURE_INDEX["hand_total"]] = hand.total
+
+
+def extract_features(
+    board: DominoBoard,
+    hand: Hand,
+    boneyard_size: int,
+    opponent_hand_size: int,
+    score: int,
+    opponent_score: int,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    if out is None:
+        out = np.zeros(N_FEATURES, dtype=DTYPE)
+    set_board_features(out, board)
+    set_hand_features(out, hand)
+    out[FEATURE_INDEX["boneyard_size"]] = boneyard_size
+    out[FEATURE_INDEX["opponent_hand_size"]] = opponent_hand_size
+    out[FEATURE_INDEX["score"]] = score
+    out[FEATURE_INDEX["opponent_score"]] = opponent_score
+    return out
+
+
+def get_player_features(player: Player, board: DominoBoard) -> np.ndarray:
+    # Features of the current position from what player has observed. With
+    # several opponents the next player's hand and the best score are used.
+    return extract_features(
+        board,
+        player.hand,
+        player.boneyard_size or 0,
+        player.opponent_hand_sizes[0] if player.opponent_hand_sizes else 0,
+        player.score,
+        max(player.opponent_scores, default=0),
+    )
+
+
+def move_features(player: Player, board: DominoBoard, moves: List[Move]) -> np.ndarray:
+    # Features of the position after each move, one row per move. Each move
+    # is played on board and undone, so board is unchanged afterwards.
+    rows = np.tile(get_player_features(player, board), (len(moves), 1))
+    for row, move in zip(rows, moves):
+        domino = move.domino_to_play
+        undo = board.add_domino(domino, move.side_on_board, move.side_to_play)
+        set_board_features(row, board)
+        board.undo(undo)
+
+        row[HAND_TILES + domino_tile_id(domino)] = 0
+        row[HAND_PIPS + domino.side1.value] -= 1
+        row[HAND_PIPS + domino.side2.value] -= 1
+        row[FEATURE_INDEX["hand_size"]] -= 1
+        row[FEATURE_INDEX["hand_total"]] -= domino.side1.value + domino.side2.value
+    rows[:, FEATURE_INDEX["score"]] += rows[:, FEATURE_INDEX["board_points"]]
+    return rows
@@ -1,11 +1,22 @@
-from random import randint, sample
+import random
+from collections.abc import Sequence
+from typing import List, Optional
 
 from .domino import Domino, DominoBoard, DoubleDomino
-from .player import Hand, Player
+from .graphics import TerminalRenderer
+from .player import Hand, Move, Player
 
 
 class DominoSet:
-    def __init__(self, min_number=0, max_number=6):
+    def __init__(self, min_number=0, max_number=6, rng=None, seed=None):
+        # rng is anything with the random.Random interface, defaulting to a
+        # generator seeded with seed, or the global random module
+        if rng is None:
+            rng = random if seed is None else random.Random(seed)
+        self.rng = rng
+        # The boneyard is shuffled once on the first random draw and then
+        # dealt from the end, so until then dominoes stay in canonical order
+        self.shuffled = False
         self.dominoes = []
         for i in range(min_number, max_number + 1, 1):
             for j in range(i, max_number + 1, 1):
@@ -15,15 +26,13 @@ class DominoSet:
                     self.dominoes.append(Domino(i, j))
 
     def draw_hand(self, hand_size):
-        selected_dominoes = sample(self.dominoes, hand_size)
-        for domino in selected_dominoes:
-            self.dominoes.remove(domino)
-        return Hand(selected_dominoes)
+        return Hand([self.draw_single() for _ in range(hand_size)])
 
     def draw_single(self):
-        selected_domino = sample(self.dominoes, 1)[0]
-        self.dominoes.remove(selected_domino)
-        return selected_domino
+        if not self.shuffled:
+            self.rng.shuffle(self.dominoes)
+            self.shuffled = True
+        return self.dominoes.pop()
 
     def draw_fixed_hand(self, idxs):
         selected_dominoes = []
@@ -34,21 +43,136 @@ class DominoSet:
         return Hand(selected_dominoes)
 
 
-class GameTwoPlayer:
-    def __init__(self, player1: Player, player2: Player):
-        self.domino_set = DominoSet()
+class GameResult:
+    def __init__(
+        self,
+        scores: List[int],
+        move_count: int,
+        turn_count: int,
+        blocked: bool,
+        team_scores: Optional[List[int]] = None,
+    ):
+        self.scores = scores
+        self.move_count = move_count
+        self.turn_count = turn_count
+        self.blocked = blocked
+        # Scores by team, the same as scores when every player is on their own
+        self.team_scores = scores if team_scores is None else team_scores
+
+    def __repr__(self):
+        return "GameResult(winner={}, scores={}, moves={}, turns={})".format(
+            self.winner, self.scores, self.move_count, self.turn_count
+        )
+
+    @staticmethod
+    def get_best(scores: List[int]) -> Optional[int]:
+        best = max(scores)
+        if scores.count(best) > 1:
+            return None
+        return scores.index(best)
+
+    @property
+    def winner(self) -> Optional[int]:
+        # Index of the winning player, None for a tie
+        return self.get_best(self.scores)
+
+    @property
+    def winning_team(self) -> Optional[int]:
+        return self.get_best(self.team_scores)
+
+
+class OpponentHandSizes(Sequence):
+    # Live view of the other players' hand sizes in turn order, starting with
+    # the next player, so observing costs the same for any number of players
+    def __init__(self, players: List[Player], index: int):
+        self.players = players
+        self.index = index
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __len__(self):
+        return len(self.players) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("opponent index out of range")
+        return self.get(self.players[(self.index + 1 + i) % len(self.players)])
+
+    def get(self, player: Player) -> int:
+        return len(player.hand)
+
+
+class OpponentScores(OpponentHandSizes):
+    # Live view of the other players' scores in the same order
+    def get(self, player: Player) -> int:
+        return player.score
+
+
+class Game:
+    """Block game of muggins for any number of players, optionally in teams.
+
+    teams gives each player's team index, e.g. [0, 1, 0, 1] for partners
+    sitting opposite each other, and defaults to every player on their own.
+    Points go to the player who scores them, and team scores are the sums of
+    their members', in order of team index. A player going out scores the pips left in the other
+    teams' hands.
+    """
+
+    def __init__(
+        self,
+        players: List[Player],
+        teams: Optional[List[int]] = None,
+        hand_size: int = 7,
+        min_number: int = 0,
+        max_number: int = 6,
+        verbose: bool = True,
+        rng: Optional[random.Random] = None,
+        renderer: Optional[TerminalRenderer] = None,
+    ):
+        self.rng = rng if rng is not None else random
+        # Redraws the board and scores in place after every move, for
+        # spectating without the verbose per-turn output
+        self.renderer = renderer
+        self.domino_set = DominoSet(min_number, max_number, rng=self.rng)
+        if len(players) * hand_size > len(self.domino_set.dominoes):
+            raise ValueError(
+                "Cannot deal {} hands of {} from {} dominoes".format(
+                    len(players), hand_size, len(self.domino_set.dominoes)
+                )
+            )
         self.board = DominoBoard()
-        self.players = [player1, player2]
-        self.turn = randint(0, 1)
+        self.players = players
+        self.teams = list(range(len(players))) if teams is None else teams
+        assert len(self.teams) == len(players), "Need a team for every player"
+        # Team indices need not be contiguous, e.g. [0, 2, 0, 2]
+        self.team_ids = sorted(set(self.teams))
+        self.n_teams = len(self.team_ids)
+        self.turn = self.rng.randrange(len(players))
+        self.verbose = verbose
+
+        self.show_hands = [verbose] * len(players)
 
-        # TODO: make configurable
-        self.show_hands = [True, True]
+        self.move_count = 0
+        self.turn_count = 0
+        self.consecutive_passes = 0
+        self.blocked = False
 
         for player in self.players:
-            player.draw_new_hand(self.domino_set.draw_hand(7))
+            player.draw_new_hand(self.domino_set.draw_hand(hand_size))
+        self.opponent_hand_sizes = [
+            OpponentHandSizes(self.players, index) for index in range(len(players))
+        ]
+        self.opponent_scores = [
+            OpponentScores(self.players, index) for index in range(len(players))
+        ]
 
     def bone_pile(self, player: Player):
-        while len(player.get_possible_moves(self.board)) == 0:
+        while not player.has_possible_move(self.board):
             if len(self.domino_set.dominoes) == 0:
                 return
             new_domino = self.domino_set.draw_single()
@@ -58,48 +182,121 @@ class GameTwoPlayer:
         for player in self.players:
             print("{}: {}".format(player.name, player.score))
 
-    def play(self):
+    def render_frame(self) -> List[str]:
+        lines = self.board.board_graphic.render_lines()
+        lines.append("")
+        lines.extend(
+            "{}: {}".format(player.name, player.score) for player in self.players
+        )
+        return lines
 
-        while True:
-            turn_player = self.players[self.turn]
+    def get_team_scores(self) -> List[int]:
+        team_scores = dict.fromkeys(self.team_ids, 0)
+        for player, team in zip(self.players, self.teams):
+            team_scores[team] += player.score
+        return list(team_scores.values())
+
+    def get_leftover_points(self, team: int) -> int:
+        # Runs once per game. Hand totals are kept up to date by Hand itself.
+        leftover = sum(
+            player.hand.total
+            for player, player_team in zip(self.players, self.teams)
+            if player_team != team
+        )
+        return max(leftover // 5, 1)
+
+    def get_result(self) -> GameResult:
+        return GameResult(
+            [player.score for player in self.players],
+            self.move_count,
+            self.turn_count,
+            self.blocked,
+            self.get_team_scores(),
+        )
+
+    def begin_turn(self) -> Player:
+        # Draws from the bone pile if needed and returns the player to move
+        turn_player = self.players[self.turn]
+        self.turn_count += 1
+        if self.show_hands[self.turn]:
+            print(turn_player.name)
+            turn_player.hand.hand_graphic.draw_hand()
+
+        if not turn_player.has_possible_move(self.board):
+            self.bone_pile(turn_player)
             if self.show_hands[self.turn]:
-                print(turn_player.name)
                 turn_player.hand.hand_graphic.draw_hand()
-            # import pdb; pdb.set_trace()
 
-            if len(turn_player.get_possible_moves(self.board)) == 0:
-                self.bone_pile(turn_player)
-                if self.show_hands[self.turn]:
-                    turn_player.hand.hand_graphic.draw_hand()
+        turn_player.observe(
+            len(self.domino_set.dominoes),
+            self.opponent_hand_sizes[self.turn],
+            self.opponent_scores[self.turn],
+        )
+        return turn_player
 
-            move = turn_player.choose_next_move(self.board)
-            self.board.add_domino(
-                move.domino_to_play, move.side_on_board, move.side_to_play
-            )
-            turn_player.hand.remove_domino(move.domino_to_play)
+    def apply_move(self, move: Move) -> bool:
+        # Plays the move for the player returned by begin_turn and returns
+        # True once the game is over
+        turn_player = self.players[self.turn]
+        if move.is_pass_move:
+            # Nobody can play and the bone pile is empty
+            self.consecutive_passes += 1
+            if self.consecutive_passes == len(self.players):
+                self.blocked = True
+                if self.verbose:
+                    print("Game Blocked")
+                return True
+            self.turn = (self.turn + 1) % len(self.players)
+            return False
+        self.consecutive_passes = 0
+
+        self.board.add_domino(
+            move.domino_to_play, move.side_on_board, move.side_to_play
+        )
+        turn_player.hand.remove_domino(move.domino_to_play)
+        self.move_count += 1
 
-            score = self.board.get_score()
-            if score % 5 == 0:
-                turn_player.score += score // 5
+        score = self.board.get_score()
+        if score % 5 == 0:
+            turn_player.score += score // 5
 
+        if self.verbose:
             self.board.board_graphic.draw_board()
             self.print_scores()
+        if self.renderer is not None:
+            self.renderer.draw(self.render_frame())
 
-            if isinstance(move.domino_to_play, DoubleDomino) or score % 5 == 0:
-                continue
-
-            if len(turn_player.hand.dominoes) == 0:
-                leftover_points = max(
-                    sum([player.hand.get_total_value() for player in self.players])
-                    // 5,
-                    1,
-                )
-                turn_player.score += leftover_points
+        if len(turn_player.hand) == 0:
+            turn_player.score += self.get_leftover_points(self.teams[self.turn])
+            if self.verbose:
                 self.print_scores()
                 print("Game Over")
-                break
+            return True
 
+        if not isinstance(move.domino_to_play, DoubleDomino) and score % 5 != 0:
             self.turn = (self.turn + 1) % len(self.players)
+        return False
+
+    def play(self) -> GameResult:
+        while True:
+            turn_player = self.begin_turn()
+            move = turn_player.choose_next_move(self.board)
+            if self.apply_move(move):
+                return self.get_result()
+
+
+class GameTwoPlayer(Game):
+    def __init__(
+        self,
+        player1: Player,
+        player2: Player,
+        verbose: bool = True,
+        rng: Optional[random.Random] = None,
+        renderer: Optional[TerminalRenderer] = None,
+    ):
+        super().__init__(
+            [player1, player2], verbose=verbose, rng=rng, renderer=renderer
+        )
 
 
 class GameOnePlayer:
@@ -110,14 +307,9 @@ class GameOnePlayer:
         # self.player_hand = self.domino_set.draw_fixed_hand([18, 21, 26, 20, 19, 23, 24])
 
     def check_valid_moves(self):
-        board_playable_values = [
-            endpoint.get_playable_value() for endpoint in self.board.endpoints
-        ]
-        hand_playable_values = self.player_hand.get_playable_values()
-        for i in board_playable_values:
-            for j in hand_playable_values:
-                if i == j:
-                    return True
+        for value in self.player_hand.sides_by_value:
+            if value in self.board.endpoints_by_value:
+                return True
         return False
 
     def play(self):
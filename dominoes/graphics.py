@@ -1,6 +1,14 @@
+import sys
 from enum import Enum
+from functools import lru_cache
+from typing import List, Optional, TextIO, Tuple
 
 DOMINO_GRID_SIZE = 5
+EMPTY_ROWS = (" " * DOMINO_GRID_SIZE,) * DOMINO_GRID_SIZE
+# ANSI escapes used by TerminalRenderer
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_TO_END_OF_LINE = "\x1b[K"
+CLEAR_TO_END_OF_SCREEN = "\x1b[J"
 
 
 class DominoOrientation(Enum):
@@ -18,14 +26,21 @@ class ConnectionDirection(Enum):
 
 
 class Graphic:
+    __slots__ = ("size",)
+
     def __init__(self, size):
         self.size = size
 
     def draw_graphic(self):
         raise NotImplementedError
 
+    def get_rows(self) -> Tuple[str, ...]:
+        raise NotImplementedError
+
 
 class EmptyGraphic(Graphic):
+    __slots__ = ()
+
     def __init__(self, size):
         super().__init__(size)
 
@@ -37,8 +52,20 @@ class EmptyGraphic(Graphic):
         #       "-----"
         return "     \n" "     \n" "     \n" "     \n" "     \n"
 
+    def get_rows(self) -> Tuple[str, ...]:
+        return EMPTY_ROWS
+
+
+@lru_cache(maxsize=None)
+def get_glyph_rows(val1, val2, orientation) -> Tuple[str, ...]:
+    # The text rows of a tile, split once per (values, orientation)
+    graphic = DominoGraphic(val1, val2, orientation, None, None)
+    return tuple(graphic.draw_graphic().split("\n")[:DOMINO_GRID_SIZE])
+
 
 class DominoGraphic(Graphic):
+    __slots__ = ("val1", "val2", "orientation", "x_position", "y_position")
+
     def __init__(self, val1, val2, orientation, x, y):
         super().__init__(DOMINO_GRID_SIZE)
         self.val1 = val1
@@ -47,6 +74,9 @@ class DominoGraphic(Graphic):
         self.x_position = x
         self.y_position = y
 
+    def get_rows(self, orientation=None) -> Tuple[str, ...]:
+        return get_glyph_rows(self.val1, self.val2, orientation or self.orientation)
+
     def draw_graphic(self, orientation=None):
         if not orientation:
             orientation = self.orientation
@@ -85,60 +115,118 @@ class DominoGraphic(Graphic):
 
 
 class HandGraphic:
+    __slots__ = ("dominoes",)
+
     def __init__(self, dominoes):
         self.dominoes = dominoes
 
-    def draw_hand(self):
-        domino_graphics = [domino.graphic for domino in self.dominoes]
-        for j in range(DOMINO_GRID_SIZE):
-            j_row = [
-                graphic.draw_graphic(orientation=DominoOrientation.Side1Up).split("\n")[
-                    j
-                ]
-                for graphic in domino_graphics
-            ]
-            print("".join(j_row))
-        print("")
+    def render_lines(self) -> List[str]:
+        tiles = [
+            domino.graphic.get_rows(DominoOrientation.Side1Up)
+            for domino in self.dominoes
+        ]
+        lines = ["".join(rows[j] for rows in tiles) for j in range(DOMINO_GRID_SIZE)]
+        lines.append("")
+        lines.append("".join("  {}  ".format(num) for num in range(len(tiles))))
+        return lines
 
-        domino_numbers = list(range(len(self.dominoes)))
-        domino_numbers = ["  {}  ".format(num) for num in domino_numbers]
-        print("".join(domino_numbers))
+    def draw_hand(self, file: Optional[TextIO] = None):
+        write_lines(self.render_lines(), file)
 
 
 class DominoBoardGraphic:
-    def __init__(self, board_size):
-        self.full_board = []
-        self.board_size = board_size
+    __slots__ = (
+        "positions",
+        "covered",
+        "empty_graphic",
+        "board_is_empty",
+        "x_min",
+        "x_max",
+        "y_min",
+        "y_max",
+    )
+
+    def __init__(self):
+        # Only placed dominoes are stored, keyed by (x, y) with no bounds on
+        # the coordinates. Empty cells are filled in with a single shared
+        # EmptyGraphic when drawing.
+        self.positions = {}
+        # The rules let a domino be drawn over one already on the board. The
+        # newer one goes in positions and those under it are kept here,
+        # oldest first.
+        self.covered = {}
+        self.empty_graphic = None
         self.board_is_empty = True
         self.x_min = 0
         self.x_max = 0
         self.y_min = 0
         self.y_max = 0
 
-        self.init_board()
+    def get_graphic(self, x, y):
+        graphic = self.positions.get((x, y))
+        if graphic is None:
+            if self.empty_graphic is None:
+                self.empty_graphic = EmptyGraphic(DOMINO_GRID_SIZE)
+            graphic = self.empty_graphic
+        return graphic
+
+    def is_occupied(self, x, y) -> bool:
+        return (x, y) in self.positions
 
-    def init_board(self):
-        for i in range(self.board_size):
-            row = []
-            for j in range(self.board_size):
-                row.append(EmptyGraphic(DOMINO_GRID_SIZE))
-            self.full_board.append(row)
+    def get_graphics_at(self, x, y) -> list:
+        # Every domino drawn at (x, y), from the bottom up
+        if (x, y) not in self.positions:
+            return []
+        return self.covered.get((x, y), []) + [self.positions[(x, y)]]
 
-    def draw_board(self):
+    def render_lines(self) -> List[str]:
+        lines = []
         for i in range(self.y_max, self.y_min - 1, -1):
-            row = self.full_board[i][self.x_min : self.x_max + 1]
-            for j in range(DOMINO_GRID_SIZE):
-                j_row = [graphic.draw_graphic().split("\n")[j] for graphic in row]
-                print("".join(j_row))
+            row = [
+                self.get_graphic(x, i).get_rows()
+                for x in range(self.x_min, self.x_max + 1)
+            ]
+            lines.extend(
+                "".join(rows[j] for rows in row) for j in range(DOMINO_GRID_SIZE)
+            )
+        return lines
+
+    def draw_board(self, file: Optional[TextIO] = None):
+        write_lines(self.render_lines(), file)
 
     def add_domino(self, domino_graphic):
         x = domino_graphic.x_position
         y = domino_graphic.y_position
 
-        self.full_board[y][x] = domino_graphic
+        previous_graphic = self.positions.get((x, y))
+        # State needed to undo this placement
+        undo = (
+            (x, y),
+            previous_graphic,
+            (self.x_min, self.x_max, self.y_min, self.y_max),
+            self.board_is_empty,
+        )
+
+        if previous_graphic is not None:
+            self.covered.setdefault((x, y), []).append(previous_graphic)
+        self.positions[(x, y)] = domino_graphic
         self.update_min_max(x, y)
 
         self.board_is_empty = False
+        return undo
+
+    def undo(self, undo):
+        position, previous_graphic, bounds, board_is_empty = undo
+        if previous_graphic is None:
+            del self.positions[position]
+        else:
+            self.positions[position] = previous_graphic
+            covered = self.covered[position]
+            covered.pop()
+            if not covered:
+                del self.covered[position]
+        self.x_min, self.x_max, self.y_min, self.y_max = bounds
+        self.board_is_empty = board_is_empty
 
     def update_min_max(self, new_x, new_y):
         if self.board_is_empty:
@@ -151,3 +239,48 @@ class DominoBoardGraphic:
             self.y_min = min(self.y_min, new_y)
             self.x_max = max(self.x_max, new_x)
             self.x_min = min(self.x_min, new_x)
+
+
+def write_lines(lines: List[str], file: Optional[TextIO] = None):
+    # One write for the whole frame rather than a print per line
+    if lines:
+        (file or sys.stdout).write("\n".join(lines) + "\n")
+
+
+class TerminalRenderer:
+    """Redraws frames in place on an ANSI terminal.
+
+    The first frame clears the screen. After that only the lines that differ
+    from the previous frame are rewritten, and each frame goes out in a
+    single write.
+    """
+
+    def __init__(self, file: Optional[TextIO] = None, diff: bool = True):
+        self.file = file
+        self.diff = diff
+        self.previous: Optional[List[str]] = None
+
+    def render(self, lines: List[str]) -> str:
+        if not self.diff or self.previous is None:
+            output = CLEAR_SCREEN + "\n".join(lines) + "\n"
+        else:
+            parts = []
+            for row, line in enumerate(lines):
+                if row >= len(self.previous) or self.previous[row] != line:
+                    parts.append(
+                        "\x1b[{};1H{}{}".format(row + 1, line, CLEAR_TO_END_OF_LINE)
+                    )
+            if len(lines) < len(self.previous):
+                parts.append(
+                    "\x1b[{};1H{}".format(len(lines) + 1, CLEAR_TO_END_OF_SCREEN)
+                )
+            # Leave the cursor below the frame
+            parts.append("\x1b[{};1H".format(len(lines) + 1))
+            output = "".join(parts)
+        self.previous = list(lines)
+        return output
+
+    def draw(self, lines: List[str]):
+        file = self.file or sys.stdout
+        file.write(self.render(lines))
+        file.flush()
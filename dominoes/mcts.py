@@ -0,0 +1,375 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from .compact import (
+    NO_END,
+    CompactBoard,
+    domino_tile_id,
+    endpoint_id,
+    side_index,
+)
+from .domino import Domino, DominoBoard, DoubleDomino
+from .game import DominoSet
+from .player import Hand, Move, Player, hand_has_move, iter_hand_moves
+from .search import SearchState
+
+# Point differences are divided by this before being backed up, keeping the
+# rewards on roughly the same scale as the exploration term
+REWARD_SCALE = 10.0
+
+MoveKey = Tuple[int, int, int]
+# Root statistics returned by a worker: move key -> (visits, total reward)
+RootStats = Dict[MoveKey, Tuple[int, float]]
+
+
+def get_move_key(move: Move) -> MoveKey:
+    tile = domino_tile_id(move.domino_to_play)
+    if move.side_on_board is None:
+        return (tile, NO_END, NO_END)
+    return (tile, endpoint_id(move.side_on_board), side_index(move.side_to_play))
+
+
+class Node:
+    def __init__(self):
+        # Children are keyed by (side to move, move key)
+        self.children: Dict[Tuple[int, MoveKey], "Node"] = {}
+        self.visits = 0
+        self.reward = 0.0
+        # Number of times this node was a legal choice when its parent was
+        # visited, which replaces the parent's visit count in ISMCTS
+        self.availability = 0
+
+    def ucb(self, side: int, exploration: float) -> float:
+        # Rewards are stored from the root player's point of view
+        mean = self.reward / self.visits
+        if side == 1:
+            mean = -mean
+        return mean + exploration * math.sqrt(math.log(self.availability) / self.visits)
+
+
+class ISMCTS:
+    """Single-observer information set MCTS over determinized deals.
+
+    Every iteration samples the opponent's hand and the boneyard order from
+    the unseen tiles, avoiding pips the opponent is known to be void in,
+    then selects, expands and rolls out on the real board using the same
+    rules as GameTwoPlayer.play before undoing every move.
+    """
+
+    def __init__(
+        self,
+        board: DominoBoard,
+        hand: List[Domino],
+        unseen: List[Domino],
+        opponent_hand_size: int,
+        void_pips: Set[int],
+        rng: random.Random,
+        exploration: float = 0.7,
+    ):
+        self.board = board
+        self.hand = hand
+        self.unseen = unseen
+        self.opponent_hand_size = min(opponent_hand_size, len(unseen))
+        self.void_pips = void_pips
+        self.rng = rng
+        self.exploration = exploration
+        self.root = Node()
+        self.playouts = 0
+
+    def determinize(self) -> SearchState:
+        shuffled = self.rng.sample(self.unseen, len(self.unseen))
+        # Tiles the opponent could hold go first, the rest fill the boneyard
+        possible = []
+        impossible = []
+        for domino in shuffled:
+            if (
+                domino.side1.value in self.void_pips
+                or domino.side2.value in self.void_pips
+            ):
+                impossible.append(domino)
+            else:
+                possible.append(domino)
+        ordered = possible + impossible
+        opponent_hand = Hand(ordered[: self.opponent_hand_size])
+        boneyard = ordered[self.opponent_hand_size :]
+        self.rng.shuffle(boneyard)
+        return SearchState(self.board, [Hand(list(self.hand)), opponent_hand], boneyard)
+
+    def get_turn_moves(
+        self, state: SearchState, side: int, history: list
+    ) -> List[Move]:
+        hand = state.hands[side]
+        while not hand_has_move(hand, state.board) and state.boneyard:
+            domino = state.boneyard.pop()
+            hand.add_domino(domino)
+            history.append(("draw", side, domino))
+        return list(iter_hand_moves(hand, state.board))
+
+    def play(
+        self, state: SearchState, side: int, move: Move, history: list
+    ) -> Tuple[float, Optional[int]]:
+        # Returns the points gained from the root player's point of view and
+        # the side to move next, or None when the game is over
+        undo, points, extra_turn = state.play(side, move)
+        history.append(("move", side, undo))
+        sign = 1 if side == 0 else -1
+        if len(state.hands[side]) == 0:
+            return sign * (points + state.leftover_points()), None
+        return sign * points, side if extra_turn else 1 - side
+
+    def undo(self, state: SearchState, history: list):
+        for kind, side, item in reversed(history):
+            if kind == "move":
+                state.unplay(side, item)
+            else:
+                state.hands[side].remove_domino(item)
+                state.boneyard.append(item)
+
+    def iterate(self):
+        state = self.determinize()
+        history: list = []
+        node = self.root
+        path = [node]
+        side: Optional[int] = 0
+        passes = 0
+        total = 0.0
+
+        # Selection and expansion
+        expanded = False
+        while side is not None and not expanded:
+            moves = self.get_turn_moves(state, side, history)
+            if not moves:
+                passes += 1
+                if passes == 2:
+                    side = None
+                else:
+                    side = 1 - side
+                continue
+            passes = 0
+
+            keyed = [((side, get_move_key(move)), move) for move in moves]
+            for key, _ in keyed:
+                if key in node.children:
+                    node.children[key].availability += 1
+            untried = [(key, move) for key, move in keyed if key not in node.children]
+            if untried:
+                key, move = self.rng.choice(untried)
+                child = Node()
+                child.availability = 1
+                node.children[key] = child
+                expanded = True
+            else:
+                current = side
+                key, move = max(
+                    keyed,
+                    key=lambda item: node.children[item[0]].ucb(
+                        current, self.exploration
+                    ),
+                )
+            node = node.children[key]
+            path.append(node)
+            points, side = self.play(state, side, move, history)
+            total += points
+
+        # Rollout with a fast default policy: a random legal move
+        while side is not None:
+            moves = self.get_turn_moves(state, side, history)
+            if not moves:
+                passes += 1
+                side = None if passes == 2 else 1 - side
+                continue
+            passes = 0
+            points, side = self.play(state, side, self.rng.choice(moves), history)
+            total += points
+
+        self.undo(state, history)
+
+        reward = total / REWARD_SCALE
+        for visited in path:
+            visited.visits += 1
+            visited.reward += reward
+        self.playouts += 1
+
+    def run(self, iterations: Optional[int], deadline: Optional[float]):
+        while iterations is None or self.playouts < iterations:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            self.iterate()
+
+    def get_root_stats(self) -> RootStats:
+        return {
+            key[1]: (child.visits, child.reward)
+            for key, child in self.root.children.items()
+            if key[0] == 0
+        }
+
+
+def run_ismcts(
+    placements: List[Tuple[int, int, int]],
+    hand_tiles: List[int],
+    opponent_hand_size: int,
+    void_pips: Set[int],
+    iterations: Optional[int],
+    time_budget: Optional[float],
+    seed: int,
+    exploration: float,
+) -> Tuple[RootStats, int]:
+    # Runs in a worker process, so it rebuilds the position from the compact
+    # encoding rather than receiving Domino objects
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    dominoes = DominoSet().dominoes
+    compact = CompactBoard()
+    for placement in placements:
+        compact.add(*placement)
+    board = compact.to_board(dominoes)
+
+    known = set(hand_tiles) | set(tile for tile, _, _ in placements)
+    unseen = [dominoes[tile] for tile in range(len(dominoes)) if tile not in known]
+    tree = ISMCTS(
+        board,
+        [dominoes[tile] for tile in hand_tiles],
+        unseen,
+        opponent_hand_size,
+        void_pips,
+        random.Random(seed),
+        exploration,
+    )
+    tree.run(iterations, deadline)
+    return tree.get_root_stats(), tree.playouts
+
+
+class MCTSPlayer(Player):
+    """ISMCTS player for the double-six set with root-parallel rollouts.
+
+    Each of the workers grows its own tree from independent determinizations
+    and the root visit counts are summed, so more workers means more
+    playouts in the same wall-clock budget. Searches stop after iterations
+    playouts in total or time_budget seconds, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        hand: Hand,
+        name: str = "player",
+        iterations: Optional[int] = None,
+        time_budget: Optional[float] = 0.1,
+        workers: int = 1,
+        seed: int = 0,
+        exploration: float = 0.7,
+    ):
+        super().__init__(hand, name)
+        assert iterations is not None or time_budget is not None, "Need a budget"
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.exploration = exploration
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+        self.void_pips: Set[int] = set()
+        self.expected_board_size: Optional[int] = None
+        self.end_values_after_move: List[int] = []
+        self.last_search: Dict[str, float] = {}
+
+    def draw_new_hand(self, hand: Hand):
+        super().draw_new_hand(hand)
+        self.void_pips = set()
+        self.expected_board_size = None
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def update_voids(self, board: DominoBoard):
+        # If the opponent had a turn since our last move and the board did
+        # not grow, they passed with an empty boneyard and hold none of the
+        # values that were open
+        if (
+            self.expected_board_size is not None
+            and len(board.dominoes) == self.expected_board_size
+        ):
+            self.void_pips.update(self.end_values_after_move)
+        self.expected_board_size = None
+
+    def remember_move(self, board: DominoBoard, move: Move):
+        undo = board.add_domino(
+            move.domino_to_play, move.side_on_board, move.side_to_play
+        )
+        score = board.get_score()
+        extra_turn = isinstance(move.domino_to_play, DoubleDomino) or score % 5 == 0
+        if not extra_turn:
+            self.expected_board_size = len(board.dominoes)
+            self.end_values_after_move = list(board.endpoints_by_value)
+        board.undo(undo)
+
+    def get_search_args(self, board: DominoBoard) -> tuple:
+        compact = CompactBoard.from_board(board)
+        hand_tiles = [domino_tile_id(domino) for domino in self.hand]
+        if self.opponent_hand_sizes:
+            opponent_hand_size = self.opponent_hand_sizes[0]
+        else:
+            opponent_hand_size = len(self.hand)
+        return (
+            compact.placements,
+            hand_tiles,
+            opponent_hand_size,
+            set(self.void_pips),
+        )
+
+    def search(self, board: DominoBoard) -> Tuple[RootStats, int]:
+        args = self.get_search_args(board)
+        seeds = [self.rng.getrandbits(32) for _ in range(self.workers)]
+        if self.workers == 1:
+            return run_ismcts(
+                *args, self.iterations, self.time_budget, seeds[0], self.exploration
+            )
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        iterations = None
+        if self.iterations is not None:
+            iterations = math.ceil(self.iterations / self.workers)
+        futures = [
+            self.executor.submit(
+                run_ismcts, *args, iterations, self.time_budget, seed, self.exploration
+            )
+            for seed in seeds
+        ]
+        merged: RootStats = {}
+        playouts = 0
+        for future in futures:
+            stats, worker_playouts = future.result()
+            playouts += worker_playouts
+            for key, (visits, reward) in stats.items():
+                old_visits, old_reward = merged.get(key, (0, 0.0))
+                merged[key] = (old_visits + visits, old_reward + reward)
+        return merged, playouts
+
+    def choose_next_move(self, board: DominoBoard):
+        self.update_voids(board)
+        moves = self.get_possible_moves(board)
+        if len(moves) == 0:
+            return Move()
+
+        if len(moves) == 1:
+            move = moves[0]
+        else:
+            start = time.perf_counter()
+            stats, playouts = self.search(board)
+            elapsed = time.perf_counter() - start
+            self.last_search = {
+                "playouts": playouts,
+                "seconds": elapsed,
+                "playouts_per_second": playouts / elapsed if elapsed else 0.0,
+            }
+            move = max(
+                moves,
+                key=lambda candidate: stats.get(get_move_key(candidate), (0, 0.0)),
+            )
+
+        self.remember_move(board, move)
+        return move
@@ -1,10 +1,13 @@
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 from .domino import Domino, DominoBoard, DominoSide, DoubleDomino
 from .graphics import HandGraphic
+from .zobrist import tile_key
 
 
 class Move:
+    __slots__ = ("domino_to_play", "side_to_play", "side_on_board", "is_pass_move")
+
     def __init__(
         self,
         domino_to_play: Optional[Domino] = None,
@@ -33,13 +36,68 @@ class Move:
 
 
 class Hand:
+    __slots__ = ("tiles", "hand_graphic", "sides_by_value", "hash", "total")
+
     def __init__(self, dominoes: List[Domino]):
-        self.dominoes = dominoes
-        self.hand_graphic = HandGraphic(dominoes)
+        # Dominoes keyed by their sorted pips, so a domino can be found or
+        # removed in O(1) whichever way round it is given. Dicts keep
+        # insertion order, so this is also the order they were added in.
+        self.tiles: Dict[Tuple[int, int], Domino] = {}
+        self.hand_graphic = HandGraphic(self.tiles.values())
+        # Playable sides of the dominoes in hand grouped by their value
+        self.sides_by_value: Dict[int, List[DominoSide]] = {}
+        # XOR of the Zobrist keys of the dominoes in hand
+        self.hash = 0
+        # Pips in hand, which is get_total_value() while no domino in hand is
+        # connected on a board
+        self.total = 0
+        for domino in dominoes:
+            self.add_domino(domino)
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def __iter__(self):
+        return iter(self.tiles.values())
+
+    @property
+    def dominoes(self) -> Tuple[Domino, ...]:
+        # A snapshot, use add_domino and remove_domino to change the hand
+        return tuple(self.tiles.values())
+
+    @staticmethod
+    def get_tile(domino: Domino) -> Tuple[int, int]:
+        low, high = domino.side1.value, domino.side2.value
+        return (low, high) if low <= high else (high, low)
+
+    def index_domino(self, domino: Domino):
+        self.hash ^= tile_key(domino.side1.value, domino.side2.value)
+        self.total += domino.side1.value + domino.side2.value
+        for side in domino.get_playable_sides():
+            value = side.get_playable_value()
+            if value not in self.sides_by_value:
+                self.sides_by_value[value] = []
+            self.sides_by_value[value].append(side)
+
+    def unindex_domino(self, domino: Domino):
+        # The domino may already be connected on the board, so its playable
+        # sides can differ from the ones that were indexed
+        self.hash ^= tile_key(domino.side1.value, domino.side2.value)
+        self.total -= domino.side1.value + domino.side2.value
+        for value in {domino.side1.value, domino.side2.value}:
+            same_value = [
+                side
+                for side in self.sides_by_value[value]
+                if side.parent_domino is not domino
+            ]
+            if same_value:
+                self.sides_by_value[value] = same_value
+            else:
+                del self.sides_by_value[value]
 
     def get_playable_values(self):
         playable_values = []
-        for domino in self.dominoes:
+        for domino in self:
             if isinstance(domino, DoubleDomino):
                 playable_values.append(domino.mid_side1.get_playable_value())
             else:
@@ -49,7 +107,7 @@ class Hand:
 
     def get_sides(self):
         sides = []
-        for domino in self.dominoes:
+        for domino in self:
             sides.extend(domino.get_playable_sides())
         return sides
 
@@ -61,10 +119,33 @@ class Hand:
         return self.dominoes[domino_index]
 
     def remove_domino(self, domino: Domino):
-        self.dominoes.remove(domino)
+        # Unindexes the domino held in the hand, which may be a different
+        # object with the same pips as the one given
+        held = self.tiles.pop(self.get_tile(domino))
+        self.unindex_domino(held)
 
     def add_domino(self, domino: Domino):
-        self.dominoes.append(domino)
+        tile = self.get_tile(domino)
+        assert tile not in self.tiles, "Domino already in hand"
+        self.tiles[tile] = domino
+        self.index_domino(domino)
+
+
+def iter_hand_moves(hand: Hand, board: DominoBoard) -> Iterator[Move]:
+    # If first move, any domino in hand can be played
+    if len(board.endpoints) == 0:
+        for domino in hand:
+            yield Move(domino_to_play=domino)
+        return
+
+    for side, endpoint in board.iter_matches(hand.sides_by_value):
+        yield Move(side.parent_domino, side, endpoint)
+
+
+def hand_has_move(hand: Hand, board: DominoBoard) -> bool:
+    if len(board.endpoints) == 0:
+        return len(hand) > 0
+    return board.has_match(hand.sides_by_value)
 
 
 class Player:
@@ -72,25 +153,45 @@ class Player:
         self.hand = hand
         self.name = name
         self.score = 0
+        # Public information about the game, updated by observe()
+        self.boneyard_size: Optional[int] = None
+        self.opponent_hand_sizes: Sequence[int] = []
+        self.opponent_scores: Sequence[int] = []
 
     def get_possible_moves(self, board: DominoBoard) -> List[Move]:
-        sides_in_hand: List[DominoSide] = self.hand.get_sides()
-        board_endpoints: List[DominoSide] = board.endpoints
+        return list(iter_hand_moves(self.hand, board))
+
+    def iter_possible_moves(self, board: DominoBoard) -> Iterator[Move]:
+        return iter_hand_moves(self.hand, board)
 
-        # If first move, return all dominoes in hand
-        if len(board_endpoints) == 0:
-            return [Move(domino_to_play=domino) for domino in self.hand.dominoes]
+    def has_possible_move(self, board: DominoBoard) -> bool:
+        return hand_has_move(self.hand, board)
 
-        moves = []
-        for side in sides_in_hand:
-            for endpoint in board_endpoints:
-                if side.get_playable_value() == endpoint.get_playable_value():
-                    moves.append(Move(side.parent_domino, side, endpoint))
-        return moves
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
     def draw_new_hand(self, hand: Hand):
         self.hand = hand
 
+    def close(self):
+        # Releases anything the player holds between games, such as worker
+        # processes. Whoever builds a player closes it when done.
+        pass
+
+    def observe(
+        self,
+        boneyard_size: int,
+        opponent_hand_sizes: Sequence[int],
+        opponent_scores: Sequence[int] = (),
+    ):
+        # Called by the game before every choose_next_move
+        self.boneyard_size = boneyard_size
+        self.opponent_hand_sizes = opponent_hand_sizes
+        self.opponent_scores = opponent_scores
+
     def choose_next_move(self, board: DominoBoard):
         raise NotImplementedError
 
@@ -100,11 +201,10 @@ class RandomPlayer(Player):
         super().__init__(hand, name)
 
     def choose_next_move(self, board: DominoBoard):
-        moves = self.get_possible_moves(board)
-        if len(moves) > 0:
-            return moves[0]
-        else:
-            return Move()
+        # Take the first legal move without building the rest
+        for move in self.iter_possible_moves(board):
+            return move
+        return Move()
 
 
 class HumanPlayer(Player):
@@ -0,0 +1,161 @@
+import cProfile
+import functools
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .domino import DominoBoard
+from .game import DominoSet, Game
+from .player import Player
+
+# Phases timed by default, as (class, method). Subclasses that override the
+# method are timed under the same phase name.
+DEFAULT_PHASES: Dict[str, Tuple[type, str]] = {
+    "game": (Game, "play"),
+    "bone_pile": (Game, "bone_pile"),
+    "draw_single": (DominoSet, "draw_single"),
+    "choose_next_move": (Player, "choose_next_move"),
+    "get_possible_moves": (Player, "get_possible_moves"),
+    "has_possible_move": (Player, "has_possible_move"),
+    "add_domino": (DominoBoard, "add_domino"),
+    "get_score": (DominoBoard, "get_score"),
+}
+
+
+class PhaseStats:
+    # Call count, total time and a histogram of call durations in power of two
+    # nanosecond buckets: bucket n holds durations in [2**(n-1), 2**n)
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets: Dict[int, int] = {}
+
+    def record(self, duration_ns: int):
+        self.calls += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        bucket = duration_ns.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction: float) -> float:
+        # Upper edge of the bucket holding the given fraction of calls, in ns
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= fraction * self.calls:
+                return float(min(1 << bucket, self.max_ns))
+        return 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "total_s": self.total_ns / 1e9,
+            "mean_us": self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+            "p50_us": self.percentile(0.5) / 1e3,
+            "p99_us": self.percentile(0.99) / 1e3,
+            "max_us": self.max_ns / 1e3,
+        }
+
+
+def get_overriding_classes(cls: type, name: str) -> List[type]:
+    # cls and every subclass that defines name itself
+    found = []
+    pending = [cls]
+    while pending:
+        current = pending.pop()
+        if name in vars(current) and current not in found:
+            found.append(current)
+        pending.extend(current.__subclasses__())
+    return found
+
+
+def timed(function, stats: PhaseStats):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats.record(time.perf_counter_ns() - start)
+
+    return wrapper
+
+
+class Profiler:
+    """Opt-in timing of the game loop's hot paths.
+
+    While enabled, the methods listed in phases are replaced with timed
+    wrappers on their classes, and restored on disable, so code runs
+    untouched when profiling is off. Times are inclusive of nested phases,
+    e.g. choose_next_move includes get_possible_moves. Only the current
+    process is measured, and classes defined after enable() are not timed.
+    """
+
+    def __init__(
+        self,
+        phases: Optional[Dict[str, Tuple[type, str]]] = None,
+        cprofile: bool = False,
+    ):
+        self.phases = DEFAULT_PHASES if phases is None else phases
+        self.stats: Dict[str, PhaseStats] = {
+            name: PhaseStats(name) for name in self.phases
+        }
+        self.profile = cProfile.Profile() if cprofile else None
+        self.patched: List[Tuple[type, str, object]] = []
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *args):
+        self.disable()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.patched)
+
+    def enable(self):
+        assert not self.enabled, "Profiler already enabled"
+        for phase, (cls, name) in self.phases.items():
+            for target in get_overriding_classes(cls, name):
+                original = vars(target)[name]
+                self.patched.append((target, name, original))
+                setattr(target, name, timed(original, self.stats[phase]))
+        if self.profile is not None:
+            self.profile.enable()
+
+    def disable(self):
+        if self.profile is not None:
+            self.profile.disable()
+        for target, name, original in reversed(self.patched):
+            setattr(target, name, original)
+        self.patched = []
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+    def format_summary(self) -> str:
+        lines = [
+            "{:<20} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+                "phase", "calls", "total s", "mean us", "p50 us", "p99 us"
+            )
+        ]
+        for name, summary in self.summary().items():
+            lines.append(
+                "{:<20} {:>10} {:>10.3f} {:>10.2f} {:>10.2f} {:>10.2f}".format(
+                    name,
+                    summary["calls"],
+                    summary["total_s"],
+                    summary["mean_us"],
+                    summary["p50_us"],
+                    summary["p99_us"],
+                )
+            )
+        return "\n".join(lines)
+
+    def dump_stats(self, path: str):
+        # Writes the cProfile data, readable with pstats.Stats(path)
+        assert self.profile is not None, "Profiler was created without cprofile"
+        self.profile.dump_stats(path)
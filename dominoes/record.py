@@ -0,0 +1,261 @@
+import mmap
+import os
+import struct
+from typing import Iterator, List, Optional, Tuple, Type
+
+from .compact import N_TILES, CompactBoard, domino_tile_id
+from .domino import DominoBoard
+from .game import GameTwoPlayer
+from .player import Hand, Player
+from .simulation import game_rng
+
+# A record file is a header followed by fixed-size game records, so record i
+# starts at HEADER.size + i * RECORD.size and files can be scanned in place
+# through mmap. Moves are (tile id, endpoint id, attach side index) triples
+# as in CompactBoard.placements, with NO_END for the root.
+MAGIC = b"DOMREC"
+VERSION = 1
+HEADER = struct.Struct("<6sHI")
+MAX_MOVES = N_TILES
+# seed, game index, scores, turn count, first turn, move count, blocked, the
+# full deck in deal order and the moves
+RECORD = struct.Struct("<qIhhHBBB{}s{}s".format(N_TILES, 3 * MAX_MOVES))
+HAND_SIZE = 7
+
+
+class GameRecord:
+    def __init__(
+        self,
+        seed: int,
+        game_index: int,
+        deck: List[int],
+        first_turn: int,
+        placements: List[Tuple[int, int, int]],
+        scores: List[int],
+        turn_count: int,
+        blocked: bool,
+    ):
+        self.seed = seed
+        self.game_index = game_index
+        # Tile ids in deal order: player 1's hand, player 2's hand, then the
+        # boneyard in the order it is drawn
+        self.deck = deck
+        self.first_turn = first_turn
+        self.placements = placements
+        self.scores = scores
+        self.turn_count = turn_count
+        self.blocked = blocked
+
+    def __repr__(self):
+        return "GameRecord(seed={}, game_index={}, moves={}, scores={})".format(
+            self.seed, self.game_index, len(self.placements), self.scores
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, GameRecord) and self.pack() == other.pack()
+
+    def get_hands(self) -> List[List[int]]:
+        return [self.deck[:HAND_SIZE], self.deck[HAND_SIZE : 2 * HAND_SIZE]]
+
+    def get_boneyard(self) -> List[int]:
+        return self.deck[2 * HAND_SIZE :]
+
+    def pack(self) -> bytes:
+        moves = bytearray()
+        for tile, endpoint, attach in self.placements:
+            moves.extend(struct.pack("<bbb", tile, endpoint, attach))
+        return RECORD.pack(
+            self.seed,
+            self.game_index,
+            self.scores[0],
+            self.scores[1],
+            self.turn_count,
+            self.first_turn,
+            len(self.placements),
+            self.blocked,
+            bytes(self.deck),
+            bytes(moves),
+        )
+
+    @classmethod
+    def unpack(cls, fields: tuple) -> "GameRecord":
+        # fields as returned by RECORD.unpack
+        (
+            seed,
+            game_index,
+            score1,
+            score2,
+            turn_count,
+            first_turn,
+            n_moves,
+            blocked,
+            deck,
+            moves,
+        ) = fields
+        return cls(
+            seed,
+            game_index,
+            list(deck),
+            first_turn,
+            list(struct.iter_unpack("<bbb", moves[: 3 * n_moves])),
+            [score1, score2],
+            turn_count,
+            bool(blocked),
+        )
+
+    def get_compact_board(self, move: Optional[int] = None) -> CompactBoard:
+        board = CompactBoard()
+        for placement in self.placements[:move]:
+            board.add(*placement)
+        return board
+
+    def replay(self, move: Optional[int] = None) -> DominoBoard:
+        # The board after the first move moves, or at the end of the game
+        return self.get_compact_board(move).to_board()
+
+
+def get_deck(game: GameTwoPlayer) -> List[int]:
+    # Must be called after the deal and before the first move. The boneyard
+    # is dealt from the end of DominoSet.dominoes.
+    deck = []
+    for player in game.players:
+        deck.extend(domino_tile_id(domino) for domino in player.hand)
+    deck.extend(domino_tile_id(domino) for domino in reversed(game.domino_set.dominoes))
+    return deck
+
+
+def record_game(
+    player1_cls: Type[Player],
+    player2_cls: Type[Player],
+    seed: int,
+    game_index: int,
+) -> GameRecord:
+    with player1_cls(Hand([]), name="player1") as player1:
+        with player2_cls(Hand([]), name="player2") as player2:
+            game = GameTwoPlayer(
+                player1, player2, verbose=False, rng=game_rng(seed, game_index)
+            )
+            deck = get_deck(game)
+            first_turn = game.turn
+            result = game.play()
+    return GameRecord(
+        seed,
+        game_index,
+        deck,
+        first_turn,
+        CompactBoard.from_board(game.board).placements,
+        result.scores,
+        result.turn_count,
+        result.blocked,
+    )
+
+
+class RecordWriter:
+    """Appends game records to a file as they are produced.
+
+    Records are written straight through a buffered file, so nothing is kept
+    in memory between writes. Opening an existing file appends to it after
+    the last whole record.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not is_new:
+            check_header(path)
+        self.file = open(path, "ab")
+        if is_new:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        else:
+            # Drop a partial record left by an interrupted run, so new records
+            # start on a record boundary
+            size = os.path.getsize(path)
+            self.file.truncate(
+                HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, record: GameRecord):
+        self.file.write(record.pack())
+
+    def close(self):
+        self.file.close()
+
+
+def check_header(path: str):
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError("{} is too short to be a game record file".format(path))
+    magic, version, record_size = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError(
+            "{} is not a version {} game record file".format(path, VERSION)
+        )
+
+
+class RecordReader:
+    """Random access to a record file through a read-only memory map."""
+
+    def __init__(self, path: str):
+        check_header(path)
+        self.file = open(path, "rb")
+        size = os.path.getsize(path)
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        # A partly written trailing record is ignored
+        self.n_records = (size - HEADER.size) // RECORD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.n_records
+
+    def __getitem__(self, index: int) -> GameRecord:
+        if index < 0:
+            index += self.n_records
+        if not 0 <= index < self.n_records:
+            raise IndexError("record index out of range")
+        return GameRecord.unpack(
+            RECORD.unpack_from(self.mmap, HEADER.size + index * RECORD.size)
+        )
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for fields in self.scan():
+            yield GameRecord.unpack(fields)
+
+    def scan(self) -> Iterator[tuple]:
+        # Raw record tuples, for analysis that does not need GameRecord objects
+        end = HEADER.size + self.n_records * RECORD.size
+        for offset in range(HEADER.size, end, RECORD.size):
+            yield RECORD.unpack_from(self.mmap, offset)
+
+    def replay(self, index: int, move: Optional[int] = None) -> DominoBoard:
+        return self[index].replay(move)
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+
+def record_games(
+    path: str,
+    player1_cls: Type[Player],
+    player2_cls: Type[Player],
+    n_games: int,
+    seed: int = 0,
+    start: int = 0,
+):
+    # Plays games start to start + n_games with the same per-game seeds as
+    # simulate_games and appends each record as soon as it is finished
+    with RecordWriter(path) as writer:
+        for game_index in range(start, start + n_games):
+            writer.write(record_game(player1_cls, player2_cls, seed, game_index))
@@ -0,0 +1,337 @@
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .domino import BoardUndo, Domino, DominoBoard, DoubleDomino
+from .game import DominoSet
+from .player import Hand, Move, Player, hand_has_move, iter_hand_moves
+from .transposition import (
+    EXACT,
+    LOWER_BOUND,
+    REPLACE_DEPTH,
+    UPPER_BOUND,
+    TranspositionTable,
+)
+from .zobrist import MASK, zobrist_key
+
+# Weight given to the pip difference between the two hands at the search
+# horizon, where the rest of the game is unknown
+HAND_WEIGHT = 0.05
+# Spreads the opponent's hand hash so swapping a tile between hands changes
+# the position key
+OPPONENT_HAND_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def get_pips(domino: Domino) -> Tuple[int, int]:
+    return (
+        min(domino.side1.value, domino.side2.value),
+        max(domino.side1.value, domino.side2.value),
+    )
+
+
+class SearchState:
+    # One determinization of the hidden information: the opponent's hand and
+    # the order of the boneyard are fixed by sampling
+    def __init__(
+        self,
+        board: DominoBoard,
+        hands: List[Hand],
+        boneyard: List[Domino],
+        sample: int = 0,
+    ):
+        self.board = board
+        self.hands = hands
+        self.boneyard = boneyard
+        # Boneyards are only comparable within a sample, where the remaining
+        # tiles are fixed by how many have been drawn
+        self.sample = sample
+
+    def get_key(self, side: int, passes: int) -> int:
+        return (
+            self.board.get_hash()
+            ^ self.hands[0].hash
+            ^ ((self.hands[1].hash * OPPONENT_HAND_MULTIPLIER) & MASK)
+            ^ zobrist_key("node", self.sample, len(self.boneyard), side, passes)
+        )
+
+    def play(self, side: int, move: Move) -> Tuple[BoardUndo, int, bool]:
+        undo = self.board.add_domino(
+            move.domino_to_play, move.side_on_board, move.side_to_play
+        )
+        self.hands[side].remove_domino(move.domino_to_play)
+        score = self.board.get_score()
+        points = score // 5 if score % 5 == 0 else 0
+        extra_turn = isinstance(move.domino_to_play, DoubleDomino) or score % 5 == 0
+        return undo, points, extra_turn
+
+    def unplay(self, side: int, undo: BoardUndo):
+        self.board.undo(undo)
+        self.hands[side].add_domino(undo.domino)
+
+    def leftover_points(self) -> int:
+        return max(sum(hand.get_total_value() for hand in self.hands) // 5, 1)
+
+
+class SearchPlayer(Player):
+    """Expectimax-by-sampling player with alpha-beta pruning.
+
+    The opponent's hand and the boneyard order are sampled from the tiles
+    this player has not seen, and each sample is searched as a perfect
+    information game with the same muggins scoring as GameTwoPlayer.play
+    (score // 5 when the board total is a multiple of 5, an extra turn on
+    doubles and scoring moves, leftover points for going out). Root move
+    values are averaged over the samples.
+
+    Searches deepen one ply at a time until max_depth or until time_budget
+    seconds have passed. Set time_budget to None for reproducible play.
+    Positions reached through different move orders are looked up in a
+    transposition table of transposition_table_size entries (0 disables it).
+    """
+
+    def __init__(
+        self,
+        hand: Hand,
+        name: str = "player",
+        max_depth: int = 4,
+        samples: int = 8,
+        time_budget: Optional[float] = 0.05,
+        seed: Optional[int] = 0,
+        max_number: int = 6,
+        transposition_table_size: int = 1 << 16,
+        replacement: str = REPLACE_DEPTH,
+    ):
+        super().__init__(hand, name)
+        self.max_depth = max_depth
+        self.samples = samples
+        self.time_budget = time_budget
+        self.rng = random.Random(seed)
+        # Stand-ins for the tiles this player cannot see, played on the real
+        # board during search and always taken back off again
+        self.shadow_dominoes = DominoSet(max_number=max_number).dominoes
+        self.transposition_table: Optional[TranspositionTable] = None
+        if transposition_table_size > 0:
+            self.transposition_table = TranspositionTable(
+                transposition_table_size, replacement
+            )
+
+        self.deadline: Optional[float] = None
+        self.nodes = 0
+        self.last_search: Dict[str, float] = {}
+
+    def get_unseen_dominoes(self, board: DominoBoard) -> List[Domino]:
+        seen = set(get_pips(domino) for domino in board.dominoes)
+        seen.update(get_pips(domino) for domino in self.hand)
+        return [d for d in self.shadow_dominoes if get_pips(d) not in seen]
+
+    def sample_states(self, board: DominoBoard) -> List[SearchState]:
+        unseen = self.get_unseen_dominoes(board)
+        if self.opponent_hand_sizes:
+            opponent_hand_size = min(self.opponent_hand_sizes[0], len(unseen))
+        else:
+            opponent_hand_size = min(len(self.hand), len(unseen))
+
+        states = []
+        for sample in range(self.samples):
+            shuffled = self.rng.sample(unseen, len(unseen))
+            opponent_hand = Hand(shuffled[:opponent_hand_size])
+            own_hand = Hand(list(self.hand.dominoes))
+            states.append(
+                SearchState(
+                    board,
+                    [own_hand, opponent_hand],
+                    shuffled[opponent_hand_size:],
+                    sample,
+                )
+            )
+        return states
+
+    def check_time(self):
+        # A node costs tens of microseconds and reading the clock well under
+        # one, so every node checks it and a search stops on time
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+
+    def evaluate(self, state: SearchState) -> float:
+        own_pips = state.hands[0].get_total_value()
+        opponent_pips = state.hands[1].get_total_value()
+        return HAND_WEIGHT * (opponent_pips - own_pips)
+
+    def order_moves(
+        self, state: SearchState, side: int, moves: List[Move]
+    ) -> List[Move]:
+        # Scoring moves first, then doubles, then the heaviest tiles
+        def key(move):
+            undo, points, _ = state.play(side, move)
+            state.unplay(side, undo)
+            domino = move.domino_to_play
+            return (
+                points,
+                isinstance(domino, DoubleDomino),
+                domino.side1.value + domino.side2.value,
+            )
+
+        return sorted(moves, key=key, reverse=True)
+
+    def play_value(
+        self,
+        state: SearchState,
+        side: int,
+        move: Move,
+        depth: int,
+        alpha: float,
+        beta: float,
+    ) -> float:
+        # Value of playing move, from this player's point of view
+        sign = 1 if side == 0 else -1
+        undo, points, extra_turn = state.play(side, move)
+        try:
+            value = sign * points
+            if len(state.hands[side]) == 0:
+                return value + sign * state.leftover_points()
+            next_side = side if extra_turn else 1 - side
+            return value + self.search(
+                state, next_side, depth - 1, alpha - value, beta - value, 0
+            )
+        finally:
+            state.unplay(side, undo)
+
+    def search(
+        self,
+        state: SearchState,
+        side: int,
+        depth: int,
+        alpha: float,
+        beta: float,
+        passes: int,
+    ) -> float:
+        self.check_time()
+        if depth == 0:
+            return self.evaluate(state)
+
+        table = self.transposition_table
+        if table is None:
+            return self.search_moves(state, side, depth, alpha, beta, passes)
+
+        key = state.get_key(side, passes)
+        entry = table.probe(key)
+        if entry is not None and entry[1] >= depth:
+            _, _, value, flag = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER_BOUND:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        best = self.search_moves(state, side, depth, alpha, beta, passes)
+        if best <= alpha:
+            flag = UPPER_BOUND
+        elif best >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        table.store(key, depth, best, flag)
+        return best
+
+    def search_moves(
+        self,
+        state: SearchState,
+        side: int,
+        depth: int,
+        alpha: float,
+        beta: float,
+        passes: int,
+    ) -> float:
+        hand = state.hands[side]
+        drawn = []
+        try:
+            while not hand_has_move(hand, state.board) and state.boneyard:
+                domino = state.boneyard.pop()
+                hand.add_domino(domino)
+                drawn.append(domino)
+            moves = list(iter_hand_moves(hand, state.board))
+
+            if not moves:
+                if passes == 1:
+                    # Blocked game
+                    return 0.0
+                return self.search(state, 1 - side, depth - 1, alpha, beta, passes + 1)
+
+            if depth > 1 and len(moves) > 1:
+                moves = self.order_moves(state, side, moves)
+
+            maximizing = side == 0
+            best = float("-inf") if maximizing else float("inf")
+            for move in moves:
+                value = self.play_value(state, side, move, depth, alpha, beta)
+                if maximizing:
+                    best = max(best, value)
+                    alpha = max(alpha, value)
+                else:
+                    best = min(best, value)
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    break
+            return best
+        finally:
+            for domino in reversed(drawn):
+                hand.remove_domino(domino)
+                state.boneyard.append(domino)
+
+    def search_root(
+        self, states: List[SearchState], moves: List[Move], depth: int
+    ) -> List[float]:
+        totals = [0.0] * len(moves)
+        for state in states:
+            for idx, move in enumerate(moves):
+                totals[idx] += self.play_value(
+                    state, 0, move, depth, float("-inf"), float("inf")
+                )
+        return [total / len(states) for total in totals]
+
+    def choose_next_move(self, board: DominoBoard):
+        moves = self.get_possible_moves(board)
+        if len(moves) == 0:
+            return Move()
+        if len(moves) == 1:
+            return moves[0]
+
+        start = time.perf_counter()
+        self.deadline = None if self.time_budget is None else start + self.time_budget
+        self.nodes = 0
+        if self.transposition_table is not None:
+            # Entries are only valid for this move's samples
+            self.transposition_table.clear()
+
+        states = self.sample_states(board)
+        moves = self.order_moves(states[0], 0, moves)
+        values = None
+        depth_reached = 0
+        for depth in range(1, self.max_depth + 1):
+            try:
+                values = self.search_root(states, moves, depth)
+            except SearchTimeout:
+                break
+            depth_reached = depth
+            # Search the best move first on the next iteration
+            order = sorted(range(len(moves)), key=lambda i: values[i], reverse=True)
+            moves = [moves[i] for i in order]
+            values = [values[i] for i in order]
+
+        self.last_search = {
+            "depth": depth_reached,
+            "nodes": self.nodes,
+            "seconds": time.perf_counter() - start,
+        }
+        if self.transposition_table is not None:
+            self.last_search["tt_hit_rate"] = self.transposition_table.hit_rate
+        # Moves are sorted best first after every completed depth, and by the
+        # ordering heuristic if not even depth 1 finished
+        return moves[0]
@@ -0,0 +1,290 @@
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from .evaluation import EvaluatorPlayer
+from .features import DTYPE, FEATURE_NAMES, get_player_features, move_features
+from .game import Game
+from .mcts import get_move_key
+from .player import Hand, Player, RandomPlayer
+from .search import SearchPlayer
+from .simulation import game_rng
+
+# Self-play output is a directory holding meta.json and one subdirectory per
+# shard. Shard i holds every decision of games [i * games_per_shard,
+# (i + 1) * games_per_shard) as one .npy file per column, so a column can be
+# loaded or memory-mapped on its own. Shards are written under a temporary
+# name and renamed once complete, so an interrupted run leaves only whole
+# shards and is resumed by running it again.
+VERSION = 1
+META_FILE = "meta.json"
+SHARD_FILE = "shard.json"
+TEMP_SUFFIX = ".tmp"
+PLAYERS: Dict[str, Type[Player]] = {
+    "random": RandomPlayer,
+    "evaluator": EvaluatorPlayer,
+    "search": SearchPlayer,
+}
+# name -> (dtype, shape of one row)
+COLUMNS = {
+    # Position before and after the chosen move
+    "features": (DTYPE, (len(FEATURE_NAMES),)),
+    "after": (DTYPE, (len(FEATURE_NAMES),)),
+    # (tile, endpoint, attach) as in CompactBoard.placements
+    "move": (np.int8, (3,)),
+    "n_moves": (np.int16, ()),
+    "game": (np.int64, ()),
+    "player": (np.int8, ()),
+    "turn": (np.int16, ()),
+    # The player's final score less the best other player's
+    "outcome": (np.int16, ()),
+}
+
+
+def get_shard_name(index: int) -> str:
+    return "shard_{:06d}".format(index)
+
+
+def get_shard_games(index: int, games_per_shard: int, n_games: int) -> range:
+    return range(index * games_per_shard, min((index + 1) * games_per_shard, n_games))
+
+
+def get_shard_jobs(games_per_shard: int, n_games: int) -> List[Tuple[int, range]]:
+    n_shards = -(-n_games // games_per_shard)
+    return [
+        (index, get_shard_games(index, games_per_shard, n_games))
+        for index in range(n_shards)
+    ]
+
+
+def play_game_decisions(
+    player_classes: Sequence[Type[Player]], seed: int, game_index: int
+) -> Dict[str, list]:
+    # Plays one game and returns a row for every move made, in play order
+    with contextlib.ExitStack() as stack:
+        players = [
+            stack.enter_context(cls(Hand([]), name="player{}".format(i + 1)))
+            for i, cls in enumerate(player_classes)
+        ]
+        return play_decisions(
+            Game(players, verbose=False, rng=game_rng(seed, game_index)), game_index
+        )
+
+
+def play_decisions(game: Game, game_index: int) -> Dict[str, list]:
+    rows: Dict[str, list] = {name: [] for name in COLUMNS}
+    while True:
+        player = game.begin_turn()
+        move = player.choose_next_move(game.board)
+        if not move.is_pass_move:
+            rows["features"].append(get_player_features(player, game.board))
+            rows["after"].append(move_features(player, game.board, [move])[0])
+            rows["move"].append(get_move_key(move))
+            rows["n_moves"].append(len(player.get_possible_moves(game.board)))
+            rows["player"].append(game.turn)
+            rows["turn"].append(game.turn_count)
+        if game.apply_move(move):
+            break
+
+    scores = game.get_result().scores
+    rows["game"] = [game_index] * len(rows["player"])
+    rows["outcome"] = [
+        scores[seat] - max(s for i, s in enumerate(scores) if i != seat)
+        for seat in rows["player"]
+    ]
+    return rows
+
+
+def play_shard(
+    player_classes: Sequence[Type[Player]], seed: int, games: range
+) -> Dict[str, np.ndarray]:
+    columns: Dict[str, list] = {name: [] for name in COLUMNS}
+    for game_index in games:
+        for name, values in play_game_decisions(
+            player_classes, seed, game_index
+        ).items():
+            columns[name].extend(values)
+    arrays = {}
+    for name, (dtype, shape) in COLUMNS.items():
+        array = np.array(columns[name], dtype=dtype)
+        arrays[name] = array.reshape((len(columns[name]),) + shape)
+    return arrays
+
+
+def is_shard_complete(path: str, games: range) -> bool:
+    try:
+        with open(os.path.join(path, SHARD_FILE)) as file:
+            info = json.load(file)
+    except (OSError, ValueError):
+        return False
+    return info.get("start") == games.start and info.get("stop") == games.stop
+
+
+def write_shard(path: str, arrays: Dict[str, np.ndarray], games: range):
+    temp_path = path + TEMP_SUFFIX
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+    for name, array in arrays.items():
+        np.save(os.path.join(temp_path, name + ".npy"), array)
+    with open(os.path.join(temp_path, SHARD_FILE), "w") as file:
+        json.dump(
+            {"start": games.start, "stop": games.stop, "rows": len(arrays["game"])},
+            file,
+        )
+    # A shard left over from a run with a different n_games is replaced
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(temp_path, path)
+
+
+def generate_shard(
+    out_dir: str,
+    index: int,
+    player_classes: Sequence[Type[Player]],
+    seed: int,
+    games: range,
+) -> int:
+    # Worker entry point. Returns the number of rows written, or -1 if the
+    # shard was already complete.
+    path = os.path.join(out_dir, get_shard_name(index))
+    if is_shard_complete(path, games):
+        return -1
+    arrays = play_shard(player_classes, seed, games)
+    write_shard(path, arrays, games)
+    return len(arrays["game"])
+
+
+def check_meta(out_dir: str, meta: dict):
+    # Writes meta.json after checking an existing one matches, so that resumed
+    # runs add compatible shards. n_games may change between runs, and the
+    # latest value says which shards belong to the data.
+    path = os.path.join(out_dir, META_FILE)
+    if os.path.exists(path):
+        existing = read_meta(out_dir)
+        existing.pop("n_games", None)
+        if existing != {key: value for key, value in meta.items() if key != "n_games"}:
+            raise ValueError(
+                "{} holds self-play data with different settings".format(out_dir)
+            )
+    with open(path + TEMP_SUFFIX, "w") as file:
+        json.dump(meta, file, indent=2)
+    os.replace(path + TEMP_SUFFIX, path)
+
+
+def read_meta(out_dir: str) -> dict:
+    with open(os.path.join(out_dir, META_FILE)) as file:
+        return json.load(file)
+
+
+class SelfPlayResult:
+    def __init__(self, written: int, skipped: int, rows: int, elapsed: float):
+        self.written = written
+        self.skipped = skipped
+        self.rows = rows
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return "SelfPlayResult(written={}, skipped={}, rows={}, elapsed={:.1f})".format(
+            self.written, self.skipped, self.rows, self.elapsed
+        )
+
+
+def run_selfplay(
+    out_dir: str,
+    player_names: Sequence[str],
+    n_games: int,
+    seed: int = 0,
+    games_per_shard: int = 1000,
+    workers: Optional[int] = None,
+) -> SelfPlayResult:
+    # Each worker holds at most one shard in memory. Games are seeded by
+    # (seed, game index), so the data does not depend on the number of
+    # workers or on how often the run was interrupted.
+    player_classes = [PLAYERS[name] for name in player_names]
+    os.makedirs(out_dir, exist_ok=True)
+    check_meta(
+        out_dir,
+        {
+            "version": VERSION,
+            "seed": seed,
+            "games_per_shard": games_per_shard,
+            "players": list(player_names),
+            "features": FEATURE_NAMES,
+            "n_games": n_games,
+        },
+    )
+    jobs = get_shard_jobs(games_per_shard, n_games)
+
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        counts = [
+            generate_shard(out_dir, index, player_classes, seed, games)
+            for index, games in jobs
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    generate_shard, out_dir, index, player_classes, seed, games
+                )
+                for index, games in jobs
+            ]
+            counts = [future.result() for future in futures]
+
+    written = [count for count in counts if count >= 0]
+    return SelfPlayResult(
+        len(written),
+        len(counts) - len(written),
+        sum(written),
+        time.perf_counter() - start,
+    )
+
+
+def iter_shards(
+    out_dir: str, columns: Optional[List[str]] = None
+) -> Iterator[Dict[str, np.ndarray]]:
+    # Complete shards of the last run's games in game order, memory-mapped one
+    # at a time. Shards left over from a run with more games are skipped.
+    meta = read_meta(out_dir)
+    for index, games in get_shard_jobs(meta["games_per_shard"], meta["n_games"]):
+        path = os.path.join(out_dir, get_shard_name(index))
+        if not is_shard_complete(path, games):
+            continue
+        yield {
+            column: np.load(os.path.join(path, column + ".npy"), mmap_mode="r")
+            for column in columns or COLUMNS
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate self-play training data")
+    parser.add_argument("out_dir")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--games-per-shard", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument(
+        "--players", nargs="+", default=["random", "random"], choices=sorted(PLAYERS)
+    )
+    args = parser.parse_args(argv)
+    result = run_selfplay(
+        args.out_dir,
+        args.players,
+        args.games,
+        args.seed,
+        args.games_per_shard,
+        args.workers,
+    )
+    print(result)
+    print("{:.0f} rows/s".format(result.rows / result.elapsed if result.rows else 0))
+
+
+if __name__ == "__main__":
+    main()
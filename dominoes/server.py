@@ -0,0 +1,494 @@
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import logging
+import random
+import time
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .game import Game
+from .mcts import get_move_key
+from .player import Hand, Move, Player, RandomPlayer
+from .search import SearchPlayer
+
+# Newline-delimited JSON over TCP or a Unix socket. Clients send
+#   {"type": "new_game", "bot": "random", "seed": 1}
+#   {"type": "move", "game": 3, "move": 0}
+# where move indexes the "moves" list of the last "your_turn" message for
+# that game. The server answers with "game_started", "your_turn",
+# "game_over" and "error" messages. An error with a "game" field ends that
+# game. Passing is automatic. Lines longer than MESSAGE_LIMIT are rejected.
+MESSAGE_LIMIT = 1 << 16
+# Entries in each search bot's transposition table. A move within the
+# default time budget stores a few hundred positions, so the default table
+# would be mostly empty and cost 0.5MB per game.
+SEARCH_TABLE_SIZE = 1 << 12
+# name -> (player factory, whether its moves run in the executor).
+# RandomPlayer moves take microseconds, less than handing them to a thread.
+BOTS: Dict[str, Tuple[Callable[..., Player], bool]] = {
+    "random": (RandomPlayer, False),
+    "search": (
+        functools.partial(SearchPlayer, transposition_table_size=SEARCH_TABLE_SIZE),
+        True,
+    ),
+}
+DEFAULT_BOT = "random"
+# Bot moves that may be running or queued in the executor at once. Beyond
+# that the server is saturated, and bots play their first legal move rather
+# than keep clients waiting behind the queue. Searches hold the GIL, so more
+# at once would only split one core between them.
+MAX_BOT_MOVES = 4
+# Pending connections the listening socket queues, so a burst of clients
+# does not wait on SYN retries
+BACKLOG = 4096
+
+logger = logging.getLogger(__name__)
+
+
+class RemotePlayer(Player):
+    # Moves come from the client, so choose_next_move is never called
+    def choose_next_move(self, board):
+        raise RuntimeError("Remote players move through GameSession")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def read_line(reader: asyncio.StreamReader) -> Optional[bytes]:
+    # Like readline, but a line longer than the reader's limit is skipped up
+    # to its newline and returned as None
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+    except asyncio.LimitOverrunError:
+        pass
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError as error:
+            # Nothing was consumed, so drop what was looked at
+            await reader.readexactly(error.consumed)
+
+
+class GameSession:
+    """One game between a remote client and a bot.
+
+    The game runs as a task that waits for the client's move message on its
+    turn and runs the bot's choose_next_move in an executor, so thousands of
+    sessions can share one event loop. If bot_slots is given and none are
+    free, the bot plays its first legal move instead of queueing.
+    """
+
+    def __init__(
+        self,
+        game_id: int,
+        bot_cls: Callable[..., Player],
+        send,
+        seed: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        offload: bool = True,
+        bot_slots: Optional[asyncio.Semaphore] = None,
+    ):
+        self.game_id = game_id
+        self.send = send
+        self.executor = executor
+        self.offload = offload
+        self.bot_slots = bot_slots
+        self.remote = RemotePlayer(Hand([]), name="remote")
+        self.bot = bot_cls(Hand([]), name="bot")
+        self.game = Game(
+            [self.remote, self.bot], verbose=False, rng=random.Random(seed)
+        )
+        self.moves: List[Move] = []
+        self.pending: Optional[asyncio.Future] = None
+        # Seconds the server spent on each bot move
+        self.bot_latencies: List[float] = []
+        # Bot moves played without search because the server was saturated
+        self.fallback_moves = 0
+
+    def get_state(self) -> dict:
+        return {
+            "type": "your_turn",
+            "game": self.game_id,
+            "hand": [[d.side1.value, d.side2.value] for d in self.remote.hand],
+            "ends": sorted(
+                end.get_playable_value() for end in self.game.board.endpoints
+            ),
+            "scores": [player.score for player in self.game.players],
+            "boneyard": len(self.game.domino_set.dominoes),
+            "moves": [list(get_move_key(move)) for move in self.moves],
+        }
+
+    def receive_move(self, index) -> Optional[str]:
+        # Returns an error message if the move cannot be accepted
+        if self.pending is None or self.pending.done():
+            return "Not your turn"
+        # bool is an int subclass, but JSON true and false are not indexes
+        if (
+            not isinstance(index, int)
+            or isinstance(index, bool)
+            or not 0 <= index < len(self.moves)
+        ):
+            return "Invalid move index"
+        self.pending.set_result(self.moves[index])
+        return None
+
+    async def get_remote_move(self) -> Move:
+        self.moves = self.remote.get_possible_moves(self.game.board)
+        if not self.moves:
+            return Move()
+        self.pending = asyncio.get_running_loop().create_future()
+        await self.send(self.get_state())
+        return await self.pending
+
+    async def run_bot_in_executor(self) -> Move:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self.bot.choose_next_move, self.game.board
+        )
+
+    async def get_bot_move(self) -> Move:
+        start = time.perf_counter()
+        if not self.offload:
+            move = self.bot.choose_next_move(self.game.board)
+        elif self.bot_slots is None:
+            move = await self.run_bot_in_executor()
+        elif self.bot_slots.locked():
+            move = next(self.bot.iter_possible_moves(self.game.board), Move())
+            self.fallback_moves += 1
+        else:
+            async with self.bot_slots:
+                move = await self.run_bot_in_executor()
+        self.bot_latencies.append(time.perf_counter() - start)
+        return move
+
+    async def run(self):
+        game = self.game
+        while True:
+            player = game.begin_turn()
+            if player is self.remote:
+                move = await self.get_remote_move()
+            else:
+                move = await self.get_bot_move()
+            if game.apply_move(move):
+                break
+        result = game.get_result()
+        await self.send(
+            {
+                "type": "game_over",
+                "game": self.game_id,
+                "scores": result.scores,
+                "winner": result.winner,
+                "blocked": result.blocked,
+                "moves": result.move_count,
+            }
+        )
+
+
+class GameServer:
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        max_bot_moves: Optional[int] = MAX_BOT_MOVES,
+    ):
+        # executor runs bot moves, None for the event loop's default.
+        # max_bot_moves=None lets every bot move queue for the executor.
+        self.executor = executor
+        self.bot_slots = (
+            None if max_bot_moves is None else asyncio.Semaphore(max_bot_moves)
+        )
+        self.sessions: Dict[int, GameSession] = {}
+        self.game_ids = itertools.count(1)
+        self.games_played = 0
+        self.bot_latencies: List[float] = []
+        self.fallback_moves = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        # Connection handler tasks, cancelled by close()
+        self.clients: Set[asyncio.Task] = set()
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0):
+        self.server = await asyncio.start_server(
+            self.handle_client, host, port, backlog=BACKLOG, limit=MESSAGE_LIMIT
+        )
+        return self.server.sockets[0].getsockname()
+
+    async def start_unix(self, path: str):
+        self.server = await asyncio.start_unix_server(
+            self.handle_client, path, backlog=BACKLOG, limit=MESSAGE_LIMIT
+        )
+        return path
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self.clients:
+            task.cancel()
+        await asyncio.gather(*self.clients, return_exceptions=True)
+
+    def get_stats(self) -> dict:
+        return {
+            "active_games": len(self.sessions),
+            "games_played": self.games_played,
+            "bot_move_p50": percentile(self.bot_latencies, 0.5),
+            "bot_move_p99": percentile(self.bot_latencies, 0.99),
+            "bot_fallbacks": self.fallback_moves,
+        }
+
+    async def run_session(self, session: GameSession):
+        try:
+            await session.run()
+            self.games_played += 1
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        except Exception:
+            # A bot or the game failed. The client is told, rather than left
+            # waiting for a move that never comes.
+            logger.exception("Game %d failed", session.game_id)
+            try:
+                await session.send(
+                    {
+                        "type": "error",
+                        "game": session.game_id,
+                        "message": "Game failed",
+                    }
+                )
+            except ConnectionError:
+                pass
+        finally:
+            session.bot.close()
+            self.bot_latencies.extend(session.bot_latencies)
+            self.fallback_moves += session.fallback_moves
+            del self.sessions[session.game_id]
+
+    async def handle_client(self, reader, writer):
+        lock = asyncio.Lock()
+
+        async def send(message: dict):
+            async with lock:
+                writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+
+        tasks = []
+        own_games = set()
+        self.clients.add(asyncio.current_task())
+        try:
+            while True:
+                line = await read_line(reader)
+                if line is None:
+                    await send({"type": "error", "message": "Message too long"})
+                    continue
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    kind = message["type"]
+                except (ValueError, KeyError, TypeError):
+                    await send({"type": "error", "message": "Malformed message"})
+                    continue
+
+                if kind == "new_game":
+                    bot = BOTS.get(str(message.get("bot", DEFAULT_BOT)))
+                    if bot is None:
+                        await send({"type": "error", "message": "Unknown bot"})
+                        continue
+                    seed = message.get("seed")
+                    if seed is not None and (
+                        not isinstance(seed, int) or isinstance(seed, bool)
+                    ):
+                        await send({"type": "error", "message": "Invalid seed"})
+                        continue
+                    bot_cls, offload = bot
+                    game_id = next(self.game_ids)
+                    session = GameSession(
+                        game_id,
+                        bot_cls,
+                        send,
+                        seed,
+                        self.executor,
+                        offload,
+                        self.bot_slots,
+                    )
+                    self.sessions[game_id] = session
+                    own_games.add(game_id)
+                    await send({"type": "game_started", "game": game_id})
+                    tasks.append(asyncio.create_task(self.run_session(session)))
+                elif kind == "move":
+                    game_id = message.get("game")
+                    session = None
+                    if isinstance(game_id, int) and game_id in own_games:
+                        session = self.sessions.get(game_id)
+                    if session is None:
+                        error = "Unknown game"
+                    else:
+                        error = session.receive_move(message.get("move"))
+                    if error is not None:
+                        await send({"type": "error", "message": error})
+                elif kind == "stats":
+                    await send(dict(self.get_stats(), type="stats"))
+                else:
+                    await send({"type": "error", "message": "Unknown type"})
+        except (ConnectionError, asyncio.CancelledError):
+            # Closed by the client or by close()
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+            self.clients.discard(asyncio.current_task())
+
+
+async def open_connection(host: str, port: int, path: Optional[str]):
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+
+async def play_client_games(
+    host: str,
+    port: int,
+    n_games: int,
+    seed: int,
+    latencies: List[float],
+    path: Optional[str] = None,
+    bot: str = DEFAULT_BOT,
+):
+    # Plays n_games one after another on one connection, choosing random
+    # legal moves, and records the seconds from sending each move to being
+    # asked for the next one
+    rng = random.Random(seed)
+    reader, writer = await open_connection(host, port, path)
+
+    async def send(message: dict):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+    try:
+        for game in range(n_games):
+            await send({"type": "new_game", "bot": bot, "seed": seed * 100003 + game})
+            sent_at = None
+            while True:
+                message = json.loads(await reader.readline())
+                if message["type"] == "error":
+                    raise RuntimeError(message["message"])
+                if message["type"] == "game_over":
+                    break
+                if message["type"] == "your_turn":
+                    if sent_at is not None:
+                        latencies.append(time.perf_counter() - sent_at)
+                    sent_at = time.perf_counter()
+                    await send(
+                        {
+                            "type": "move",
+                            "game": message["game"],
+                            "move": rng.randrange(len(message["moves"])),
+                        }
+                    )
+    finally:
+        writer.close()
+
+
+async def run_load_test(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    clients: int = 100,
+    games_per_client: int = 1,
+    seed: int = 0,
+    path: Optional[str] = None,
+    bot: str = DEFAULT_BOT,
+) -> dict:
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            play_client_games(
+                host, port, games_per_client, seed + client, latencies, path, bot
+            )
+            for client in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    games = clients * games_per_client
+    return {
+        "games": games,
+        "moves": len(latencies),
+        "seconds": elapsed,
+        "games_per_second": games / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1e3,
+        "p90_ms": percentile(latencies, 0.9) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "max_ms": max(latencies, default=0.0) * 1e3,
+    }
+
+
+async def serve_and_load_test(**kwargs) -> dict:
+    # Runs a server and the load test clients in the same event loop
+    server = GameServer()
+    host, port = await server.start_tcp()
+    try:
+        return await run_load_test(host, port, **kwargs)
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Domino game server")
+    parser.add_argument("command", choices=["serve", "loadtest"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Unix socket path instead of TCP")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--games", type=int, default=1, help="Games per client")
+    parser.add_argument("--bot", default=DEFAULT_BOT, choices=sorted(BOTS))
+    parser.add_argument(
+        "--local", action="store_true", help="Load test a server in this process"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+
+        async def serve():
+            server = GameServer()
+            if args.unix:
+                await server.start_unix(args.unix)
+            else:
+                await server.start_tcp(args.host, args.port)
+            await server.server.serve_forever()
+
+        asyncio.run(serve())
+    elif args.local:
+        stats = asyncio.run(
+            serve_and_load_test(
+                clients=args.clients, games_per_client=args.games, bot=args.bot
+            )
+        )
+    else:
+        stats = asyncio.run(
+            run_load_test(
+                args.host,
+                args.port,
+                args.clients,
+                args.games,
+                path=args.unix,
+                bot=args.bot,
+            )
+        )
+    if args.command == "loadtest":
+        for name, value in stats.items():
+            print("{:<18} {:.2f}".format(name, value))
+
+
+if __name__ == "__main__":
+    main()
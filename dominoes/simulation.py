@@ -0,0 +1,88 @@
+import random
+import time
+from typing import List, Optional, Type
+
+from .game import GameResult, GameTwoPlayer
+from .player import Hand, Player
+
+
+class SimulationResult:
+    def __init__(self, games: List[GameResult], elapsed: float):
+        self.games = games
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return "SimulationResult(games={}, wins={}, ties={}, games_per_second={:.1f})".format(
+            len(self.games), self.wins, self.ties, self.games_per_second
+        )
+
+    @property
+    def games_per_second(self) -> float:
+        if self.elapsed == 0:
+            return float("inf")
+        return len(self.games) / self.elapsed
+
+    @property
+    def wins(self) -> List[int]:
+        wins = [0, 0]
+        for game in self.games:
+            if game.winner is not None:
+                wins[game.winner] += 1
+        return wins
+
+    @property
+    def ties(self) -> int:
+        return sum(1 for game in self.games if game.winner is None)
+
+    @property
+    def total_scores(self) -> List[int]:
+        totals = [0, 0]
+        for game in self.games:
+            totals[0] += game.scores[0]
+            totals[1] += game.scores[1]
+        return totals
+
+
+def game_rng(seed: int, game_index: int) -> random.Random:
+    # Every game gets its own generator derived only from the tournament seed
+    # and the game's index, so results do not depend on how games are split up
+    return random.Random("{}:{}".format(seed, game_index))
+
+
+def play_headless_game(
+    player1_cls: Type[Player],
+    player2_cls: Type[Player],
+    rng: Optional[random.Random] = None,
+) -> GameResult:
+    with player1_cls(Hand([]), name="player1") as player1:
+        with player2_cls(Hand([]), name="player2") as player2:
+            game = GameTwoPlayer(player1, player2, verbose=False, rng=rng)
+            return game.play()
+
+
+def play_game_range(
+    player1_cls: Type[Player],
+    player2_cls: Type[Player],
+    seed: Optional[int],
+    start: int,
+    stop: int,
+) -> List[GameResult]:
+    return [
+        play_headless_game(
+            player1_cls, player2_cls, None if seed is None else game_rng(seed, i)
+        )
+        for i in range(start, stop)
+    ]
+
+
+def simulate_games(
+    player1_cls: Type[Player],
+    player2_cls: Type[Player],
+    n_games: int,
+    seed: Optional[int] = None,
+) -> SimulationResult:
+    # Run n_games without printing or drawing anything. Fresh players are built
+    # for every game so scores never leak between games.
+    start = time.perf_counter()
+    games = play_game_range(player1_cls, player2_cls, seed, 0, n_games)
+    return SimulationResult(games, time.perf_counter() - start)
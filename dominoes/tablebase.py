@@ -0,0 +1,319 @@
+import hashlib
+import mmap
+import os
+import random
+import struct
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .compact import (
+    ALL_TILES_MASK,
+    END_PIPS,
+    MID_SIDE1,
+    SIDES_PER_TILE,
+    TILES,
+    CompactBoard,
+    domino_tile_id,
+    endpoint_id,
+    hand_to_mask,
+    is_double,
+    mask_to_tiles,
+    side_index,
+)
+from .domino import DominoBoard
+from .player import Hand, Move, Player, RandomPlayer
+from .record import record_game
+from .zobrist import DOUBLE_END_SIDE, MID_SIDE, REGULAR_SIDE, zobrist_key
+
+# Probe tables are open-addressing hash tables stored as a header followed by
+# a power of two number of fixed-size (key, value, count) slots. Key 0 marks
+# an empty slot. Files are memory-mapped and probed in place.
+MAGIC = b"DOMTABLE"
+VERSION = 1
+HEADER = struct.Struct("<8sHHQ")
+ENTRY = struct.Struct("<QfI")
+EMPTY_KEY = 0
+MAX_LOAD_FACTOR = 0.5
+
+CompactMove = Tuple[int, int, int]
+# Value of a position for the side to move, or None if it is unknown
+Lookup = Callable[[CompactBoard, int, int], Optional[float]]
+
+
+def get_tile_pips(mask: int) -> int:
+    # Hand.get_total_value for the tiles in mask
+    return sum(low + high for tile, (low, high) in enumerate(TILES) if mask >> tile & 1)
+
+
+def get_end_kind(end: int) -> int:
+    if end % SIDES_PER_TILE >= MID_SIDE1:
+        return MID_SIDE
+    if is_double(end // SIDES_PER_TILE):
+        return DOUBLE_END_SIDE
+    return REGULAR_SIDE
+
+
+def endgame_key(board: CompactBoard, mover: int, other: int) -> int:
+    # The open ends' pips and kinds decide the board score and every move
+    # still to come, so boards reached through different move orders share
+    # a key just as in DominoBoard.get_hash
+    ends = sorted((END_PIPS[end], get_end_kind(end)) for end in board.get_ends())
+    data = struct.pack("<QQ", mover, other) + bytes(
+        part for end in ends for part in end
+    )
+    key = int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+    return key or 1
+
+
+def opening_key(tile: int) -> int:
+    return zobrist_key("opening", tile) or 1
+
+
+def play_value(
+    board: CompactBoard, mover: int, other: int, move: CompactMove, lookup: Lookup
+) -> Optional[float]:
+    # Points the side to move gains over the other side for the rest of the
+    # game by playing move, with the rules of GameTwoPlayer.play
+    tile = move[0]
+    child = board.copy()
+    child.add(*move)
+    score = child.get_score()
+    scored = score % 5 == 0
+    points = score // 5 if scored else 0
+    mover &= ~(1 << tile)
+    if mover == 0:
+        return points + max(get_tile_pips(other) // 5, 1)
+    if is_double(tile) or scored:
+        value = lookup(child, mover, other)
+        return None if value is None else points + value
+    value = lookup(child, other, mover)
+    return None if value is None else points - value
+
+
+def position_value(
+    board: CompactBoard, mover: int, other: int, lookup: Lookup
+) -> Optional[float]:
+    moves = board.possible_moves(mover)
+    if not moves:
+        # With an empty boneyard the side to move passes, and the game is
+        # blocked if the other side cannot move either
+        if not board.possible_moves(other):
+            return 0.0
+        value = lookup(board, other, mover)
+        return None if value is None else -value
+
+    best = None
+    for move in moves:
+        value = play_value(board, mover, other, move, lookup)
+        if value is None:
+            return None
+        if best is None or value > best:
+            best = value
+    return best
+
+
+class EndgameSolver:
+    # Exact values of positions with an empty boneyard, memoized by key
+    def __init__(self):
+        self.values: Dict[int, float] = {}
+
+    def solve(self, board: CompactBoard, mover: int, other: int) -> float:
+        key = endgame_key(board, mover, other)
+        value = self.values.get(key)
+        if value is None:
+            value = position_value(board, mover, other, self.solve)
+            self.values[key] = value
+        return value
+
+
+class ProbeTable:
+    """Read-only open-addressing hash table of (value, count) by 64-bit key."""
+
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, entry_size, n_slots = HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC or version != VERSION or entry_size != ENTRY.size:
+            self.close()
+            raise ValueError("{} is not a version {} probe table".format(path, VERSION))
+        self.n_slots = n_slots
+        self.slot_mask = n_slots - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return sum(1 for _ in self.items())
+
+    def probe(self, key: int) -> Optional[Tuple[float, int]]:
+        slot = key & self.slot_mask
+        while True:
+            found, value, count = ENTRY.unpack_from(
+                self.mmap, HEADER.size + slot * ENTRY.size
+            )
+            if found == key:
+                return value, count
+            if found == EMPTY_KEY:
+                return None
+            slot = (slot + 1) & self.slot_mask
+
+    def items(self):
+        for slot in range(self.n_slots):
+            key, value, count = ENTRY.unpack_from(
+                self.mmap, HEADER.size + slot * ENTRY.size
+            )
+            if key != EMPTY_KEY:
+                yield key, (value, count)
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+    @staticmethod
+    def write(path: str, entries: Dict[int, Tuple[float, int]]):
+        n_slots = 1
+        while n_slots * MAX_LOAD_FACTOR < max(len(entries), 1):
+            n_slots *= 2
+        slots = bytearray(n_slots * ENTRY.size)
+        for key, (value, count) in entries.items():
+            assert key != EMPTY_KEY, "Key 0 marks an empty slot"
+            slot = key & (n_slots - 1)
+            while ENTRY.unpack_from(slots, slot * ENTRY.size)[0] != EMPTY_KEY:
+                slot = (slot + 1) & (n_slots - 1)
+            ENTRY.pack_into(slots, slot * ENTRY.size, key, value, count)
+
+        # Written to a temporary file first so readers never see half a table
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, ENTRY.size, n_slots))
+            file.write(slots)
+        os.replace(temp_path, path)
+
+
+def random_endgame(rng: random.Random, n_tiles: int) -> Tuple[CompactBoard, int, int]:
+    # A board built from random legal moves with n_tiles left, split between
+    # two non-empty hands
+    while True:
+        board = CompactBoard()
+        remaining = ALL_TILES_MASK
+        while bin(remaining).count("1") > n_tiles:
+            moves = board.possible_moves(remaining)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            board.add(*move)
+            remaining &= ~(1 << move[0])
+        if bin(remaining).count("1") == n_tiles:
+            break
+
+    tiles = mask_to_tiles(remaining)
+    rng.shuffle(tiles)
+    split = rng.randint(1, n_tiles - 1)
+    mover = sum(1 << tile for tile in tiles[:split])
+    return board, mover, remaining & ~mover
+
+
+def generate_endgames(
+    path: str, n_positions: int, max_tiles: int = 6, seed: int = 0
+) -> int:
+    # Solves n_positions random endgames with 2 to max_tiles tiles in hand,
+    # along with every position searched on the way, and writes them to path
+    rng = random.Random(seed)
+    solver = EndgameSolver()
+    for _ in range(n_positions):
+        solver.solve(*random_endgame(rng, rng.randint(2, max_tiles)))
+    ProbeTable.write(path, {key: (value, 1) for key, value in solver.values.items()})
+    return len(solver.values)
+
+
+def build_opening_book(path: str, n_games: int, seed: int = 0) -> int:
+    # Mean final score difference for the opening player by first tile,
+    # over n_games games between random players
+    totals: Dict[int, Tuple[float, int]] = {}
+    for game_index in range(n_games):
+        record = record_game(RandomPlayer, RandomPlayer, seed, game_index)
+        tile = record.placements[0][0]
+        opener = record.first_turn
+        difference = record.scores[opener] - record.scores[1 - opener]
+        total, count = totals.get(tile, (0.0, 0))
+        totals[tile] = (total + difference, count + 1)
+    ProbeTable.write(
+        path,
+        {
+            opening_key(tile): (total / count, count)
+            for tile, (total, count) in totals.items()
+        },
+    )
+    return len(totals)
+
+
+class TablebasePlayer(Player):
+    """Plays the first move from an opening book and solved endgames exactly.
+
+    Either table may be left out. Positions neither table covers are played
+    like RandomPlayer.
+    """
+
+    def __init__(
+        self,
+        hand: Hand,
+        name: str = "player",
+        endgames: Optional[ProbeTable] = None,
+        book: Optional[ProbeTable] = None,
+    ):
+        super().__init__(hand, name)
+        self.endgames = endgames
+        self.book = book
+        self.probes = 0
+        self.hits = 0
+
+    def lookup(self, board: CompactBoard, mover: int, other: int) -> Optional[float]:
+        self.probes += 1
+        entry = self.endgames.probe(endgame_key(board, mover, other))
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def choose_opening(self, moves: List[Move]) -> Move:
+        def key(move):
+            entry = self.book.probe(opening_key(domino_tile_id(move.domino_to_play)))
+            return float("-inf") if entry is None else entry[0]
+
+        return max(moves, key=key)
+
+    def choose_endgame(self, board: DominoBoard, moves: List[Move]) -> Optional[Move]:
+        compact = CompactBoard.from_board(board)
+        mover = hand_to_mask(self.hand)
+        other = ALL_TILES_MASK & ~compact.on_board & ~mover
+        best = None
+        best_value = None
+        for move in moves:
+            compact_move = (
+                domino_tile_id(move.domino_to_play),
+                endpoint_id(move.side_on_board),
+                side_index(move.side_to_play),
+            )
+            value = play_value(compact, mover, other, compact_move, self.lookup)
+            if value is None:
+                return None
+            if best_value is None or value > best_value:
+                best = move
+                best_value = value
+        return best
+
+    def choose_next_move(self, board: DominoBoard):
+        moves = self.get_possible_moves(board)
+        if len(moves) == 0:
+            return Move()
+
+        if len(board.endpoints) == 0:
+            if self.book is not None:
+                return self.choose_opening(moves)
+        elif self.endgames is not None and self.boneyard_size == 0:
+            move = self.choose_endgame(board, moves)
+            if move is not None:
+                return move
+        return moves[0]
@@ -0,0 +1,123 @@
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Tuple
+
+# Side indices of a tile, in the order Domino/DoubleDomino create them
+SIDE1 = 0
+SIDE2 = 1
+MID_SIDE1 = 2
+MID_SIDE2 = 3
+SIDES_PER_TILE = 4
+
+
+class Attachment(NamedTuple):
+    # The side of the tile laid against the open pip
+    side: int
+    # The pip left open by the tile once it is played
+    new_pip: int
+    # What the tile adds to the board score once played: the pip it leaves
+    # open, or both halves for a double laid crosswise
+    new_value: int
+
+
+class MoveTables:
+    """Immutable lookup tables for the DominoSet(min_number, max_number) set.
+
+    Tile ids index the tiles in DominoSet order. attachments[tile][pip -
+    min_number] lists every way tile can be played against an open pip,
+    empty when it does not fit. end_pips[tile * SIDES_PER_TILE + side] is
+    the pip value of each side, None for mid sides of non-doubles.
+    get_score_delta gives the change in board score for a move.
+
+    CompactBoard generates its moves and keeps its score from these tables.
+    DominoBoard works on Domino objects and finds moves through
+    Hand.sides_by_value instead.
+    """
+
+    def __init__(self, min_number: int = 0, max_number: int = 6):
+        self.min_number = min_number
+        self.max_number = max_number
+        self.tiles: Tuple[Tuple[int, int], ...] = tuple(
+            (i, j)
+            for i in range(min_number, max_number + 1)
+            for j in range(i, max_number + 1)
+        )
+        self.tile_ids: Mapping[Tuple[int, int], int] = MappingProxyType(
+            {pips: idx for idx, pips in enumerate(self.tiles)}
+        )
+        self.n_tiles = len(self.tiles)
+        self.n_doubles = max_number - min_number + 1
+        # Every double can open two extra ends once both mids are covered
+        self.max_ends = 2 + 2 * self.n_doubles
+
+        end_pips = []
+        for low, high in self.tiles:
+            end_pips.extend([low, high] + ([low, low] if low == high else [None, None]))
+        self.end_pips: Tuple[Optional[int], ...] = tuple(end_pips)
+        # What covering each endpoint takes off the board score, indexed like
+        # end_pips. A double is worth both halves until both its mid sides
+        # are covered and nothing after, so its mid sides only cost this
+        # when the other one is already covered, and its ends cost nothing.
+        covered_values = []
+        for low, high in self.tiles:
+            covered_values.extend(
+                [0, 0, 2 * low, 2 * low] if low == high else [low, high, 0, 0]
+            )
+        self.covered_values: Tuple[int, ...] = tuple(covered_values)
+
+        self.attachments: Tuple[Tuple[Tuple[Attachment, ...], ...], ...] = tuple(
+            tuple(
+                self.get_attachments(low, high, pip)
+                for pip in range(min_number, max_number + 1)
+            )
+            for low, high in self.tiles
+        )
+
+    def __repr__(self):
+        return "MoveTables(min_number={}, max_number={})".format(
+            self.min_number, self.max_number
+        )
+
+    @staticmethod
+    def get_attachments(low: int, high: int, pip: int) -> Tuple[Attachment, ...]:
+        if low == high:
+            if low != pip:
+                return ()
+            # A double is laid crosswise through either of its mid sides and
+            # is worth both halves while the other mid side is open
+            return tuple(
+                Attachment(side, low, 2 * low) for side in (MID_SIDE1, MID_SIDE2)
+            )
+        attachments = []
+        if low == pip:
+            attachments.append(Attachment(SIDE1, high, high))
+        if high == pip:
+            attachments.append(Attachment(SIDE2, low, low))
+        return tuple(attachments)
+
+    def tile_id(self, val1: int, val2: int) -> int:
+        return self.tile_ids[(min(val1, val2), max(val1, val2))]
+
+    def is_double(self, tile: int) -> bool:
+        return self.tiles[tile][0] == self.tiles[tile][1]
+
+    def get_tile_attachments(self, tile: int, pip: int) -> Tuple[Attachment, ...]:
+        return self.attachments[tile][pip - self.min_number]
+
+    def get_score_delta(
+        self, attachment: Attachment, endpoint: int, endpoint_connected: int
+    ) -> int:
+        # Change in board score from playing a tile with attachment on
+        # endpoint. Bit n of endpoint_connected is set if side n of the
+        # endpoint's tile was covered before the move.
+        side = endpoint % SIDES_PER_TILE
+        if side >= MID_SIDE1 and not endpoint_connected >> (side ^ 1) & 1:
+            # The double's other mid side is still open, so it keeps its value
+            return attachment.new_value
+        return attachment.new_value - self.covered_values[endpoint]
+
+
+@lru_cache(maxsize=None)
+def get_move_tables(min_number: int = 0, max_number: int = 6) -> MoveTables:
+    # Built once per set on first use and shared afterwards
+    return MoveTables(min_number, max_number)
@@ -0,0 +1,51 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Type
+
+from .player import Player
+from .simulation import SimulationResult, play_game_range
+
+
+def split_games(n_games: int, n_chunks: int) -> List[range]:
+    n_chunks = max(1, min(n_chunks, n_games))
+    bounds = [n_games * i // n_chunks for i in range(n_chunks + 1)]
+    return [range(bounds[i], bounds[i + 1]) for i in range(n_chunks)]
+
+
+def run_tournament(
+    player1_cls: Type[Player],
+    player2_cls: Type[Player],
+    n_games: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunks_per_worker: int = 4,
+) -> SimulationResult:
+    # Games are seeded by (seed, game index) and merged back in index order,
+    # so the result is identical for any number of workers. Player classes
+    # must be importable by the worker processes.
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    if workers == 1:
+        games = play_game_range(player1_cls, player2_cls, seed, 0, n_games)
+        return SimulationResult(games, time.perf_counter() - start)
+
+    chunks = split_games(n_games, workers * chunks_per_worker)
+    games = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                play_game_range,
+                player1_cls,
+                player2_cls,
+                seed,
+                chunk.start,
+                chunk.stop,
+            )
+            for chunk in chunks
+        ]
+        for future in futures:
+            games.extend(future.result())
+
+    return SimulationResult(games, time.perf_counter() - start)
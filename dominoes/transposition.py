@@ -0,0 +1,65 @@
+from typing import List, Optional, Tuple
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Replacement policies for a slot that already holds a different position
+REPLACE_ALWAYS = "always"
+REPLACE_DEPTH = "depth"
+
+# (key, depth, value, flag)
+Entry = Tuple[int, int, float, int]
+
+
+class TranspositionTable:
+    def __init__(self, size: int = 1 << 16, replacement: str = REPLACE_DEPTH):
+        assert size > 0, "Table size must be positive"
+        assert replacement in (REPLACE_ALWAYS, REPLACE_DEPTH), "Unknown policy"
+        self.size = size
+        self.replacement = replacement
+        self.entries: List[Optional[Entry]] = [None] * size
+
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+        self.rejected = 0
+
+    def __repr__(self):
+        return "TranspositionTable(size={}, hit_rate={:.3f})".format(
+            self.size, self.hit_rate
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def probe(self, key: int) -> Optional[Entry]:
+        self.probes += 1
+        entry = self.entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, value: float, flag: int):
+        idx = key % self.size
+        entry = self.entries[idx]
+        if entry is not None and entry[0] != key:
+            if self.replacement == REPLACE_DEPTH and entry[1] > depth:
+                self.rejected += 1
+                return
+            self.overwrites += 1
+        self.entries[idx] = (key, depth, value, flag)
+        self.stores += 1
+
+    def clear(self):
+        self.entries = [None] * self.size
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+        self.rejected = 0
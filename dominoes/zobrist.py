@@ -0,0 +1,29 @@
+import hashlib
+from functools import lru_cache
+
+MASK = (1 << 64) - 1
+
+# Endpoint kinds that score differently under DoubleDomino.get_value_in_play
+REGULAR_SIDE = 0
+MID_SIDE = 1
+DOUBLE_END_SIDE = 2
+
+
+@lru_cache(maxsize=None)
+def zobrist_key(*parts) -> int:
+    # Deterministic 64-bit key for any tuple of ints/strings, so hashes agree
+    # between processes and runs regardless of PYTHONHASHSEED
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def endpoint_key(value: int, kind: int) -> int:
+    return zobrist_key("endpoint", value, kind)
+
+
+def score_key(score: int) -> int:
+    return zobrist_key("score", score)
+
+
+def tile_key(val1: int, val2: int) -> int:
+    return zobrist_key("tile", min(val1, val2), max(val1, val2))
@@ -0,0 +1,91 @@
+import random
+
+import numpy as np
+
+from dominoes.batch import (
+    NOT_IN_HAND,
+    TABLES,
+    BatchGames,
+    BatchResult,
+    simulate_batch,
+)
+from dominoes.game import GameTwoPlayer
+from dominoes.player import Hand, RandomPlayer
+from dominoes.simulation import simulate_games
+
+
+def test_batch_games_finish():
+    games = BatchGames(200, np.random.default_rng(0))
+    result = games.run()
+
+    assert games.done.all()
+    # Every tile is in a hand, on the board or still in the boneyard
+    in_hands = (games.arrival != NOT_IN_HAND).sum(axis=(1, 2))
+    boneyard = 28 - games.next_draw
+    assert (in_hands + boneyard + result.move_count == 28).all()
+    # A game only ends with an empty hand or when blocked
+    went_out = ~(games.arrival != NOT_IN_HAND).all(axis=2).any(axis=1)
+    assert (went_out | result.blocked).all()
+
+
+def test_batch_is_seeded():
+    first = simulate_batch(300, seed=4, batch_size=100)
+    second = simulate_batch(300, seed=4, batch_size=100)
+    assert (first.scores == second.scores).all()
+    assert len(first) == 300
+
+
+def tile_id(domino):
+    return TABLES.tile_id(*sorted((domino.side1.value, domino.side2.value)))
+
+
+def test_batch_replays_object_games():
+    decks, turns, results = [], [], []
+    for seed in range(300):
+        game = GameTwoPlayer(
+            RandomPlayer(Hand([])),
+            RandomPlayer(Hand([])),
+            verbose=False,
+            rng=random.Random(seed),
+        )
+        # The hands as dealt, then the boneyard in the order it is drawn
+        deck = [domino for player in game.players for domino in player.hand]
+        deck += reversed(game.domino_set.dominoes)
+        decks.append([tile_id(domino) for domino in deck])
+        turns.append(game.turn)
+        results.append(game.play())
+
+    batch = BatchGames.from_deals(decks, turns).run()
+
+    assert batch.scores.tolist() == [list(result.scores) for result in results]
+    assert batch.move_count.tolist() == [result.move_count for result in results]
+    assert batch.turn_count.tolist() == [result.turn_count for result in results]
+    assert batch.blocked.tolist() == [result.blocked for result in results]
+
+
+def assert_same_mean(first, second, tolerance=4):
+    # Means of independent samples agree to within tolerance standard errors
+    error = np.hypot(first.std() / len(first) ** 0.5, second.std() / len(second) ** 0.5)
+    assert abs(first.mean() - second.mean()) <= tolerance * error
+
+
+def test_batch_matches_object_engine():
+    batch = simulate_batch(20000, seed=0)
+
+    objects = simulate_games(RandomPlayer, RandomPlayer, 2000, seed=0)
+    expected = BatchResult(
+        np.array([game.scores for game in objects.games]),
+        np.array([game.move_count for game in objects.games]),
+        np.array([game.turn_count for game in objects.games]),
+        np.array([game.blocked for game in objects.games]),
+    )
+
+    assert_same_mean(batch.scores, expected.scores)
+    assert_same_mean(batch.scores == 0, expected.scores == 0)
+    assert_same_mean(batch.move_count, expected.move_count)
+    assert_same_mean(batch.turn_count, expected.turn_count)
+    assert_same_mean(batch.blocked, expected.blocked)
+    assert_same_mean(
+        batch.scores[:, 0] > batch.scores[:, 1],
+        expected.scores[:, 0] > expected.scores[:, 1],
+    )
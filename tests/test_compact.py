@@ -0,0 +1,107 @@
+import random
+
+from dominoes.compact import (
+    MID_SIDE1,
+    NO_END,
+    SIDE1,
+    SIDE2,
+    CompactBoard,
+    CompactState,
+    hand_to_mask,
+    mask_to_hand,
+    tile_id,
+)
+from dominoes.domino import Domino, DominoBoard, DoubleDomino
+from dominoes.game import DominoSet, GameTwoPlayer
+from dominoes.player import Hand, Player, RandomPlayer
+
+
+def test_tile_id():
+    assert tile_id(0, 0) == 0
+    assert tile_id(0, 6) == 6
+    assert tile_id(1, 1) == 7
+    assert tile_id(6, 6) == 27
+    assert tile_id(3, 2) == tile_id(2, 3)
+
+
+def test_hand_mask_round_trip():
+    dominoes = DominoSet().dominoes
+    hand = Hand([dominoes[3], dominoes[10], dominoes[27]])
+
+    mask = hand_to_mask(hand)
+    assert mask == (1 << 3) | (1 << 10) | (1 << 27)
+    assert mask_to_hand(mask, dominoes).dominoes == hand.dominoes
+
+
+def test_compact_board_matches_objects():
+    board = DominoBoard()
+    root = DoubleDomino(3)
+    leaf1 = Domino(3, 5)
+    leaf2 = Domino(3, 4)
+    board.add_domino(root)
+    board.add_domino(leaf1, root.mid_side1, leaf1.side1)
+    board.add_domino(leaf2, root.mid_side2, leaf2.side1)
+
+    compact = CompactBoard()
+    compact.add(tile_id(3, 3))
+    compact.add(tile_id(3, 5), tile_id(3, 3) * 4 + MID_SIDE1, SIDE1)
+    compact.add(tile_id(3, 4), tile_id(3, 3) * 4 + MID_SIDE1 + 1, SIDE1)
+
+    assert sorted(compact.get_end_pips()) == sorted(
+        endpoint.get_playable_value() for endpoint in board.endpoints
+    )
+    assert compact.get_score() == board.get_score()
+    assert CompactBoard.from_board(board).placements == compact.placements
+
+
+def test_running_score_matches_objects():
+    # Random boards built from the whole set, so doubles are often spinners
+    for seed in range(50):
+        rng = random.Random(seed)
+        dominoes = DominoSet().dominoes
+        board = DominoBoard()
+        compact = CompactBoard()
+        first = rng.randrange(len(dominoes))
+        board.add_domino(dominoes[first])
+        compact.add(first)
+        while True:
+            moves = compact.possible_moves(~compact.on_board)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            compact.add(*move)
+            board = compact.to_board(DominoSet().dominoes)
+            assert compact.get_score() == compact.compute_score()
+            assert compact.get_score() == board.get_score()
+        assert compact.copy().get_score() == compact.get_score()
+
+
+def test_round_trip_played_game():
+    player1 = RandomPlayer(Hand([]))
+    player2 = RandomPlayer(Hand([]))
+    game = GameTwoPlayer(player1, player2, verbose=False, rng=random.Random(5))
+    game.play()
+
+    state = CompactState.from_game(game)
+    assert state.scores == [player1.score, player2.score]
+    assert state.board.placements[0][1:] == (NO_END, NO_END)
+
+    rebuilt = state.board.to_board()
+    assert [str(d) for d in rebuilt.dominoes] == [str(d) for d in game.board.dominoes]
+    assert rebuilt.get_score() == game.board.get_score()
+    assert CompactBoard.from_board(rebuilt).placements == state.board.placements
+
+
+def test_possible_moves_match_player():
+    dominoes = DominoSet().dominoes
+    hand = Hand(
+        [dominoes[tile_id(2, 3)], dominoes[tile_id(3, 4)], dominoes[tile_id(2, 2)]]
+    )
+    board = DominoBoard()
+    board.add_domino(dominoes[tile_id(3, 5)])
+
+    compact = CompactBoard.from_board(board)
+    moves = compact.possible_moves(hand_to_mask(hand))
+
+    assert len(moves) == len(Player(hand).get_possible_moves(board))
+    assert (tile_id(2, 3), tile_id(3, 5) * 4 + SIDE1, SIDE2) in moves
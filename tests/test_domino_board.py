@@ -1,4 +1,10 @@
-from dominoes.domino import Domino, DominoBoard
+import random
+
+import pytest
+
+from dominoes.domino import Domino, DominoBoard, DoubleDomino
+from dominoes.game import DominoSet
+from dominoes.player import RandomPlayer
 
 
 def test_root_domino():
@@ -14,3 +20,179 @@ def test_root_domino():
     assert board.dominoes == [domino]
     assert board.root_domino == domino
     assert board.endpoints == {domino.side1, domino.side2}
+
+
+def test_board_graphic_is_sparse(capsys):
+    board = DominoBoard()
+    assert board.board_graphic.positions == {}
+    assert board.board_graphic.empty_graphic is None
+
+    domino = Domino(2, 3)
+    board.add_domino(domino)
+    assert board.board_graphic.positions == {(0, 0): domino.graphic}
+
+    board.board_graphic.draw_board()
+    assert "|2|3|" in capsys.readouterr().out
+
+
+def test_endpoints_by_value():
+    root = DoubleDomino(3)
+    leaf = Domino(3, 5)
+    board = DominoBoard()
+
+    board.add_domino(root)
+    assert list(board.get_endpoints_by_value(3)) == [root.mid_side1, root.mid_side2]
+
+    undo = board.add_domino(leaf, root.mid_side1, leaf.side1)
+    assert board.endpoints_by_value == {
+        3: {root.mid_side2: None},
+        5: {leaf.side2: None},
+    }
+    assert list(board.get_endpoints_by_value(4)) == []
+
+    # Undo puts the endpoint back in its place among those of its value
+    board.undo(undo)
+    assert list(board.get_endpoints_by_value(3)) == [root.mid_side1, root.mid_side2]
+
+
+def test_running_score_matches_recomputed_score():
+    for seed in range(20):
+        domino_set = DominoSet(rng=random.Random(seed))
+        board = DominoBoard(check_score=True)
+        player = RandomPlayer(domino_set.draw_hand(28))
+
+        while True:
+            move = player.choose_next_move(board)
+            if move.is_pass_move:
+                break
+            board.add_domino(move.domino_to_play, move.side_on_board, move.side_to_play)
+            player.hand.remove_domino(move.domino_to_play)
+            assert board.get_score() == board.compute_score()
+
+
+def test_score_with_spinner():
+    root = DoubleDomino(5)
+    leaf1 = Domino(5, 1)
+    leaf2 = Domino(5, 2)
+    board = DominoBoard(check_score=True)
+
+    board.add_domino(root)
+    assert board.get_score() == 10
+    board.add_domino(leaf1, root.mid_side1, leaf1.side1)
+    assert board.get_score() == 11
+    board.add_domino(leaf2, root.mid_side2, leaf2.side1)
+    assert board.get_score() == 3
+
+
+def snapshot(board, dominoes):
+    return (
+        set(board.endpoints),
+        {value: list(sides) for value, sides in board.endpoints_by_value.items()},
+        board.get_score(),
+        dict(board.board_graphic.positions),
+        (board.board_graphic.x_min, board.board_graphic.x_max),
+        (board.board_graphic.y_min, board.board_graphic.y_max),
+        [
+            (
+                domino.orientation,
+                domino.graphic.orientation,
+                domino.graphic.x_position,
+                domino.graphic.y_position,
+                [
+                    (side.connection, side.connection_direction)
+                    for side in [domino.side1, domino.side2]
+                    + (
+                        [domino.mid_side1, domino.mid_side2]
+                        if isinstance(domino, DoubleDomino)
+                        else []
+                    )
+                ],
+            )
+            for domino in dominoes
+        ],
+    )
+
+
+def test_undo_restores_board():
+    for seed in range(10):
+        domino_set = DominoSet(rng=random.Random(seed))
+        dominoes = list(domino_set.dominoes)
+        board = DominoBoard(check_score=True)
+        player = RandomPlayer(domino_set.draw_hand(28))
+
+        history = []
+        while True:
+            move = player.choose_next_move(board)
+            if move.is_pass_move:
+                break
+            before = snapshot(board, dominoes)
+            undo = board.add_domino(
+                move.domino_to_play, move.side_on_board, move.side_to_play
+            )
+            player.hand.remove_domino(move.domino_to_play)
+            history.append((before, undo))
+
+        while history:
+            before, undo = history.pop()
+            board.undo(undo)
+            assert snapshot(board, dominoes) == before
+
+        assert board.root_domino is None
+        assert board.dominoes == []
+
+
+def test_unbounded_positions_and_overlap():
+    board = DominoBoard()
+    dominoes = [Domino(i, i + 1) for i in range(60)]
+    board.add_domino(dominoes[0])
+    for previous, domino in zip(dominoes, dominoes[1:]):
+        assert not board.would_overlap(previous.side2)
+        board.add_domino(domino, previous.side2, domino.side1)
+    # A straight chain far longer than any fixed grid
+    assert board.board_graphic.positions[(59, 0)] is dominoes[59].graphic
+    assert len(board.board_graphic.positions) == 60
+
+    assert board.get_next_position(dominoes[0].side1) == (-1, 0)
+    assert not board.would_overlap(dominoes[0].side1)
+    board.board_graphic.positions[(-1, 0)] = dominoes[0].graphic
+    assert board.would_overlap(dominoes[0].side1)
+
+
+def test_overlapping_play_keeps_both_dominoes():
+    # Two chains turned by spinners meet below the root double
+    board = DominoBoard(check_score=True)
+    root, right, left = DoubleDomino(1), Domino(1, 2), Domino(1, 6)
+    spinner1, spinner2 = DoubleDomino(2), DoubleDomino(4)
+    straight1, straight2 = Domino(2, 3), Domino(4, 5)
+    down1, down2, across = Domino(2, 4), Domino(1, 3), Domino(4, 0)
+    board.add_domino(root)
+    board.add_domino(right, root.mid_side1, right.side1)
+    board.add_domino(left, root.mid_side2, left.side1)
+    board.add_domino(spinner1, right.side2, spinner1.mid_side1)
+    board.add_domino(straight1, spinner1.mid_side2, straight1.side1)
+    board.add_domino(down1, spinner1.side1, down1.side1)
+    board.add_domino(spinner2, down1.side2, spinner2.mid_side1)
+    board.add_domino(straight2, spinner2.mid_side2, straight2.side1)
+    board.add_domino(across, spinner2.side1, across.side1)
+    board.add_domino(down2, root.side2, down2.side1)
+    under = Domino(3, 0)
+    board.add_domino(under, down2.side2, under.side1)
+    assert board.get_next_position(across.side2) == (0, -2)
+    assert board.would_overlap(across.side2)
+
+    domino = Domino(0, 5)
+    undo = board.add_domino(domino, across.side2, domino.side1)
+    graphic = board.board_graphic
+    assert graphic.get_graphics_at(0, -2) == [under.graphic, domino.graphic]
+    assert graphic.positions[(0, -2)] is domino.graphic
+    assert len(graphic.positions) + len(graphic.covered) == len(board.dominoes)
+
+    board.undo(undo)
+    assert graphic.get_graphics_at(0, -2) == [under.graphic]
+    assert graphic.covered == {}
+
+
+def test_board_takes_no_positional_arguments():
+    # The old board_size argument must not turn on check_score
+    with pytest.raises(TypeError):
+        DominoBoard(100)
@@ -0,0 +1,31 @@
+import random
+from collections import Counter
+
+from dominoes.game import DominoSet
+
+
+def get_pips(dominoes):
+    return [(domino.side1.value, domino.side2.value) for domino in dominoes]
+
+
+def test_draw_fixed_hand_uses_canonical_order():
+    domino_set = DominoSet()
+    hand = domino_set.draw_fixed_hand([0, 7])
+    assert get_pips(hand) == [(0, 0), (1, 1)]
+    assert len(domino_set.dominoes) == 26
+
+
+def test_seeded_draws_are_reproducible():
+    pips = get_pips(DominoSet(seed=3).draw_hand(28))
+    assert pips == get_pips(DominoSet(rng=random.Random(3)).draw_hand(28))
+    assert len(set(pips)) == 28
+
+
+def test_draws_are_uniform():
+    counts = Counter()
+    rng = random.Random(0)
+    for _ in range(2800):
+        domino = DominoSet(rng=rng).draw_single()
+        counts[(domino.side1.value, domino.side2.value)] += 1
+    assert len(counts) == 28
+    assert all(60 < count < 140 for count in counts.values())
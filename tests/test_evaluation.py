@@ -0,0 +1,99 @@
+import threading
+
+import numpy as np
+import pytest
+
+from dominoes.evaluation import (
+    BatchEvaluator,
+    EvaluatorPlayer,
+    LinearEvaluator,
+    MLPEvaluator,
+    play_evaluated_games,
+)
+from dominoes.features import FEATURE_INDEX, N_FEATURES
+from dominoes.player import RandomPlayer
+from dominoes.simulation import simulate_games
+
+
+def test_models_score_each_row():
+    features = np.random.default_rng(0).random((5, N_FEATURES), dtype=np.float32)
+    linear = LinearEvaluator.heuristic()
+    expected = (
+        features[:, FEATURE_INDEX["score"]]
+        - features[:, FEATURE_INDEX["opponent_score"]]
+        - 0.05 * features[:, FEATURE_INDEX["hand_total"]]
+    )
+    assert np.allclose(linear(features), expected)
+    mlp = MLPEvaluator.random((8,), seed=0)
+    assert mlp(features).shape == (5,)
+    assert np.allclose(mlp(features[2:3]), mlp(features)[2:3], atol=1e-5)
+
+
+def test_batch_evaluator_returns_each_callers_rows():
+    model = LinearEvaluator.heuristic()
+    rng = np.random.default_rng(1)
+    inputs = [rng.random((n, N_FEATURES), dtype=np.float32) for n in range(1, 9)]
+    outputs = [None] * len(inputs)
+
+    with BatchEvaluator(model, max_batch=len(inputs), max_wait=0.5) as evaluator:
+
+        def call(i):
+            outputs[i] = evaluator.evaluate(inputs[i])
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    for features, values in zip(inputs, outputs):
+        assert np.allclose(values, model(features))
+    assert evaluator.requests_scored == 8
+    assert evaluator.batches < 8
+
+
+# SystemExit is left to end the worker thread, which pytest reports
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_batch_evaluator_passes_on_errors():
+    def model(features):
+        raise ValueError("bad model")
+
+    def exiting_model(features):
+        raise SystemExit
+
+    features = np.zeros((1, N_FEATURES), dtype=np.float32)
+    with BatchEvaluator(model, max_batch=1) as evaluator:
+        with pytest.raises(ValueError):
+            evaluator.evaluate(features)
+    with BatchEvaluator(exiting_model, max_batch=1) as evaluator:
+        with pytest.raises(RuntimeError):
+            evaluator.evaluate(features)
+        # SystemExit stopped the worker, so later requests are refused
+        evaluator.thread.join()
+        with pytest.raises(RuntimeError):
+            evaluator.evaluate(features)
+    with BatchEvaluator(lambda rows: rows[:0, 0], max_batch=1) as evaluator:
+        with pytest.raises(ValueError):
+            evaluator.evaluate(features)
+
+
+def test_batch_evaluator_rejects_requests_after_close():
+    evaluator = BatchEvaluator(LinearEvaluator.heuristic())
+    evaluator.close()
+    evaluator.close()
+    with pytest.raises(RuntimeError):
+        evaluator.evaluate(np.zeros((1, N_FEATURES), dtype=np.float32))
+
+
+def test_batched_games_match_unbatched():
+    model = MLPEvaluator.random((16,), seed=0)
+    result, evaluator = play_evaluated_games(model, 12, concurrency=4, seed=3)
+    expected, _ = play_evaluated_games(model, 12, concurrency=1, seed=3)
+    assert [game.scores for game in result.games] == [
+        game.scores for game in expected.games
+    ]
+    assert evaluator.mean_batch > 1
+
+
+def test_heuristic_player_beats_random():
+    result = simulate_games(EvaluatorPlayer, RandomPlayer, 100, seed=0)
+    assert result.wins[0] > result.wins[1]
@@ -0,0 +1,53 @@
+import numpy as np
+
+from dominoes.domino import Domino, DominoBoard, DoubleDomino
+from dominoes.features import (
+    BOARD_MOD5,
+    FEATURE_INDEX,
+    FEATURE_NAMES,
+    N_FEATURES,
+    OPEN_PIPS,
+    extract_features,
+    move_features,
+)
+from dominoes.player import Hand, Player
+
+
+def test_extract_features():
+    board = DominoBoard()
+    board.add_domino(Domino(2, 3))
+    hand = Hand([DoubleDomino(5), Domino(1, 4)])
+    features = extract_features(board, hand, 10, 6, 3, 4)
+    assert features.shape == (N_FEATURES,) == (len(FEATURE_NAMES),)
+    assert features[OPEN_PIPS + 2] == features[OPEN_PIPS + 3] == 1
+    assert features[BOARD_MOD5 + 0] == 1
+    assert features[FEATURE_INDEX["board_points"]] == 1
+    assert features[FEATURE_INDEX["tile_0"]] == 0
+    assert features[FEATURE_INDEX["hand_pips_5"]] == 2
+    assert features[FEATURE_INDEX["hand_total"]] == 15
+    assert features[FEATURE_INDEX["boneyard_size"]] == 10
+    assert features[FEATURE_INDEX["opponent_score"]] == 4
+
+
+def make_position():
+    board = DominoBoard()
+    board.add_domino(Domino(2, 3))
+    player = Player(Hand([Domino(3, 5), Domino(2, 6), Domino(0, 1)]))
+    player.observe(12, [7], [2])
+    return board, player
+
+
+def test_move_features_match_position_after_move():
+    board, player = make_position()
+    rows = move_features(player, board, player.get_possible_moves(board))
+    assert len(board.dominoes) == 1
+    assert len(rows) == 2
+
+    for index, row in enumerate(rows):
+        board, player = make_position()
+        move = player.get_possible_moves(board)[index]
+        board.add_domino(move.domino_to_play, move.side_on_board, move.side_to_play)
+        player.hand.remove_domino(move.domino_to_play)
+        points = row[FEATURE_INDEX["board_points"]]
+        expected = extract_features(board, player.hand, 12, 7, points, 2)
+        assert np.array_equal(row, expected)
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from dominoes.game import Game, GameTwoPlayer
+from dominoes.player import Hand, RandomPlayer
+from dominoes.simulation import game_rng
+
+
+def make_players(n):
+    return [RandomPlayer(Hand([]), name="player{}".format(i)) for i in range(n)]
+
+
+def test_two_player_game_matches_generic_game():
+    expected = GameTwoPlayer(*make_players(2), verbose=False, rng=game_rng(0, 1))
+    game = Game(make_players(2), verbose=False, rng=game_rng(0, 1))
+    assert game.play().scores == expected.play().scores
+
+
+@pytest.mark.parametrize("n_players", [3, 4])
+def test_multiplayer_games(n_players):
+    for i in range(20):
+        players = make_players(n_players)
+        game = Game(players, hand_size=5, verbose=False, rng=random.Random(i))
+        result = game.play()
+        assert len(result.scores) == n_players
+        assert result.team_scores == result.scores
+        placed = len(game.board.dominoes)
+        in_hands = sum(len(player.hand) for player in players)
+        assert placed + in_hands + len(game.domino_set.dominoes) == 28
+        if not result.blocked:
+            assert any(len(player.hand) == 0 for player in players)
+
+
+def test_opponent_hand_sizes_start_with_next_player():
+    players = make_players(3)
+    game = Game(players, hand_size=5, verbose=False, rng=random.Random(0))
+    players[2].hand.remove_domino(players[2].hand.dominoes[0])
+    sizes = game.opponent_hand_sizes[1]
+    assert list(sizes) == [4, 5]
+    assert sizes[-1] == 5 and len(sizes) == 2
+
+
+def test_team_game_scores():
+    players = make_players(4)
+    game = Game(
+        players, teams=[0, 1, 0, 1], max_number=9, verbose=False, rng=random.Random(3)
+    )
+    result = game.play()
+    assert result.team_scores == [
+        result.scores[0] + result.scores[2],
+        result.scores[1] + result.scores[3],
+    ]
+    assert (
+        len(game.domino_set.dominoes)
+        + len(game.board.dominoes)
+        + sum(len(player.hand) for player in players)
+        == 55
+    )
+
+
+@pytest.mark.parametrize("teams", [[1, 0], [0, 2], [3, 1, 3]])
+def test_team_scores_with_any_team_indices(teams):
+    players = make_players(len(teams))
+    game = Game(players, teams=teams, verbose=False, rng=random.Random(5))
+    result = game.play()
+    assert result.team_scores == [
+        sum(score for score, t in zip(result.scores, teams) if t == team)
+        for team in sorted(set(teams))
+    ]
+
+
+def test_hand_total_tracks_pips():
+    players = make_players(2)
+    Game(players, verbose=False, rng=random.Random(0))
+    for player in players:
+        assert player.hand.total == player.hand.get_total_value()
+
+
+def test_too_many_players():
+    with pytest.raises(ValueError):
+        Game(make_players(5), hand_size=7, verbose=False)
+
+
+def test_opponent_scores_follow_player_scores():
+    players = make_players(3)
+    game = Game(players, hand_size=5, verbose=False, rng=random.Random(0))
+    players[2].score = 4
+    assert list(game.opponent_scores[1]) == [4, 0]
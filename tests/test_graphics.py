@@ -0,0 +1,72 @@
+import io
+import random
+
+from dominoes.domino import Domino, DoubleDomino
+from dominoes.game import GameTwoPlayer
+from dominoes.graphics import (
+    DominoBoardGraphic,
+    DominoGraphic,
+    DominoOrientation,
+    HandGraphic,
+    TerminalRenderer,
+    get_glyph_rows,
+)
+from dominoes.player import Hand, RandomPlayer
+
+
+def test_glyph_rows_match_draw_graphic():
+    for orientation in DominoOrientation:
+        graphic = DominoGraphic(2, 5, orientation, 0, 0)
+        assert list(graphic.get_rows()) == graphic.draw_graphic().split("\n")[:5]
+    assert get_glyph_rows(2, 5, DominoOrientation.Side1Up) is get_glyph_rows(
+        2, 5, DominoOrientation.Side1Up
+    )
+
+
+def test_draw_board_writes_once():
+    board = DominoBoardGraphic()
+    board.add_domino(DominoGraphic(2, 3, DominoOrientation.Side1Left, 0, 0))
+    board.add_domino(DominoGraphic(3, 4, DominoOrientation.Side1Left, 1, 0))
+
+    class CountingFile(io.StringIO):
+        writes = 0
+
+        def write(self, text):
+            self.writes += 1
+            return super().write(text)
+
+    out = CountingFile()
+    board.draw_board(out)
+    assert out.writes == 1
+    assert out.getvalue().splitlines()[2] == "|2|3||3|4|"
+
+
+def test_draw_hand(capsys):
+    HandGraphic([Domino(1, 2), DoubleDomino(4)]).draw_hand()
+    lines = capsys.readouterr().out.split("\n")
+    assert lines[1] == " |1|  |4| "
+    assert lines[6] == "  0    1  "
+
+
+def test_terminal_renderer_only_rewrites_changed_lines():
+    renderer = TerminalRenderer(io.StringIO())
+    first = renderer.render(["a", "b", "c"])
+    assert first.startswith("\x1b[H\x1b[2J") and first.endswith("a\nb\nc\n")
+
+    second = renderer.render(["a", "x", "c"])
+    assert "\x1b[2;1Hx" in second
+    assert "a" not in second and "c" not in second
+
+    third = renderer.render(["a"])
+    assert "\x1b[2;1H\x1b[J" in third
+
+
+def test_game_with_renderer():
+    out = io.StringIO()
+    players = [RandomPlayer(Hand([]), "p1"), RandomPlayer(Hand([]), "p2")]
+    game = GameTwoPlayer(
+        *players, verbose=False, rng=random.Random(0), renderer=TerminalRenderer(out)
+    )
+    game.play()
+    assert out.getvalue().startswith("\x1b[H\x1b[2J")
+    assert "p1: " in out.getvalue()
@@ -0,0 +1,62 @@
+from dominoes.compact import NO_END, SIDE1, SIDE2, tile_id
+from dominoes.domino import Domino, DominoBoard
+from dominoes.mcts import MCTSPlayer, get_move_key
+from dominoes.player import Hand, Move
+
+
+def test_move_key():
+    board = DominoBoard()
+    root = Domino(2, 3)
+    leaf = Domino(3, 5)
+    board.add_domino(root)
+
+    assert get_move_key(Move(root)) == (tile_id(2, 3), NO_END, NO_END)
+    assert get_move_key(Move(leaf, leaf.side1, root.side2)) == (
+        tile_id(3, 5),
+        tile_id(2, 3) * 4 + SIDE2,
+        SIDE1,
+    )
+
+
+def test_mcts_takes_scoring_move():
+    board = DominoBoard()
+    root = Domino(1, 4)
+    board.add_domino(root)
+
+    dominoes = [Domino(1, 3), Domino(4, 6), Domino(1, 6)]
+    player = MCTSPlayer(Hand(dominoes), iterations=300, time_budget=None)
+    player.observe(14, [7])
+
+    move = player.choose_next_move(board)
+    assert move.domino_to_play is dominoes[2]
+    assert player.last_search["playouts"] == 300
+    assert board.dominoes == [root]
+
+
+def test_infers_void_after_opponent_pass():
+    board = DominoBoard()
+    root = Domino(1, 4)
+    board.add_domino(root)
+    dominoes = [Domino(1, 3), Domino(4, 6)]
+    player = MCTSPlayer(Hand(dominoes), iterations=20, time_budget=None)
+
+    move = player.choose_next_move(board)
+    board.add_domino(move.domino_to_play, move.side_on_board, move.side_to_play)
+    player.hand.remove_domino(move.domino_to_play)
+    expected_voids = set(board.endpoints_by_value)
+
+    # The opponent passes, so the board is unchanged on our next turn
+    player.choose_next_move(board)
+    assert player.void_pips == expected_voids
+
+
+def test_parallel_workers_merge_playouts():
+    board = DominoBoard()
+    board.add_domino(Domino(2, 3))
+    hand = Hand([Domino(2, 5), Domino(3, 3), Domino(3, 6)])
+    with MCTSPlayer(hand, iterations=40, time_budget=None, workers=2) as player:
+        player.choose_next_move(board)
+        assert player.executor is not None
+
+    assert player.executor is None
+    assert player.last_search["playouts"] == 40
@@ -1,3 +1,5 @@
+import pytest
+
 from dominoes.domino import Domino, DominoBoard, DoubleDomino
 from dominoes.player import Hand, Move, Player, RandomPlayer
 
@@ -34,3 +36,79 @@ def test_random_make_move():
     player = RandomPlayer(Hand([dominoes[1]]))
     move = player.choose_next_move(board)
     assert move.is_pass_move is True
+
+
+def test_hand_sides_by_value():
+    dominoes = [Domino(2, 3), DoubleDomino(2)]
+    hand = Hand(dominoes[:1])
+    assert hand.sides_by_value == {2: [dominoes[0].side1], 3: [dominoes[0].side2]}
+
+    hand.add_domino(dominoes[1])
+    assert hand.sides_by_value[2] == [
+        dominoes[0].side1,
+        dominoes[1].mid_side1,
+        dominoes[1].mid_side2,
+    ]
+
+    hand.remove_domino(dominoes[0])
+    assert hand.sides_by_value == {2: [dominoes[1].mid_side1, dominoes[1].mid_side2]}
+
+
+def test_core_classes_have_no_instance_dict():
+    double = DoubleDomino(3)
+    domino = Domino(1, 3)
+    objects = [double, domino, double.mid_side1, domino.side1, domino.graphic]
+    objects += [Move(domino, domino.side2, double.mid_side1), Hand([domino])]
+    for obj in objects:
+        assert not hasattr(obj, "__dict__")
+
+
+def test_lazy_possible_moves():
+    hand = Hand([Domino(2, 3), Domino(3, 4), DoubleDomino(2)])
+    player = Player(hand)
+    board = DominoBoard()
+    assert player.has_possible_move(board)
+    assert not Player(Hand([])).has_possible_move(board)
+
+    board.add_domino(Domino(5, 6))
+    assert not player.has_possible_move(board)
+    assert next(player.iter_possible_moves(board), None) is None
+
+    leaf = Domino(6, 3)
+    board.add_domino(leaf, board.root_domino.side2, leaf.side1)
+    assert player.has_possible_move(board)
+    moves = list(player.iter_possible_moves(board))
+    assert moves == player.get_possible_moves(board)
+    assert len(moves) == 2
+    assert RandomPlayer(hand).choose_next_move(board) == moves[0]
+
+
+def test_hand_removal_keeps_order():
+    dominoes = [Domino(2, 3), Domino(3, 4), DoubleDomino(2)]
+    hand = Hand(list(dominoes))
+    hand.remove_domino(dominoes[1])
+    assert len(hand) == 2
+    assert list(hand) == [dominoes[0], dominoes[2]]
+    hand.add_domino(dominoes[1])
+    assert hand.dominoes == (dominoes[0], dominoes[2], dominoes[1])
+    assert hand.get_domino_by_index(2) is dominoes[1]
+    with pytest.raises(AttributeError):
+        hand.dominoes.append(dominoes[1])
+
+
+def test_hand_rejects_duplicate_dominoes():
+    with pytest.raises(AssertionError):
+        Hand([Domino(2, 3), Domino(3, 2)])
+    hand = Hand([Domino(2, 3)])
+    with pytest.raises(AssertionError):
+        hand.add_domino(Domino(2, 3))
+
+
+def test_hand_removes_held_domino_with_same_pips():
+    held = Domino(3, 5)
+    hand = Hand([held, Domino(2, 3)])
+    hand.remove_domino(Domino(5, 3))
+    assert [(d.side1.value, d.side2.value) for d in hand] == [(2, 3)]
+    assert all(side.parent_domino is not held for side in hand.sides_by_value[3])
+    assert 5 not in hand.sides_by_value
+    assert hand.total == 5
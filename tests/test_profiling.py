@@ -0,0 +1,46 @@
+import pstats
+
+from dominoes.domino import DominoBoard
+from dominoes.player import RandomPlayer
+from dominoes.profiling import PhaseStats, Profiler
+from dominoes.simulation import simulate_games
+
+
+def test_profiler_times_phases_and_restores_methods():
+    original = RandomPlayer.choose_next_move
+    with Profiler() as profiler:
+        assert RandomPlayer.choose_next_move is not original
+        result = simulate_games(RandomPlayer, RandomPlayer, 5, seed=0)
+    assert RandomPlayer.choose_next_move is original
+    assert "add_domino" not in vars(RandomPlayer)
+
+    summary = profiler.summary()
+    assert summary["game"]["calls"] == 5
+    assert summary["add_domino"]["calls"] == sum(g.move_count for g in result.games)
+    assert summary["choose_next_move"]["calls"] > summary["add_domino"]["calls"] - 5
+    assert summary["get_score"]["calls"] > 0
+    assert "choose_next_move" in profiler.format_summary()
+
+
+def test_results_unchanged_by_profiling():
+    expected = simulate_games(RandomPlayer, RandomPlayer, 5, seed=1)
+    with Profiler():
+        profiled = simulate_games(RandomPlayer, RandomPlayer, 5, seed=1)
+    assert [g.scores for g in profiled.games] == [g.scores for g in expected.games]
+
+
+def test_phase_histogram():
+    stats = PhaseStats("phase")
+    for duration in [100, 120, 3000, 100000]:
+        stats.record(duration)
+    assert stats.calls == 4
+    assert stats.percentile(0.5) == 128
+    assert stats.percentile(1.0) == 100000
+
+
+def test_pstats_dump(tmp_path):
+    path = str(tmp_path / "run.pstats")
+    with Profiler(phases={}, cprofile=True) as profiler:
+        DominoBoard()
+    profiler.dump_stats(path)
+    assert pstats.Stats(path).total_calls > 0
@@ -0,0 +1,75 @@
+import pytest
+
+from dominoes.compact import CompactBoard
+from dominoes.player import RandomPlayer
+from dominoes.record import (
+    HEADER,
+    RECORD,
+    RecordReader,
+    RecordWriter,
+    record_game,
+    record_games,
+)
+from dominoes.simulation import simulate_games
+
+
+def test_record_round_trip(tmp_path):
+    path = str(tmp_path / "games.rec")
+    record_games(path, RandomPlayer, RandomPlayer, 5, seed=4)
+    # Appending continues the same file
+    record_games(path, RandomPlayer, RandomPlayer, 3, seed=4, start=5)
+
+    with RecordReader(path) as reader:
+        assert len(reader) == 8
+        records = list(reader)
+        assert [record.game_index for record in records] == list(range(8))
+        assert records[6] == record_game(RandomPlayer, RandomPlayer, 4, 6)
+        assert reader[-1] == records[7]
+        assert len(list(reader.scan())) == 8
+
+    expected = simulate_games(RandomPlayer, RandomPlayer, 8, seed=4)
+    assert [record.scores for record in records] == [
+        game.scores for game in expected.games
+    ]
+    for record, game in zip(records, expected.games):
+        assert len(record.placements) == game.move_count
+        assert sorted(record.deck) == list(range(28))
+
+
+def test_replay_to_move(tmp_path):
+    path = str(tmp_path / "games.rec")
+    record_games(path, RandomPlayer, RandomPlayer, 1, seed=1)
+    with RecordReader(path) as reader:
+        record = reader[0]
+        board = reader.replay(0, 3)
+    assert len(board.dominoes) == 3
+    assert CompactBoard.from_board(board).placements == record.placements[:3]
+    assert len(record.replay().dominoes) == len(record.placements)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.rec"
+    path.write_bytes(b"x" * (HEADER.size + RECORD.size))
+    with pytest.raises(ValueError):
+        RecordReader(str(path))
+    with pytest.raises(ValueError):
+        RecordWriter(str(path))
+
+    path.write_bytes(b"x" * (HEADER.size - 1))
+    with pytest.raises(ValueError):
+        RecordReader(str(path))
+    with pytest.raises(ValueError):
+        RecordWriter(str(path))
+
+
+def test_append_after_partial_record(tmp_path):
+    path = str(tmp_path / "games.rec")
+    record_games(path, RandomPlayer, RandomPlayer, 3, seed=4)
+    with open(path, "ab") as file:
+        file.write(b"\x01" * 10)
+    record_games(path, RandomPlayer, RandomPlayer, 3, seed=4, start=3)
+
+    with RecordReader(path) as reader:
+        assert len(reader) == 6
+        assert [record.game_index for record in reader] == list(range(6))
+        assert all(record.seed == 4 for record in reader)
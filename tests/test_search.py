@@ -0,0 +1,51 @@
+from dominoes.domino import Domino, DominoBoard
+from dominoes.player import Hand, RandomPlayer
+from dominoes.search import SearchPlayer
+from dominoes.simulation import simulate_games
+
+
+def test_search_takes_scoring_move():
+    board = DominoBoard()
+    root = Domino(1, 4)
+    board.add_domino(root)
+
+    dominoes = [Domino(1, 3), Domino(4, 6), Domino(1, 6)]
+    player = SearchPlayer(Hand(dominoes), max_depth=2, samples=4, time_budget=None)
+    player.observe(14, [7])
+
+    move = player.choose_next_move(board)
+    assert move.domino_to_play is dominoes[2]
+    assert move.side_on_board is root.side1
+    assert player.last_search["depth"] == 2
+
+
+def test_search_leaves_board_untouched():
+    board = DominoBoard()
+    root = Domino(2, 3)
+    board.add_domino(root)
+    hand = Hand([Domino(2, 5), Domino(3, 3), Domino(3, 6)])
+    player = SearchPlayer(hand, max_depth=3, samples=3, time_budget=None)
+
+    player.choose_next_move(board)
+
+    assert board.dominoes == [root]
+    assert board.endpoints == {root.side1, root.side2}
+    assert board.get_score() == 5
+    assert len(hand.dominoes) == 3
+
+
+def test_search_games_complete():
+    result = simulate_games(SearchPlayer, RandomPlayer, 4, seed=1)
+    assert len(result.games) == 4
+
+
+def test_search_stops_near_time_budget():
+    board = DominoBoard()
+    board.add_domino(Domino(2, 3))
+    hand = Hand([Domino(2, 5), Domino(3, 3), Domino(3, 6), Domino(0, 2), Domino(1, 3)])
+    player = SearchPlayer(hand, max_depth=30, samples=8, time_budget=0.01)
+    player.observe(14, [7])
+
+    player.choose_next_move(board)
+    assert player.last_search["depth"] < 30
+    assert player.last_search["seconds"] < 0.02
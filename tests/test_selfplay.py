@@ -0,0 +1,101 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from dominoes.features import N_FEATURES
+from dominoes.player import RandomPlayer
+from dominoes.selfplay import (
+    SHARD_FILE,
+    get_shard_name,
+    iter_shards,
+    play_game_decisions,
+    run_selfplay,
+)
+
+
+def load(out_dir):
+    shards = list(iter_shards(out_dir))
+    return {
+        name: np.concatenate([shard[name] for shard in shards]) for name in shards[0]
+    }
+
+
+def test_game_decisions():
+    rows = play_game_decisions([RandomPlayer, RandomPlayer], 0, 1)
+    n_rows = len(rows["player"])
+    assert n_rows > 0
+    assert all(len(values) == n_rows for values in rows.values())
+    assert rows["move"][0][1] == -1
+    # Both players' outcomes are the same difference from opposite sides
+    outcomes = {seat: outcome for seat, outcome in zip(rows["player"], rows["outcome"])}
+    assert len(outcomes) < 2 or outcomes[0] == -outcomes[1]
+
+
+def test_selfplay_shards(tmp_path):
+    out_dir = str(tmp_path / "data")
+    result = run_selfplay(
+        out_dir, ["random", "random"], 10, games_per_shard=4, workers=1
+    )
+    assert (result.written, result.skipped) == (3, 0)
+    data = load(out_dir)
+    assert len(data["game"]) == result.rows
+    assert data["features"].shape == (result.rows, N_FEATURES)
+    assert data["move"].shape == (result.rows, 3)
+    assert list(np.unique(data["game"])) == list(range(10))
+    assert (data["n_moves"] >= 1).all()
+
+
+def test_selfplay_resumes_and_matches_parallel_run(tmp_path):
+    out_dir = str(tmp_path / "data")
+    run_selfplay(out_dir, ["random", "evaluator"], 9, games_per_shard=3, workers=1)
+    # An interrupted run leaves a temporary shard and maybe a partial one
+    shard = os.path.join(out_dir, get_shard_name(1))
+    shutil.copytree(shard, shard + ".tmp")
+    os.remove(os.path.join(shard, SHARD_FILE))
+
+    result = run_selfplay(
+        out_dir, ["random", "evaluator"], 9, games_per_shard=3, workers=1
+    )
+    assert (result.written, result.skipped) == (1, 2)
+
+    parallel_dir = str(tmp_path / "parallel")
+    run_selfplay(parallel_dir, ["random", "evaluator"], 9, games_per_shard=3, workers=2)
+    resumed = load(out_dir)
+    parallel = load(parallel_dir)
+    for name in resumed:
+        assert np.array_equal(resumed[name], parallel[name])
+
+
+def test_selfplay_rejects_other_settings(tmp_path):
+    out_dir = str(tmp_path / "data")
+    run_selfplay(out_dir, ["random", "random"], 2, games_per_shard=2, workers=1)
+    with pytest.raises(ValueError):
+        run_selfplay(
+            out_dir, ["random", "random"], 2, seed=1, games_per_shard=2, workers=1
+        )
+
+
+def test_selfplay_skips_shards_beyond_current_games(tmp_path):
+    out_dir = str(tmp_path / "data")
+    run_selfplay(out_dir, ["random", "random"], 6, games_per_shard=2, workers=1)
+    result = run_selfplay(
+        out_dir, ["random", "random"], 3, games_per_shard=2, workers=1
+    )
+    # Shard 1 held games [2, 4) and is redone for [2, 3)
+    assert (result.written, result.skipped) == (1, 1)
+    assert list(np.unique(load(out_dir)["game"])) == [0, 1, 2]
+
+
+def test_shard_file_without_range_is_incomplete(tmp_path):
+    out_dir = str(tmp_path / "data")
+    run_selfplay(out_dir, ["random", "random"], 4, games_per_shard=2, workers=1)
+    with open(os.path.join(out_dir, get_shard_name(0), SHARD_FILE), "w") as file:
+        json.dump({"rows": 1}, file)
+    assert list(np.unique(load(out_dir)["game"])) == [2, 3]
+    result = run_selfplay(
+        out_dir, ["random", "random"], 4, games_per_shard=2, workers=1
+    )
+    assert (result.written, result.skipped) == (1, 1)
@@ -0,0 +1,174 @@
+import asyncio
+import json
+
+from dominoes.player import Player
+from dominoes.server import (
+    BOTS,
+    MESSAGE_LIMIT,
+    GameServer,
+    percentile,
+    run_load_test,
+)
+
+
+class BrokenPlayer(Player):
+    def choose_next_move(self, board):
+        raise ValueError("broken bot")
+
+
+async def send(writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+async def receive(reader):
+    return json.loads(await reader.readline())
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.5) == 51.0
+    assert percentile(values, 0.99) == 100.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_load_test_plays_concurrent_games():
+    async def run():
+        server = GameServer()
+        host, port = await server.start_tcp()
+        try:
+            stats = await run_load_test(host, port, clients=20, games_per_client=2)
+            return stats, server.games_played, len(server.sessions)
+        finally:
+            await server.close()
+
+    stats, games_played, active = asyncio.run(run())
+    assert stats["games"] == 40
+    assert games_played == 40
+    assert active == 0
+    assert stats["moves"] > 0
+    assert stats["p50_ms"] <= stats["p99_ms"]
+
+
+def test_rejects_bad_moves():
+    async def run():
+        server = GameServer()
+        host, port = await server.start_tcp()
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            await send(writer, {"type": "move", "game": 99, "move": 0})
+            unknown = await receive(reader)
+            await send(writer, {"type": "new_game", "bot": "nobody"})
+            bad_bot = await receive(reader)
+
+            await send(writer, {"type": "new_game", "seed": 3})
+            started = await receive(reader)
+            message = await receive(reader)
+            while message["type"] != "your_turn":
+                message = await receive(reader)
+            await send(writer, {"type": "move", "game": started["game"], "move": -1})
+            bad_index = await receive(reader)
+            await send(writer, {"type": "move", "game": started["game"], "move": True})
+            assert await receive(reader) == bad_index
+            return unknown, bad_bot, bad_index, message
+        finally:
+            writer.close()
+            await server.close()
+
+    unknown, bad_bot, bad_index, state = asyncio.run(run())
+    assert unknown == {"type": "error", "message": "Unknown game"}
+    assert bad_bot == {"type": "error", "message": "Unknown bot"}
+    assert bad_index == {"type": "error", "message": "Invalid move index"}
+    assert len(state["hand"]) > 0
+    assert len(state["moves"]) > 0
+
+
+def test_rejects_bad_seeds_and_ids_without_dropping_connection():
+    async def run():
+        server = GameServer()
+        host, port = await server.start_tcp()
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            replies = []
+            for message in [
+                {"type": "new_game", "seed": [1, 2]},
+                {"type": "new_game", "seed": "7"},
+                {"type": "move", "game": [1], "move": 0},
+                {"type": "new_game", "seed": 5},
+            ]:
+                await send(writer, message)
+                replies.append(await receive(reader))
+            return replies
+        finally:
+            writer.close()
+            await server.close()
+
+    replies = asyncio.run(run())
+    assert replies[0] == {"type": "error", "message": "Invalid seed"}
+    assert replies[1] == {"type": "error", "message": "Invalid seed"}
+    assert replies[2] == {"type": "error", "message": "Unknown game"}
+    assert replies[3]["type"] == "game_started"
+
+
+def test_skips_over_long_lines():
+    async def run():
+        server = GameServer()
+        host, port = await server.start_tcp()
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            await send(writer, {"type": "new_game", "pad": "x" * 3 * MESSAGE_LIMIT})
+            too_long = await receive(reader)
+            await send(writer, {"type": "new_game", "seed": 1})
+            return too_long, await receive(reader)
+        finally:
+            writer.close()
+            await server.close()
+
+    too_long, started = asyncio.run(run())
+    assert too_long == {"type": "error", "message": "Message too long"}
+    assert started["type"] == "game_started"
+
+
+def test_saturated_server_falls_back_to_cheap_moves():
+    async def run():
+        # No executor slots at all, so every search move falls back
+        server = GameServer(max_bot_moves=0)
+        host, port = await server.start_tcp()
+        try:
+            stats = await run_load_test(host, port, clients=3, bot="search")
+            return stats, server.get_stats()
+        finally:
+            await server.close()
+
+    stats, server_stats = asyncio.run(run())
+    assert stats["games"] == 3
+    assert server_stats["bot_fallbacks"] > 0
+
+
+def test_failed_game_ends_with_error(monkeypatch):
+    monkeypatch.setitem(BOTS, "broken", (BrokenPlayer, False))
+
+    async def run():
+        server = GameServer()
+        host, port = await server.start_tcp()
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            await send(writer, {"type": "new_game", "bot": "broken", "seed": 1})
+            started = await receive(reader)
+            while True:
+                message = await asyncio.wait_for(receive(reader), 5)
+                if message["type"] != "your_turn":
+                    break
+                await send(writer, {"type": "move", "game": started["game"], "move": 0})
+            return started, message, len(server.sessions)
+        finally:
+            writer.close()
+            await server.close()
+
+    started, message, active = asyncio.run(run())
+    assert message == {
+        "type": "error",
+        "game": started["game"],
+        "message": "Game failed",
+    }
+    assert active == 0
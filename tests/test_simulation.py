@@ -0,0 +1,39 @@
+from dominoes.game import GameTwoPlayer
+from dominoes.player import Hand, RandomPlayer
+from dominoes.simulation import simulate_games
+
+
+def test_headless_game_is_silent(capsys):
+    player1 = RandomPlayer(Hand([]), name="player1")
+    player2 = RandomPlayer(Hand([]), name="player2")
+    game = GameTwoPlayer(player1, player2, verbose=False)
+
+    result = game.play()
+
+    assert capsys.readouterr().out == ""
+    assert result.scores == [player1.score, player2.score]
+    assert result.move_count == len(game.board.dominoes)
+    assert result.turn_count >= result.move_count
+
+
+def test_simulate_games():
+    result = simulate_games(RandomPlayer, RandomPlayer, 20)
+
+    assert len(result.games) == 20
+    assert sum(result.wins) + result.ties == 20
+    assert result.games_per_second > 0
+    for game in result.games:
+        assert game.blocked or game.move_count > 0
+
+
+class ClosingPlayer(RandomPlayer):
+    closed = 0
+
+    def close(self):
+        ClosingPlayer.closed += 1
+
+
+def test_simulation_closes_players():
+    ClosingPlayer.closed = 0
+    simulate_games(ClosingPlayer, ClosingPlayer, 3, seed=0)
+    assert ClosingPlayer.closed == 6
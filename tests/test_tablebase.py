@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from dominoes.compact import CompactBoard, mask_to_hand, tile_id
+from dominoes.game import DominoSet
+from dominoes.player import Hand, RandomPlayer
+from dominoes.simulation import simulate_games
+from dominoes.tablebase import (
+    EndgameSolver,
+    ProbeTable,
+    TablebasePlayer,
+    build_opening_book,
+    endgame_key,
+    generate_endgames,
+    opening_key,
+    random_endgame,
+)
+
+
+def test_solve_going_out():
+    board = CompactBoard()
+    board.add(tile_id(0, 1))
+    mover = 1 << tile_id(1, 2)
+    other = 1 << tile_id(0, 3)
+    # Playing 1-2 leaves ends 0 and 2 and goes out for the minimum bonus
+    assert EndgameSolver().solve(board, mover, other) == 1
+
+
+def test_probe_table_round_trip(tmp_path):
+    path = str(tmp_path / "table.tb")
+    entries = {key: (key / 10, key % 3) for key in range(1, 200, 7)}
+    ProbeTable.write(path, entries)
+    with ProbeTable(path) as table:
+        assert len(table) == len(entries)
+        for key, (value, count) in entries.items():
+            assert table.probe(key) == (pytest.approx(value), count)
+        assert table.probe(2) is None
+
+
+def test_generated_endgames_match_solver(tmp_path):
+    path = str(tmp_path / "endgames.tb")
+    assert generate_endgames(path, 20, max_tiles=4, seed=1) > 20
+    rng = random.Random(1)
+    solver = EndgameSolver()
+    with ProbeTable(path) as table:
+        for _ in range(20):
+            position = random_endgame(rng, rng.randint(2, 4))
+            value, _ = table.probe(endgame_key(*position))
+            assert value == solver.solve(*position)
+
+        board, mover, other = position
+        dominoes = DominoSet().dominoes
+        player = TablebasePlayer(mask_to_hand(mover, dominoes), endgames=table)
+        player.observe(0, [bin(other).count("1")])
+        domino_board = board.to_board(dominoes)
+        move = player.choose_next_move(domino_board)
+        if not move.is_pass_move:
+            assert player.hits == player.probes > 0
+
+
+def test_tablebase_player(tmp_path):
+    book_path = str(tmp_path / "book.tb")
+    assert build_opening_book(book_path, 300, seed=2) == 28
+    with ProbeTable(book_path) as book:
+        assert sum(book.probe(opening_key(tile))[1] for tile in range(28)) == 300
+
+        def make_player(hand, name):
+            return TablebasePlayer(hand, name, book=book)
+
+        result = simulate_games(make_player, RandomPlayer, 20, seed=3)
+        assert len(result.games) == 20
+        assert TablebasePlayer(Hand([])).book is None
@@ -0,0 +1,67 @@
+import pytest
+
+from dominoes.game import DominoSet
+from dominoes.tables import (
+    MID_SIDE1,
+    MID_SIDE2,
+    SIDE1,
+    SIDE2,
+    SIDES_PER_TILE,
+    get_move_tables,
+)
+
+
+def test_double_six_tables_match_domino_set():
+    tables = get_move_tables(0, 6)
+    assert tables.n_tiles == 28
+    assert tables.max_ends == 16
+    dominoes = DominoSet().dominoes
+    assert [tables.tile_id(d.side1.value, d.side2.value) for d in dominoes] == list(
+        range(28)
+    )
+
+
+def test_attachments():
+    tables = get_move_tables(0, 6)
+    tile = tables.tile_id(2, 5)
+    (attachment,) = tables.get_tile_attachments(tile, 5)
+    assert attachment.side == SIDE2
+    assert attachment.new_pip == 2
+    assert attachment.new_value == 2
+    assert tables.get_tile_attachments(tile, 2)[0].side == SIDE1
+    assert tables.get_tile_attachments(tile, 4) == ()
+
+
+def test_double_attachments():
+    tables = get_move_tables(0, 6)
+    tile = tables.tile_id(4, 4)
+    attachments = tables.get_tile_attachments(tile, 4)
+    assert [a.side for a in attachments] == [MID_SIDE1, MID_SIDE2]
+    assert all(a.new_pip == 4 and a.new_value == 8 for a in attachments)
+    assert tables.is_double(tile)
+
+
+def test_score_deltas():
+    tables = get_move_tables(0, 6)
+    (leaf,) = tables.get_tile_attachments(tables.tile_id(2, 5), 5)
+    double = tables.get_tile_attachments(tables.tile_id(5, 5), 5)[0]
+
+    # Covering a regular side loses its pip
+    regular = tables.tile_id(3, 5) * SIDES_PER_TILE + SIDE2
+    assert tables.get_score_delta(leaf, regular, 0) == 2 - 5
+    assert tables.get_score_delta(double, regular, 0) == 10 - 5
+
+    # A double keeps its value until its second mid side is covered
+    spinner = tables.tile_id(5, 5) * SIDES_PER_TILE
+    assert tables.get_score_delta(leaf, spinner + MID_SIDE1, 0) == 2
+    assert tables.get_score_delta(leaf, spinner + MID_SIDE2, 0b0100) == 2 - 10
+    # and its ends are worth nothing once open
+    assert tables.get_score_delta(leaf, spinner + SIDE1, 0b1100) == 2
+
+
+def test_other_sets_and_cache():
+    tables = get_move_tables(0, 9)
+    assert tables.n_tiles == 55
+    assert get_move_tables(0, 9) is tables
+    with pytest.raises(TypeError):
+        tables.tile_ids[(0, 0)] = 1
@@ -0,0 +1,33 @@
+from dominoes.player import RandomPlayer
+from dominoes.simulation import simulate_games
+from dominoes.tournament import run_tournament, split_games
+
+
+def summarize(result):
+    return [
+        (game.scores, game.move_count, game.turn_count, game.blocked)
+        for game in result.games
+    ]
+
+
+def test_split_games():
+    chunks = split_games(10, 3)
+    assert [len(chunk) for chunk in chunks] == [3, 3, 4]
+    assert chunks[0].start == 0 and chunks[-1].stop == 10
+
+    assert split_games(2, 8) == [range(0, 1), range(1, 2)]
+
+
+def test_seeded_simulation_is_reproducible():
+    first = simulate_games(RandomPlayer, RandomPlayer, 10, seed=7)
+    second = simulate_games(RandomPlayer, RandomPlayer, 10, seed=7)
+    assert summarize(first) == summarize(second)
+
+
+def test_tournament_independent_of_workers():
+    serial = run_tournament(RandomPlayer, RandomPlayer, 12, seed=3, workers=1)
+    parallel = run_tournament(RandomPlayer, RandomPlayer, 12, seed=3, workers=3)
+
+    assert summarize(serial) == summarize(parallel)
+    assert serial.wins == parallel.wins
+    assert serial.total_scores == parallel.total_scores
@@ -0,0 +1,53 @@
+from dominoes.domino import Domino, DominoBoard
+from dominoes.player import Hand
+from dominoes.search import SearchPlayer
+from dominoes.transposition import (
+    EXACT,
+    LOWER_BOUND,
+    REPLACE_ALWAYS,
+    REPLACE_DEPTH,
+    TranspositionTable,
+)
+
+
+def test_probe_and_store():
+    table = TranspositionTable(8)
+    assert table.probe(3) is None
+
+    table.store(3, 2, 1.5, EXACT)
+    assert table.probe(3) == (3, 2, 1.5, EXACT)
+    assert table.probe(11) is None
+    assert table.hit_rate == 1 / 3
+
+
+def test_depth_preferred_replacement():
+    table = TranspositionTable(8, REPLACE_DEPTH)
+    table.store(3, 4, 1.0, EXACT)
+    table.store(11, 2, 2.0, LOWER_BOUND)
+    assert table.probe(3) is not None
+    assert table.rejected == 1
+
+    table.store(11, 5, 2.0, LOWER_BOUND)
+    assert table.probe(11) == (11, 5, 2.0, LOWER_BOUND)
+    assert table.overwrites == 1
+
+
+def test_always_replacement():
+    table = TranspositionTable(8, REPLACE_ALWAYS)
+    table.store(3, 4, 1.0, EXACT)
+    table.store(11, 2, 2.0, EXACT)
+    assert table.probe(3) is None
+    assert table.probe(11) is not None
+
+
+def test_search_uses_table():
+    board = DominoBoard()
+    board.add_domino(Domino(2, 3))
+    hand = Hand([Domino(2, 5), Domino(3, 3), Domino(3, 6), Domino(1, 2)])
+    player = SearchPlayer(hand, max_depth=4, samples=2, time_budget=None)
+    player.observe(10, [7])
+
+    player.choose_next_move(board)
+
+    assert player.transposition_table.stores > 0
+    assert player.last_search["tt_hit_rate"] > 0
@@ -0,0 +1,67 @@
+from dominoes.domino import Domino, DominoBoard, DoubleDomino
+from dominoes.player import Hand
+from dominoes.zobrist import tile_key, zobrist_key
+
+
+def test_zobrist_key_is_stable():
+    assert zobrist_key("tile", 2, 3) == zobrist_key("tile", 2, 3)
+    assert zobrist_key("tile", 2, 3) != zobrist_key("tile", 3, 2)
+    assert tile_key(3, 2) == tile_key(2, 3)
+
+
+def test_board_hash_transposition():
+    # The same open ends reached by playing the two leaves in either order
+    boards = []
+    for first, second in [(0, 1), (1, 0)]:
+        board = DominoBoard()
+        root = Domino(2, 3)
+        leaves = [Domino(2, 4), Domino(3, 5)]
+        board.add_domino(root)
+        board.add_domino(
+            leaves[first], root.side1 if first == 0 else root.side2, leaves[first].side1
+        )
+        board.add_domino(
+            leaves[second],
+            root.side1 if second == 0 else root.side2,
+            leaves[second].side1,
+        )
+        boards.append(board)
+
+    assert boards[0].get_hash() == boards[1].get_hash()
+
+
+def test_board_hash_tracks_moves_and_undo():
+    board = DominoBoard()
+    root = DoubleDomino(3)
+    leaf1 = Domino(3, 5)
+    leaf2 = Domino(3, 5)
+
+    empty_hash = board.get_hash()
+    board.add_domino(root)
+    root_hash = board.get_hash()
+    assert root_hash != empty_hash
+
+    undo1 = board.add_domino(leaf1, root.mid_side1, leaf1.side1)
+    one_leaf_hash = board.get_hash()
+    assert one_leaf_hash != root_hash
+
+    # Two endpoints of the same value must not cancel out
+    undo2 = board.add_domino(leaf2, root.mid_side2, leaf2.side1)
+    assert board.get_hash() not in (empty_hash, root_hash, one_leaf_hash)
+
+    board.undo(undo2)
+    assert board.get_hash() == one_leaf_hash
+    board.undo(undo1)
+    assert board.get_hash() == root_hash
+
+
+def test_hand_hash():
+    dominoes = [Domino(2, 3), DoubleDomino(4)]
+    hand = Hand([dominoes[0]])
+    assert hand.hash == tile_key(2, 3)
+
+    hand.add_domino(dominoes[1])
+    assert hand.hash == tile_key(2, 3) ^ tile_key(4, 4)
+
+    hand.remove_domino(dominoes[0])
+    assert hand.hash == Hand([dominoes[1]]).hash